@@ -1,5 +1,5 @@
 from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect, HTTPException, Depends
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
@@ -11,6 +11,7 @@ import os
 import json
 import math
 from datetime import datetime, timezone
+from contextlib import asynccontextmanager
 from websockets.exceptions import ConnectionClosed
 
 # Importer le routeur depuis le fichier api.py
@@ -19,29 +20,66 @@ from auth.dependencies import get_current_user
 from models.user import User
 from mcp_tools import mcp_server
 import mcp_tools
-from opensees import run_analysis
+from opensees import AnalysisPool, AnalysisJobs, ResultCache
+from opensees.columnar import COLUMNAR_MEDIA_TYPE, encode_columnar
+from opensees.streaming import NDJSON_MEDIA_TYPE, stream_analysis
 from opensees.helpers import compute_section_properties
 
 class ConnectionManager:
     def __init__(self):
         self.active_connections: list[WebSocket] = []
+        self.clients: dict[int, WebSocket] = {}
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, websocket: WebSocket, client_id: int = None):
         await websocket.accept()
         self.active_connections.append(websocket)
+        if client_id is not None:
+            self.clients[client_id] = websocket
 
     def disconnect(self, websocket: WebSocket):
         self.active_connections.remove(websocket)
+        for client_id, connection in list(self.clients.items()):
+            if connection is websocket:
+                del self.clients[client_id]
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
 
+    async def send_to_client(self, message: str, client_id: int):
+        websocket = self.clients.get(client_id)
+        if websocket is None:
+            return
+        try:
+            await websocket.send_text(message)
+        except (WebSocketDisconnect, ConnectionClosed, RuntimeError) as e:
+            print(f"WebSocket error: {e}")
+
     async def broadcast(self, message: str):
         for connection in self.active_connections:
             await connection.send_text(message)
 
 
 manager = ConnectionManager()
+analysis_pool = AnalysisPool(cache=ResultCache())
+
+async def notify_analysis_job(job, event: dict):
+  """Streams analysis job events to the WebSocket of the submitting client"""
+  if job.client_id is None:
+    return
+  message = {"type": "analysis_progress", "job_id": job.id, "status": job.status, **event}
+  await manager.send_to_client(json.dumps(message), job.client_id)
+
+analysis_jobs = AnalysisJobs(analysis_pool, notify=notify_analysis_job)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+  # Pre-warm the analysis workers at startup, stop them at shutdown
+  analysis_pool.start()
+  try:
+    async with mcp_server.session_manager.run():
+      yield
+  finally:
+    analysis_pool.shutdown()
 
 app = FastAPI(
     title="SDK Webapp Python",
@@ -49,7 +87,7 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    lifespan=lambda app: mcp_server.session_manager.run()
+    lifespan=lifespan
 )
 
 # Configurer CORS
@@ -215,18 +253,89 @@ async def get_benchmark(id: str):
   raise HTTPException(status_code=404, detail=f"Benchmark with id '{id}' not found")
 
 @app.post("/analysis")
-async def get_analysis(model : dict):
+async def get_analysis(model : dict, request: Request, session_id: str = None):
   try :
-    output = run_analysis(model)
+    # Avec session_id, seules les modifications depuis la dernière analyse de la session sont appliquées (voir opensees/session.py)
+    # Résultats en colonnes binaires si le client les accepte (voir opensees/columnar.py)
+    if COLUMNAR_MEDIA_TYPE in request.headers.get("accept", ""):
+      output = await analysis_pool.run_analysis(model, result_format='columnar', session_id=session_id)
+      return Response(content=encode_columnar(output), media_type=COLUMNAR_MEDIA_TYPE)
+
+    # Résultats envoyés par morceaux au fil de l'extraction (voir opensees/streaming.py)
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+      return StreamingResponse(stream_analysis(analysis_pool, model, session_id), media_type=NDJSON_MEDIA_TYPE)
+
+    output = await analysis_pool.run_analysis(model, session_id=session_id)
     return {
       "status": "Analysis completed successfully",
       "output": output
     }
     
+  except HTTPException:
+    raise
   except Exception as e:
     print('ERROR: ', e)
     raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/analysis/modal")
+async def get_modal_analysis(model : dict, request: Request):
+  """Modes propres du modèle : périodes, taux de masse participante et déformées (voir opensees/modal.py)"""
+  try :
+    if COLUMNAR_MEDIA_TYPE in request.headers.get("accept", ""):
+      output = await analysis_pool.run_modal_analysis(model, result_format='columnar')
+      return Response(content=encode_columnar(output), media_type=COLUMNAR_MEDIA_TYPE)
+
+    output = await analysis_pool.run_modal_analysis(model)
+    return {
+      "status": "Modal analysis completed successfully",
+      "output": output
+    }
+
+  except HTTPException:
+    raise
+  except Exception as e:
+    print('ERROR: ', e)
+    raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/analysis/buckling")
+async def get_buckling_analysis(model : dict, request: Request):
+  """Facteurs de charge critique du modèle sous ses charges et modes de flambement (voir opensees/direct.py)"""
+  try :
+    if COLUMNAR_MEDIA_TYPE in request.headers.get("accept", ""):
+      output = await analysis_pool.run_buckling_analysis(model, result_format='columnar')
+      return Response(content=encode_columnar(output), media_type=COLUMNAR_MEDIA_TYPE)
+
+    output = await analysis_pool.run_buckling_analysis(model)
+    return {
+      "status": "Buckling analysis completed successfully",
+      "output": output
+    }
+
+  except HTTPException:
+    raise
+  except Exception as e:
+    print('ERROR: ', e)
+    raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/analysis/cache")
+async def get_analysis_cache_stats():
+  """Hit/miss counters and size of the analysis result cache"""
+  return analysis_pool.cache.stats()
+
+@app.post("/analysis/jobs", status_code=202)
+async def create_analysis_job(model : dict, client_id: int = None):
+  """Starts an analysis in the background; progress is sent to the WebSocket client_id"""
+  job = analysis_jobs.submit(model, client_id)
+  return job.to_dict()
+
+@app.get("/analysis/jobs/{job_id}")
+async def get_analysis_job(job_id: str):
+  return analysis_jobs.get(job_id).to_dict()
+
+@app.delete("/analysis/jobs/{job_id}")
+async def cancel_analysis_job(job_id: str):
+  return analysis_jobs.cancel(job_id).to_dict(include_result=False)
+
 def format_section_dimensions(section: dict) -> str:
   """Format section dimensions based on section type"""
   section_type = section.get("type", "")
@@ -251,7 +360,7 @@ def format_section_dimensions(section: dict) -> str:
 @app.post("/llm-analysis")
 async def get_llm_analysis(model : dict):
   try :
-    output = run_analysis(model)
+    output = await analysis_pool.run_analysis(model)
 
     # Extract nodes and format as table
     nodes = output.get("nodes", [])
@@ -275,6 +384,8 @@ async def get_llm_analysis(model : dict):
     # Extract members and format as table
     members = output.get("members", [])
     members_table = []
+    # Envelopes over the load combinations, when the model has some
+    envelopes = {envelope["id"]: envelope for envelope in output.get("envelopes", {}).get("members", [])}
 
     for member in members:
       node_efforts = member.get("node_efforts", [])
@@ -299,7 +410,8 @@ async def get_llm_analysis(model : dict):
         jNode = None
 
       # Track min/max for each effort type
-      for effort_data in node_efforts:
+      envelope = envelopes.get(member.get("id"))
+      for effort_data in ([] if envelope else node_efforts):
         efforts = effort_data.get("efforts", {})
         for effort_type in efforts_minmax.keys():
           if effort_type in efforts:
@@ -321,6 +433,11 @@ async def get_llm_analysis(model : dict):
       for effort_type in ["N", "Vy", "T", "My", "Mz"]:
         member_row[f"-{effort_type}"] = efforts_minmax[effort_type]["min"] if efforts_minmax[effort_type]["min"] is not None else 0
         member_row[f"+{effort_type}"] = efforts_minmax[effort_type]["max"] if efforts_minmax[effort_type]["max"] is not None else 0
+        if envelope:
+          member_row[f"-{effort_type}"] = envelope[effort_type]["min"]
+          member_row[f"+{effort_type}"] = envelope[effort_type]["max"]
+          member_row[f"-{effort_type} combination"] = envelope[effort_type]["min_combination"]
+          member_row[f"+{effort_type} combination"] = envelope[effort_type]["max_combination"]
 
       members_table.append(member_row)
 
@@ -383,6 +500,8 @@ async def get_llm_analysis(model : dict):
       "boundary_conditions": boundary_conditions_table
     }
 
+  except HTTPException:
+    raise
   except Exception as e:
     print('ERROR: ', e)
     raise HTTPException(status_code=500, detail=str(e))
@@ -397,7 +516,7 @@ async def calculate_section_properties(data: dict):
 
 @app.websocket("/ws/{client_id}")
 async def websocket_endpoint(websocket: WebSocket, client_id: int):
-  await manager.connect(websocket)
+  await manager.connect(websocket, client_id)
   mcp_tools.client_connection = websocket
   try:
     while True:
@@ -1,6 +1,9 @@
 """OpenSeesPy structural analysis module"""
 
-from .main import run_analysis
+from .main import run_analysis, run_modal_analysis, run_buckling_analysis
+from .pool import AnalysisPool
+from .jobs import AnalysisJobs
+from .cache import ResultCache
 
-__all__ = ['run_analysis']
+__all__ = ['run_analysis', 'run_modal_analysis', 'run_buckling_analysis', 'AnalysisPool', 'AnalysisJobs', 'ResultCache']
 
@@ -0,0 +1,291 @@
+"""
+Result Cache
+
+This module caches analysis results by content: a model is normalized (entities
+sorted by id, targets sorted, floats formatted) and hashed, so identical
+submissions map to the same key whatever their ordering or float formatting.
+
+Results are kept in an in-memory LRU tier bounded by size, and optionally in an
+on-disk tier (one pickle file per key) that survives restarts. Both tiers keep
+the pickled results, so every hit returns a copy of its own that callers are
+free to modify. Unpickling runs
+code, so an on-disk tier only opens a directory private to the user of the
+process (see DiskStore); values that are plain data (section properties) are
+stored as JSON instead (see JsonStore).
+"""
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Bump to invalidate cached results when the analysis output changes
+CACHE_VERSION = 4
+
+ANALYSIS_CACHE_BYTES = int(os.environ.get("ANALYSIS_CACHE_BYTES", 256 * 1024 * 1024))
+ANALYSIS_CACHE_DIR = os.environ.get("ANALYSIS_CACHE_DIR")
+ANALYSIS_CACHE_DISK_BYTES = int(os.environ.get("ANALYSIS_CACHE_DISK_BYTES", 2 * 1024 * 1024 * 1024))
+
+# Model lists whose order does not matter, sorted by id
+ENTITY_LISTS = (
+    'nodes', 'members', 'materials', 'sections', 'loads', 'boundary_conditions',
+    'load_cases', 'load_combinations'
+)
+
+
+def normalize(value: Any) -> Any:
+    """Recursively normalizes a model value: floats are formatted, integral floats become ints."""
+    if isinstance(value, dict):
+        return {str(key): normalize(item) for (key, item) in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize(item) for item in value]
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        number = float(value)
+        if number.is_integer():
+            return int(number)
+        return format(number, '.12g')
+    return str(value)
+
+
+def canonical_model(model: dict) -> dict:
+    """Returns the normalized model: entities sorted by id and targets sorted."""
+    canonical = normalize(model)
+    for key in ENTITY_LISTS:
+        entities = canonical.get(key)
+        if not entities:
+            continue
+        for entity in entities:
+            if isinstance(entity, dict) and isinstance(entity.get('targets'), list):
+                entity['targets'] = sorted(entity['targets'], key=repr)
+        canonical[key] = sorted(entities, key=lambda entity: repr(entity.get('id')) if isinstance(entity, dict) else repr(entity))
+    return canonical
+
+
+def canonical_model_hash(model: dict) -> str:
+    """SHA-256 of the canonical model, used as the cache key."""
+    payload = json.dumps([CACHE_VERSION, canonical_model(model)], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LRUCache:
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None) -> None:
+        """
+        Initialize an LRU cache.
+
+        Args:
+            max_entries: Maximum number of entries (unbounded if None)
+            max_bytes: Maximum total size of the entries (unbounded if None)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def get(self, key):
+        """Returns the cached value (marking it as recently used) or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value, size: int = 0) -> None:
+        """Stores a value of the given size, evicting the least recently used entries."""
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        if key in self._entries:
+            self.bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, size)
+        self.bytes += size
+
+        while ((self.max_entries is not None and len(self._entries) > self.max_entries) or
+               (self.max_bytes is not None and self.bytes > self.max_bytes)):
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.bytes -= evicted_size
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+
+class DiskStore:
+    suffix = '.pkl'
+
+    def __init__(self, directory: str, max_bytes: Optional[int] = None) -> None:
+        """
+        Initialize an on-disk store of pickled values.
+
+        The directory is created private (mode 0700); an existing one must
+        belong to the user of the process and be writable by no one else, as
+        whoever can write its files runs code in the processes reading them.
+
+        Args:
+            directory: Directory holding one file per key
+            max_bytes: Total size above which the least recently used files are removed
+
+        Raises:
+            OSError: if the directory cannot be created or is not private
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        check_private(directory)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{self.suffix}")
+
+    def _load(self, f):
+        return pickle.load(f)
+
+    def _dump(self, value) -> bytes:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def get(self, key: str):
+        """Returns the stored value or None."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = self._load(f)
+            os.utime(path)
+            return value
+        except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+            return None
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        """Stores an already pickled value; the write is atomic for concurrent readers."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"Warning: Could not write cache entry {key}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self._prune()
+
+    def put(self, key: str, value) -> None:
+        self.put_bytes(key, self._dump(value))
+
+    def clear(self) -> None:
+        """Removes every stored value."""
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.suffix):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+    def _prune(self) -> None:
+        if self.max_bytes is None:
+            return
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.suffix):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for (_, size, _) in files)
+        for (_, size, path) in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+class JsonStore(DiskStore):
+    """On-disk store of JSON values: reading a file never runs code."""
+    suffix = '.json'
+
+    def _load(self, f):
+        return json.load(f)
+
+    def _dump(self, value) -> bytes:
+        return json.dumps(value).encode('utf-8')
+
+
+def check_private(directory: str) -> None:
+    """Raises OSError unless the directory belongs to the user of the process and only it can write to it."""
+    if not hasattr(os, 'getuid'):
+        return
+    status = os.stat(directory)
+    if status.st_uid != os.getuid() or status.st_mode & 0o022:
+        raise OSError(f"Cache directory {directory} is not private to the user of the process")
+
+
+class ResultCache:
+    def __init__(self, max_bytes: int = ANALYSIS_CACHE_BYTES, directory: Optional[str] = ANALYSIS_CACHE_DIR,
+                 disk_max_bytes: Optional[int] = ANALYSIS_CACHE_DISK_BYTES) -> None:
+        """
+        Initialize the analysis result cache.
+
+        Args:
+            max_bytes: Size of the in-memory tier, which keeps the pickled results
+            directory: Directory of the on-disk tier (disabled if None)
+            disk_max_bytes: Size of the on-disk tier
+        """
+        self.memory = LRUCache(max_bytes=max_bytes)
+        self.disk = DiskStore(directory, disk_max_bytes) if directory else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def key(self, model: dict, result_format: str = 'json') -> str:
+        """Cache key of a model; results in other formats than JSON get their own key."""
+        key = canonical_model_hash(model)
+        return key if result_format == 'json' else f"{key}-{result_format}"
+
+    def get(self, key: str):
+        """Returns a copy of the cached result for a key, or None."""
+        data = self.memory.get(key)
+        if data is not None:
+            self.hits += 1
+            return pickle.loads(data)
+
+        if self.disk is not None:
+            output = self.disk.get(key)
+            if output is not None:
+                self.disk_hits += 1
+                data = pickle.dumps(output, protocol=pickle.HIGHEST_PROTOCOL)
+                self.memory.put(key, data, len(data))
+                return output
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, output) -> None:
+        """Stores a result in both tiers."""
+        data = pickle.dumps(output, protocol=pickle.HIGHEST_PROTOCOL)
+        self.memory.put(key, data, len(data))
+        if self.disk is not None:
+            self.disk.put_bytes(key, data)
+
+    def clear(self) -> None:
+        """Drops every cached result, from both tiers."""
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict:
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "entries": len(self.memory),
+            "bytes": self.memory.bytes,
+            "max_bytes": self.memory.max_bytes,
+            "disk": self.disk.directory if self.disk is not None else None
+        }
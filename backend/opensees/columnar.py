@@ -0,0 +1,112 @@
+"""
+Columnar Results
+
+This module encodes analysis results as typed columns instead of nested JSON
+objects, for the clients that ask for it (Accept: application/vnd.buckle.columnar).
+
+The payload is a small JSON header followed by the raw little-endian column
+buffers, each aligned on 8 bytes so a browser can view it in place with a typed
+array (Float64Array, Int32Array):
+
+    magic "BKLC" | header length (uint32 LE) | header (JSON, padded) | buffers
+
+The header holds the format version, the non-columnar results ('meta': solve
+summary, units, load cases, envelopes, ...) and, for every column, its name,
+dtype, shape, byte offset (from the start of the buffers) and byte length.
+"""
+import json
+import struct
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.buckle.columnar"
+COLUMNAR_VERSION = 1
+
+MAGIC = b"BKLC"
+ALIGNMENT = 8
+
+# Column dtypes understood by the clients
+DTYPES = ('<f8', '<f4', '<i4')
+
+
+def padding(size: int) -> int:
+    return -size % ALIGNMENT
+
+
+def id_column(ids: Iterable) -> np.ndarray:
+    """Integer ids as int32 when they fit, else float64 (exact up to 2**53)."""
+    ids = np.asarray(list(ids))
+    if ids.size == 0:
+        return np.zeros(0, dtype='<i4')
+    if np.issubdtype(ids.dtype, np.integer) and ids.min() >= -2**31 and ids.max() < 2**31:
+        return ids.astype('<i4')
+    return ids.astype('<f8')
+
+
+def to_json(value):
+    """JSON fallback for the NumPy scalars and arrays of the meta results."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_columnar(output: Dict) -> bytes:
+    """
+    Encodes a columnar analysis output (see run_analysis(result_format='columnar')).
+
+    Args:
+        output: {'columns': {name: ndarray}, ...}; the other entries go to the
+            header meta
+
+    Returns:
+        bytes: the payload
+    """
+    columns = []
+    buffers = []
+    offset = 0
+    for (name, values) in output['columns'].items():
+        values = np.ascontiguousarray(values)
+        dtype = values.dtype.newbyteorder('<').str
+        if dtype not in DTYPES:
+            values = values.astype('<f8')
+            dtype = '<f8'
+        data = values.astype(dtype, copy=False).tobytes()
+        columns.append({'name': name, 'dtype': dtype, 'shape': list(values.shape), 'offset': offset, 'length': len(data)})
+        buffers.append(data + b"\0" * padding(len(data)))
+        offset += len(data) + padding(len(data))
+
+    meta = {key: value for (key, value) in output.items() if key != 'columns'}
+    header = json.dumps(
+        {'version': COLUMNAR_VERSION, 'meta': meta, 'columns': columns}, default=to_json, separators=(',', ':')
+    ).encode()
+    # Buffers start on an aligned offset: magic (4) + length (4) + header
+    header += b" " * padding(len(header))
+    return b"".join([MAGIC, struct.pack("<I", len(header)), header] + buffers)
+
+
+def decode_columnar(data: bytes) -> Tuple[Dict[str, np.ndarray], Dict]:
+    """
+    Decodes a columnar payload.
+
+    Returns:
+        tuple: (columns by name as read-only arrays viewing data, meta)
+    """
+    if data[:4] != MAGIC:
+        raise ValueError("Not a columnar analysis payload")
+    (length,) = struct.unpack("<I", data[4:8])
+    header = json.loads(data[8:8 + length])
+    if header['version'] != COLUMNAR_VERSION:
+        raise ValueError(f"Unsupported columnar version: {header['version']}")
+
+    start = 8 + length
+    columns = {
+        column['name']: np.frombuffer(
+            data, dtype=column['dtype'], count=column['length'] // np.dtype(column['dtype']).itemsize,
+            offset=start + column['offset']
+        ).reshape(column['shape'])
+        for column in header['columns']
+    }
+    return columns, header['meta']
@@ -0,0 +1,827 @@
+"""
+Direct Stiffness Engine
+
+This module solves the linear elastic frames built by run_analysis without
+OpenSees (analysis.engine 'direct'). DirectDomain takes the OpenSees commands
+that the analysis issues (nodes, elastic beam-columns and their end releases,
+zeroLength springs, fixities, equalDOF ties, Path time series and Plain load
+patterns), plus spring supports (see spring), and records them in arrays, then:
+
+- assembles the element stiffness matrices in batch with NumPy (12x12 local
+  matrices of the elastic beam-columns with their released end moments
+  condensed out, rotated to the global axes, diagonal springs in their
+  orientation, support springs on the diagonal of their node's DOFs),
+- numbers the equations once: tied DOFs share the equation of their retained
+  DOF and fixed DOFs have none,
+- builds a SciPy sparse global matrix and factors it once, each step being a
+  forward/backward solve: Cholesky of its band after reverse Cuthill-McKee
+  renumbering (as OpenSees' BandSPD with RCM) for the positive definite
+  systems, SuperLU for the general ones, or when the matrix is not positive
+  definite or its band is too large,
+- returns the node displacements, element local forces and reactions as
+  OpenSees would (nodeDisp, eleResponse('localForces'), nodeReaction), or as
+  arrays (node_displacements, local_forces, element_axes),
+- solves the lowest modes of the node masses (mass, eigen) and the lowest
+  critical load factors of the axial forces of a solve (buckling, with the
+  geometric stiffness of the beam-columns) by ARPACK on the stiffness
+  factored by SuperLU, and returns their shapes as
+  nodeEigenvector would, or as arrays (node_eigenvectors).
+
+Only the Linear geometric transformation is supported: PDelta and Corotational
+members need the OpenSees engine.
+"""
+from typing import Dict, List
+
+import numpy as np
+import scipy.linalg
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+NDF = 6
+# Smallest pivot of the factored stiffness, relative to the largest one
+PIVOT_TOLERANCE = np.finfo(float).eps
+# Largest band stored for the Cholesky factorization, past which SuperLU is used
+BAND_MAX_BYTES = 256 * 2**20
+# OpenSees systems of positive definite matrices, factored by Cholesky
+SPD_SYSTEMS = ('BandSPD', 'ProfileSPD', 'SparseSYM')
+# Local DOFs of the end moments released by '-releasez' and '-releasey' codes
+# (1: end I, 2: end J, 3: both), in 'localForces' order
+RELEASED_MOMENTS = {'-releasez': (5, 11), '-releasey': (4, 10)}
+
+
+def fixed_end_forces(loads, lengths, releases=None):
+    """
+    End forces of fixed-fixed elements under uniform loads, in the element local
+    axes and in the order of 'localForces' (N, Vy, Vz, T, My, Mz at each end).
+
+    A released end moment is carried over to the other end (half of it, as in
+    a propped cantilever) and the shears are balanced again, as OpenSees'
+    elasticBeamColumn does for its '-releasez' / '-releasey' codes.
+
+    Args:
+        loads: Uniform loads (Wy, Wz, Wx) of each element in N/m, shape (n_elements, 3)
+        lengths: Element lengths (m)
+        releases: Optional ('-releasez', '-releasey') codes of each element,
+            shape (n_elements, 2)
+
+    Returns:
+        array: shape (n_elements, 12)
+    """
+    loads = np.asarray(loads, dtype=float).reshape(-1, 3)
+    length = np.asarray(lengths, dtype=float)
+    wy, wz, wx = loads[:, 0], loads[:, 1], loads[:, 2]
+    forces = np.zeros((len(loads), 12))
+    for end in (0, 6):
+        forces[:, end] = -wx * length / 2
+        forces[:, end + 1] = -wy * length / 2
+        forces[:, end + 2] = -wz * length / 2
+    forces[:, 4] = wz * length**2 / 12
+    forces[:, 5] = -wy * length**2 / 12
+    forces[:, 10] = -forces[:, 4]
+    forces[:, 11] = -forces[:, 5]
+    if releases is None:
+        return forces
+
+    releases = np.asarray(releases, dtype=int).reshape(-1, 2)
+    # Shear at J balancing the end moments: Vy_J L = -(Mz_I + Mz_J), Vz_J L = My_I + My_J
+    for ((i, j), codes, (shear, sign)) in zip(RELEASED_MOMENTS.values(), releases.T, ((7, -1), (8, 1))):
+        moments = forces[:, [i, j]]
+        released_i = (codes & 1).astype(bool)
+        released_j = (codes & 2).astype(bool)
+        forces[:, i] = np.where(released_i, 0, np.where(released_j, moments[:, 0] - moments[:, 1] / 2, moments[:, 0]))
+        forces[:, j] = np.where(released_j, 0, np.where(released_i, moments[:, 1] - moments[:, 0] / 2, moments[:, 1]))
+        change = sign * (forces[:, i] + forces[:, j] - moments.sum(axis=1)) / length
+        forces[:, shear] += change
+        forces[:, shear - 6] -= change
+    return forces
+
+
+def beam_stiffness(properties, lengths):
+    """
+    Local stiffness matrices of elastic 3D beam-columns (no shear deformation).
+
+    Args:
+        properties: (E, A, Iz, Iy, G, J) of each element, shape (n_elements, 6)
+        lengths: Element lengths, shape (n_elements,)
+
+    Returns:
+        array: shape (n_elements, 12, 12), DOFs in 'localForces' order
+    """
+    E, A, Iz, Iy, G, J = np.asarray(properties, dtype=float).T
+    L = np.asarray(lengths, dtype=float)
+    k = np.zeros((len(L), 12, 12))
+
+    def put(i, j, value):
+        k[:, i, j] = value
+        k[:, j, i] = value
+
+    axial = E * A / L
+    torsion = G * J / L
+    for (a, b, stiffness) in ((0, 6, axial), (3, 9, torsion)):
+        put(a, a, stiffness)
+        put(b, b, stiffness)
+        put(a, b, -stiffness)
+
+    # Bending in the local xy plane (v, rz) and in the xz plane (w, ry), whose
+    # rotation has the opposite sign relative to the deflection
+    for (v, r, I, sign) in ((1, 5, Iz, 1), (2, 4, Iy, -1)):
+        EI = E * I
+        put(v, v, 12 * EI / L**3)
+        put(v + 6, v + 6, 12 * EI / L**3)
+        put(v, v + 6, -12 * EI / L**3)
+        put(v, r, sign * 6 * EI / L**2)
+        put(v, r + 6, sign * 6 * EI / L**2)
+        put(v + 6, r, -sign * 6 * EI / L**2)
+        put(v + 6, r + 6, -sign * 6 * EI / L**2)
+        put(r, r, 4 * EI / L)
+        put(r + 6, r + 6, 4 * EI / L)
+        put(r, r + 6, 2 * EI / L)
+    return k
+
+
+def condense_releases(k, releases):
+    """
+    Condenses the released end moments out of local stiffness matrices: their
+    rows and columns become zero, and the other terms are those of the element
+    with its moment free at the released ends.
+
+    Args:
+        k: Local stiffness matrices, shape (n_elements, 12, 12)
+        releases: ('-releasez', '-releasey') codes of each element, shape (n_elements, 2)
+    """
+    releases = np.asarray(releases, dtype=int).reshape(-1, 2)
+    k = k.copy()
+    for codes in np.unique(releases, axis=0):
+        dofs = [
+            dof for (moments, code) in zip(RELEASED_MOMENTS.values(), codes)
+            for (end, dof) in enumerate(moments) if code & (1 << end)
+        ]
+        if not dofs:
+            continue
+        rows = np.flatnonzero((releases == codes).all(axis=1))
+        block = k[rows]
+        coupling = block[:, :, dofs]
+        block -= coupling @ np.linalg.solve(block[:, dofs][:, :, dofs], coupling.transpose(0, 2, 1))
+        block[:, dofs] = 0
+        block[:, :, dofs] = 0
+        k[rows] = block
+    return k
+
+
+def geometric_stiffness(properties, lengths, axial):
+    """
+    Local geometric stiffness matrices of 3D beam-columns under their axial
+    forces, from the cubic deflections of the elastic stiffness (see
+    beam_stiffness), with the torsion term N Ip / (A L), Ip = Iy + Iz.
+
+    Args:
+        properties: (E, A, Iz, Iy, G, J) of each element, shape (n_elements, 6)
+        lengths: Element lengths, shape (n_elements,)
+        axial: Axial forces (N, tension positive), shape (n_elements,)
+
+    Returns:
+        array: shape (n_elements, 12, 12), DOFs in 'localForces' order
+    """
+    _, A, Iz, Iy, _, _ = np.asarray(properties, dtype=float).T
+    L = np.asarray(lengths, dtype=float)
+    N = np.asarray(axial, dtype=float)
+    kg = np.zeros((len(L), 12, 12))
+
+    def put(i, j, value):
+        kg[:, i, j] = value
+        kg[:, j, i] = value
+
+    torsion = N * (Iy + Iz) / (A * L)
+    put(3, 3, torsion)
+    put(9, 9, torsion)
+    put(3, 9, -torsion)
+
+    for (v, r, sign) in ((1, 5, 1), (2, 4, -1)):
+        put(v, v, 6 * N / (5 * L))
+        put(v + 6, v + 6, 6 * N / (5 * L))
+        put(v, v + 6, -6 * N / (5 * L))
+        put(v, r, sign * N / 10)
+        put(v, r + 6, sign * N / 10)
+        put(v + 6, r, -sign * N / 10)
+        put(v + 6, r + 6, -sign * N / 10)
+        put(r, r, 2 * N * L / 15)
+        put(r + 6, r + 6, 2 * N * L / 15)
+        put(r, r + 6, -N * L / 30)
+    return kg
+
+
+def condense_geometric(k, kg, releases):
+    """
+    Geometric stiffness matrices of elements with released end moments: the
+    released rotations follow the others as in the condensed elastic element
+    (see condense_releases), kg becoming T' kg T, and their rows and columns
+    are zero.
+
+    Args:
+        k: Local elastic stiffness matrices (not condensed), shape (n_elements, 12, 12)
+        kg: Local geometric stiffness matrices, shape (n_elements, 12, 12)
+        releases: ('-releasez', '-releasey') codes of each element, shape (n_elements, 2)
+    """
+    releases = np.asarray(releases, dtype=int).reshape(-1, 2)
+    kg = kg.copy()
+    for codes in np.unique(releases, axis=0):
+        dofs = [
+            dof for (moments, code) in zip(RELEASED_MOMENTS.values(), codes)
+            for (end, dof) in enumerate(moments) if code & (1 << end)
+        ]
+        if not dofs:
+            continue
+        rows = np.flatnonzero((releases == codes).all(axis=1))
+        block = k[rows]
+        transformation = np.repeat(np.eye(12)[np.newaxis], len(rows), axis=0)
+        transformation[:, dofs] = -np.linalg.solve(block[:, dofs][:, :, dofs], block[:, dofs])
+        transformation[:, :, dofs] = 0
+        kg[rows] = transformation.transpose(0, 2, 1) @ kg[rows] @ transformation
+    return kg
+
+
+def scatter_matrices(equations, nodes, matrices):
+    """
+    Global (row, column, value) terms of element matrices between the free
+    DOFs of their two nodes.
+
+    Args:
+        equations: Equation of every node DOF (-1 if fixed), shape (n_nodes, 6)
+        nodes: Node rows of the elements, shape (n_elements, 2)
+        matrices: Element matrices in the global axes, shape (n_elements, 12, 12)
+    """
+    element_equations = equations[nodes].reshape(-1, 2 * NDF)
+    keep = (element_equations[:, :, np.newaxis] >= 0) & (element_equations[:, np.newaxis, :] >= 0)
+    rows = np.broadcast_to(element_equations[:, :, np.newaxis], matrices.shape)[keep]
+    cols = np.broadcast_to(element_equations[:, np.newaxis, :], matrices.shape)[keep]
+    return rows, cols, matrices[keep]
+
+
+def factor_stiffness(stiffness, cholesky: bool = True):
+    """
+    Factors a symmetric stiffness matrix and returns its solve(rhs) function:
+    by Cholesky of its band if cholesky and the band allows it (see
+    factor_band), by SuperLU otherwise.
+
+    Raises:
+        LinAlgError: if the matrix is singular, or has a pivot lost in round-off
+        (a mechanism held by weak springs alone)
+    """
+    size = stiffness.shape[0]
+    if size == 0:
+        return lambda rhs: rhs
+
+    if cholesky:
+        factor = factor_band(stiffness)
+        if factor is not None:
+            return factor
+
+    try:
+        factor = spla.splu(stiffness.tocsc(), permc_spec='MMD_AT_PLUS_A')
+    except RuntimeError as e:
+        raise np.linalg.LinAlgError(str(e)) from None
+    check_pivots(np.abs(factor.U.diagonal()))
+    return factor.solve
+
+
+def factor_band(stiffness):
+    """
+    Cholesky factorization of the band of a stiffness matrix renumbered by
+    reverse Cuthill-McKee; returns its solve(rhs) function, or None if the
+    matrix is not positive definite or its band exceeds BAND_MAX_BYTES.
+    """
+    size = stiffness.shape[0]
+    order = reverse_cuthill_mckee(stiffness.tocsr(), symmetric_mode=True)
+    permuted = stiffness.tocsr()[order][:, order].tocoo()
+    bandwidth = int((permuted.col - permuted.row).max())
+    if (bandwidth + 1) * size * 8 <= BAND_MAX_BYTES:
+        # Upper band storage: band[bandwidth + i - j, j] = K[i, j]
+        upper = permuted.row <= permuted.col
+        band = np.zeros((bandwidth + 1, size))
+        band[bandwidth + permuted.row[upper] - permuted.col[upper], permuted.col[upper]] = permuted.data[upper]
+        try:
+            factor = scipy.linalg.cholesky_banded(band, overwrite_ab=True)
+        except np.linalg.LinAlgError:
+            factor = None
+        if factor is not None:
+            check_pivots(factor[-1] ** 2)
+            inverse = np.argsort(order)
+            return lambda rhs: scipy.linalg.cho_solve_banded((factor, False), rhs[order])[inverse]
+    return None
+
+
+def check_pivots(pivots):
+    """Raises LinAlgError if the smallest pivot is lost in round-off."""
+    if pivots.min() <= PIVOT_TOLERANCE * pivots.max():
+        raise np.linalg.LinAlgError("the stiffness matrix is singular")
+
+
+def block_rotation(axes, blocks):
+    """Block diagonal matrices repeating the (n, 3, 3) rotations blocks times."""
+    rotation = np.zeros((len(axes), 3 * blocks, 3 * blocks))
+    for block in range(blocks):
+        rotation[:, 3 * block:3 * block + 3, 3 * block:3 * block + 3] = axes
+    return rotation
+
+
+class DirectDomain:
+    def __init__(self) -> None:
+        """Initialize an empty domain (one per analysis)."""
+        self.wipe()
+
+    # -- Model commands ---------------------------------------------------
+
+    def wipe(self) -> None:
+        self._node_rows: Dict[int, int] = {}
+        self._node_tags: List[int] = []
+        self._coords: List[List[float]] = []
+        self._transformations: Dict[int, List[float]] = {}
+        self._sections: Dict[int, List[float]] = {}
+        self._materials: Dict[int, float] = {}
+        self._beams: Dict[int, int] = {}
+        self._beam_nodes: List[List[int]] = []
+        self._beam_properties: List[List[float]] = []
+        self._beam_vecxz: List[List[float]] = []
+        self._beam_releases: List[List[int]] = []
+        self._springs: Dict[int, int] = {}
+        self._spring_nodes: List[List[int]] = []
+        self._spring_stiffness: List[List[float]] = []
+        self._spring_axes: List[np.ndarray] = []
+        self._supports: List[int] = []
+        self._support_stiffness: List[List[float]] = []
+        self._masses: Dict[int, List[float]] = {}
+        self._fixed: List[tuple] = []
+        self._ties: List[tuple] = []
+        self._series: Dict[int, tuple] = {}
+        self._patterns: Dict[int, dict] = {}
+        self._pattern = None
+        self._structure = None
+        self._eigenvectors = None
+        self.wipeAnalysis()
+        self.reset()
+
+    def model(self, *args) -> None:
+        pass
+
+    def node(self, tag: int, *coords) -> None:
+        self._node_rows[tag] = len(self._coords)
+        self._node_tags.append(tag)
+        self._coords.append([float(value) for value in coords[:3]])
+        self._changed()
+
+    def nodeCoord(self, tag: int) -> List[float]:
+        return list(self._coords[self._node_row(tag)])
+
+    def geomTransf(self, transformation: str, tag: int, *vecxz) -> None:
+        if transformation != 'Linear':
+            raise ValueError(f"The direct engine does not support {transformation} transformations")
+        self._transformations[tag] = [float(value) for value in vecxz]
+
+    def section(self, section_type: str, tag: int, E, A, Iz, Iy, G, J) -> None:
+        if section_type != 'Elastic':
+            raise ValueError(f"The direct engine does not support {section_type} sections")
+        self._sections[tag] = [E, A, Iz, Iy, G, J]
+
+    def uniaxialMaterial(self, material_type: str, tag: int, stiffness) -> None:
+        if material_type != 'Elastic':
+            raise ValueError(f"The direct engine does not support {material_type} materials")
+        self._materials[tag] = float(stiffness)
+
+    def element(self, element_type: str, tag: int, *args) -> None:
+        if element_type == 'elasticBeamColumn':
+            (node_i, node_j, section, transformation, *options) = args
+            releases = dict(zip(options[::2], options[1::2]))
+            self._beams[tag] = len(self._beam_nodes)
+            self._beam_nodes.append([self._node_row(node_i), self._node_row(node_j)])
+            self._beam_properties.append(self._sections[section])
+            self._beam_vecxz.append(self._transformations[transformation])
+            self._beam_releases.append([int(releases.get(flag, 0)) for flag in RELEASED_MOMENTS])
+        elif element_type == 'zeroLength':
+            self._add_spring(tag, *args)
+        else:
+            raise ValueError(f"The direct engine does not support {element_type} elements")
+        self._changed()
+
+    def _add_spring(self, tag: int, node_i: int, node_j: int, *options) -> None:
+        """zeroLength element: '-mat' tags, '-dir' DOFs (1-6) and optional '-orient' x, yp."""
+        options = list(options)
+        flags = [i for (i, value) in enumerate(options) if isinstance(value, str)] + [len(options)]
+        values = {options[i]: options[i + 1:end] for (i, end) in zip(flags, flags[1:])}
+        stiffness = [0.0] * NDF
+        for (material, dof) in zip(values['-mat'], values['-dir']):
+            stiffness[int(dof) - 1] = self._materials[material]
+        axes = np.eye(3)
+        if '-orient' in values:
+            x = np.array(values['-orient'][:3], dtype=float)
+            yp = np.array(values['-orient'][3:6], dtype=float)
+            z = np.cross(x, yp)
+            y = np.cross(z, x)
+            axes = np.array([axis / np.linalg.norm(axis) for axis in (x, y, z)])
+        self._springs[tag] = len(self._spring_nodes)
+        self._spring_nodes.append([self._node_row(node_i), self._node_row(node_j)])
+        self._spring_stiffness.append(stiffness)
+        self._spring_axes.append(axes)
+
+    def spring(self, tag: int, *stiffness) -> None:
+        """Spring support: adds its stiffness (one per DOF, global axes) to the diagonal of the node's DOFs."""
+        self._supports.append(self._node_row(tag))
+        self._support_stiffness.append([float(value) for value in stiffness[:NDF]])
+        self._changed()
+
+    def mass(self, tag: int, *values) -> None:
+        self._masses[self._node_row(tag)] = [float(value) for value in values[:NDF]]
+
+    def eleNodes(self, tag: int) -> List[int]:
+        if tag in self._beams:
+            rows = self._beam_nodes[self._beams[tag]]
+        else:
+            rows = self._spring_nodes[self._springs[tag]]
+        return [self._node_tags[row] for row in rows]
+
+    def fix(self, tag: int, *flags) -> None:
+        self._fixed.append((self._node_row(tag), [bool(flag) for flag in flags[:NDF]]))
+        self._changed()
+
+    def equalDOF(self, retained: int, constrained: int, *dofs) -> None:
+        self._ties.append((self._node_row(retained), self._node_row(constrained), [int(dof) - 1 for dof in dofs]))
+        self._changed()
+
+    def timeSeries(self, series_type: str, tag: int, *args) -> None:
+        if series_type != 'Path':
+            raise ValueError(f"The direct engine does not support {series_type} time series")
+        args = list(args)
+        times = args[args.index('-time') + 1:args.index('-values')]
+        values = args[args.index('-values') + 1:]
+        self._series[tag] = (np.array(times, dtype=float), np.array(values, dtype=float))
+
+    def pattern(self, pattern_type: str, tag: int, series: int) -> None:
+        if pattern_type != 'Plain':
+            raise ValueError(f"The direct engine does not support {pattern_type} patterns")
+        self._pattern = {'series': series, 'nodes': [], 'nodal': [], 'elements': [], 'uniform': []}
+        self._patterns[tag] = self._pattern
+
+    def load(self, tag: int, *values) -> None:
+        self._pattern['nodes'].append(self._node_row(tag))
+        self._pattern['nodal'].append([float(value) for value in values[:NDF]])
+
+    def eleLoad(self, *args) -> None:
+        args = list(args)
+        if args[args.index('-type') + 1] != '-beamUniform':
+            raise ValueError("The direct engine only supports '-beamUniform' element loads")
+        elements = args[args.index('-ele') + 1:args.index('-type')]
+        wy, wz, *wx = args[args.index('-type') + 2:]
+        for tag in elements:
+            self._pattern['elements'].append(self._beams[tag])
+            self._pattern['uniform'].append([wy, wz, wx[0] if wx else 0.0])
+
+    # -- Analysis commands --------------------------------------------------
+
+    def system(self, system: str, *args) -> None:
+        self._cholesky = system in SPD_SYSTEMS
+        self._factor = None
+
+    def numberer(self, *args) -> None:
+        pass
+
+    def constraints(self, *args) -> None:
+        pass
+
+    def test(self, *args) -> None:
+        pass
+
+    def algorithm(self, *args) -> None:
+        pass
+
+    def analysis(self, *args) -> None:
+        pass
+
+    def integrator(self, integrator_type: str, increment: float, *args) -> None:
+        if integrator_type != 'LoadControl':
+            raise ValueError(f"The direct engine does not support the {integrator_type} integrator")
+        self._increment = float(increment)
+
+    def wipeAnalysis(self) -> None:
+        self._increment = 1.0
+        self._cholesky = True
+        self._factor = None
+
+    def reset(self) -> None:
+        self._time = 0.0
+        self._displacements = np.zeros((len(self._coords), NDF))
+        self._element_loads = np.zeros((len(self._beam_nodes), 3))
+        self._node_reactions = None
+
+    def setTime(self, time: float) -> None:
+        self._time = float(time)
+
+    def analyze(self, steps: int = 1) -> int:
+        """Solves steps load increments; returns 0, or -1 if the stiffness is singular."""
+        structure = self._assemble()
+        if self._factor is None:
+            try:
+                self._factor = factor_stiffness(structure['stiffness'], self._cholesky)
+            except np.linalg.LinAlgError as e:
+                print(f"Direct engine: the stiffness matrix cannot be factored ({e})")
+                return -1
+
+        for _ in range(steps):
+            self._time += self._increment
+            nodal, element_loads = self._loads(self._time)
+            equations = structure['equations']
+            free = equations >= 0
+            # Equivalent nodal loads of the element loads
+            forces = nodal - self._scatter(
+                structure, fixed_end_forces(element_loads, structure['length'], structure['releases'])
+            )
+            rhs = np.bincount(equations[free], forces[free], minlength=structure['count'])
+            solution = self._factor(rhs)
+            if not np.all(np.isfinite(solution)):
+                print("Direct engine: the stiffness matrix is singular")
+                return -1
+            self._displacements = np.zeros((len(self._coords), NDF))
+            self._displacements[free] = solution[equations[free]]
+            self._element_loads = element_loads
+            self._node_reactions = None
+        return 0
+
+    def eigen(self, *args) -> List[float]:
+        """
+        Solves the lowest eigenvalues ω² of K φ = ω² M φ (the solver options of
+        OpenSees' eigen are ignored): ARPACK in shift-invert mode about 0, each
+        iteration being a solve with the stiffness factored by SuperLU (the
+        hundreds of solves of a few dozen modes are cheaper through its sparse
+        factors than through a wide band), M being the diagonal of the node
+        masses. The mode shapes are normalized to a unit generalized mass.
+
+        Raises:
+            LinAlgError: if the stiffness cannot be factored
+        """
+        count = int(args[-1])
+        structure = self._assemble()
+        size = structure['count']
+        equations = structure['equations']
+        mass = np.zeros(size)
+        if self._masses:
+            rows = list(self._masses)
+            node_equations = equations[rows]
+            free = node_equations >= 0
+            np.add.at(mass, node_equations[free], np.array(list(self._masses.values())).reshape(-1, NDF)[free])
+        # The Krylov basis of ARPACK lies in the span of the masses
+        rank = int(np.count_nonzero(mass))
+        if count >= rank:
+            raise ValueError(f"Cannot solve {count} modes of a model with {rank} DOFs carrying mass")
+
+        factor = factor_stiffness(structure['stiffness'], False)
+        operator = spla.LinearOperator((size, size), matvec=factor, dtype=float)
+        eigenvalues, eigenvectors = spla.eigsh(
+            structure['stiffness'], k=count, M=sp.diags(mass).tocsc(), sigma=0.0, which='LM', OPinv=operator,
+            ncv=min(max(2 * count + 1, 20), rank)
+        )
+        order = np.argsort(eigenvalues)
+        self._eigenvectors = eigenvectors[:, order]
+        return eigenvalues[order].tolist()
+
+    def buckling(self, tags, axial, count: int) -> List[float]:
+        """
+        Solves the lowest critical load factors λ of (K + λ Kg) φ = 0, Kg being
+        the geometric stiffness of the beam-columns under the axial forces of a
+        reference solve (see geometric_stiffness, condense_geometric): the
+        largest eigenvalues μ = 1 / λ of -Kg φ = μ K φ, by ARPACK's Lanczos
+        iterations on K⁻¹ (-Kg) with the stiffness factored once by SuperLU.
+        Only the positive factors are returned (the buckling loads have the
+        direction of the reference loads), with their shapes as modes (see
+        node_eigenvectors).
+
+        Args:
+            tags: Beam-column tags
+            axial: Axial force of each element (N, tension positive)
+            count: Number of factors (at most the number of equations - 1)
+
+        Raises:
+            LinAlgError: if the stiffness cannot be factored
+        """
+        structure = self._assemble()
+        size = structure['count']
+        count = min(count, size - 1)
+        if count < 1:
+            raise ValueError(f"Cannot solve the buckling modes of a model with {size} equations")
+        forces = np.zeros(len(self._beam_nodes))
+        forces[[self._beams[tag] for tag in tags]] = axial
+
+        properties = np.array(self._beam_properties).reshape(-1, 6)
+        local = condense_geometric(
+            beam_stiffness(properties, structure['length']),
+            geometric_stiffness(properties, structure['length'], forces),
+            structure['releases']
+        )
+        rotation = structure['rotation']
+        (rows, cols, values) = scatter_matrices(
+            structure['equations'], structure['nodes'], rotation.transpose(0, 2, 1) @ local @ rotation
+        )
+        geometric = sp.coo_matrix((values, (rows, cols)), shape=(size, size)).tocsc()
+
+        factor = factor_stiffness(structure['stiffness'], False)
+        operator = spla.LinearOperator((size, size), matvec=factor, dtype=float)
+        inverse_factors, eigenvectors = spla.eigsh(
+            -geometric, k=count, M=structure['stiffness'], Minv=operator, which='LA'
+        )
+        # Tensile or unloaded modes (no buckling in the direction of the loads)
+        positive = inverse_factors > 1e-12 * max(np.abs(inverse_factors).max(), np.finfo(float).tiny)
+        order = np.argsort(-inverse_factors[positive])
+        self._eigenvectors = eigenvectors[:, positive][:, order]
+        return (1 / inverse_factors[positive][order]).tolist()
+
+    # -- Results -------------------------------------------------------------
+
+    def nodeDisp(self, tag: int) -> List[float]:
+        return self._displacements[self._node_row(tag)].tolist()
+
+    def eleResponse(self, tag: int, response: str):
+        if tag not in self._beams:
+            raise ValueError(f"The direct engine has no {response} response for element {tag}")
+        row = self._beams[tag]
+        if response == 'localForces':
+            return self.local_forces([tag])[0].tolist()
+        if response in ('xlocal', 'ylocal', 'zlocal'):
+            return self._assemble()['axes'][row, 'xyz'.index(response[0])].tolist()
+        if response == 'offsets':
+            return [0.0] * NDF
+        raise ValueError(f"The direct engine has no {response} response")
+
+    def reactions(self) -> None:
+        """Computes the node reactions: resisting forces of the elements and spring supports minus the nodal loads."""
+        structure = self._assemble()
+        forces = self._scatter(structure, self._beam_forces(structure))
+        springs = structure['springs']
+        if len(springs['nodes']):
+            ends = self._displacements[springs['nodes']].reshape(-1, 2 * NDF)
+            np.add.at(forces, springs['nodes'], np.einsum('eij,ej->ei', springs['stiffness'], ends).reshape(-1, 2, NDF))
+        supports = structure['supports']
+        np.add.at(forces, supports['nodes'], supports['stiffness'] * self._displacements[supports['nodes']])
+        self._node_reactions = forces - self._loads(self._time)[0]
+
+    def nodeReaction(self, tag: int) -> List[float]:
+        if self._node_reactions is None:
+            self.reactions()
+        return self._node_reactions[self._node_row(tag)].tolist()
+
+    def node_displacements(self, tags) -> np.ndarray:
+        """Displacements of the nodes, shape (n_nodes, 6)."""
+        return self._displacements[[self._node_row(tag) for tag in tags]].reshape(-1, NDF)
+
+    def nodeEigenvector(self, tag: int, mode: int) -> List[float]:
+        return self.node_eigenvectors([tag], mode)[0].tolist()
+
+    def node_eigenvectors(self, tags, mode: int) -> np.ndarray:
+        """Shape of a mode (1-based, see eigen and buckling) at the nodes, shape (n_nodes, 6)."""
+        equations = self._assemble()['equations'][[self._node_row(tag) for tag in tags]].reshape(-1, NDF)
+        vector = self._eigenvectors[:, mode - 1]
+        return np.where(equations >= 0, vector[np.maximum(equations, 0)], 0.0)
+
+    def local_forces(self, tags) -> np.ndarray:
+        """'localForces' of the elastic beam-columns, shape (n_elements, 12)."""
+        rows = [self._beams[tag] for tag in tags]
+        return self._beam_forces(self._assemble())[rows].reshape(-1, 12)
+
+    def element_axes(self, tags) -> dict:
+        """
+        End node tags (n, 2), coordinates (n, 2, 3) and local axes (n, 3, 3) of
+        the elastic beam-columns.
+        """
+        structure = self._assemble()
+        rows = [self._beams[tag] for tag in tags]
+        node_tags = np.array(self._node_tags, dtype=int)
+        nodes = structure['nodes'][rows].reshape(-1, 2)
+        return {
+            'nodes': node_tags[nodes],
+            'ecrd': np.array(self._coords).reshape(-1, 3)[nodes],
+            'g': structure['axes'][rows].reshape(-1, 3, 3),
+        }
+
+    # -- Assembly ------------------------------------------------------------
+
+    def _node_row(self, tag: int) -> int:
+        try:
+            return self._node_rows[tag]
+        except KeyError:
+            raise ValueError(f"Undefined node {tag}") from None
+
+    def _changed(self) -> None:
+        self._structure = None
+        self._factor = None
+
+    def _assemble(self) -> dict:
+        """Element matrices, equation numbering and global stiffness, built once per model."""
+        if self._structure is not None:
+            return self._structure
+
+        count = len(self._coords)
+        coords = np.array(self._coords).reshape(-1, 3)
+        if len(self._displacements) != count:
+            # Nodes were added since the last reset
+            self.reset()
+
+        # Elastic beam-columns: local axes as in LinearCrdTransf3d
+        nodes = np.array(self._beam_nodes, dtype=int).reshape(-1, 2)
+        x = coords[nodes[:, 1]] - coords[nodes[:, 0]]
+        length = np.linalg.norm(x, axis=1)
+        if np.any(length == 0):
+            raise ValueError("Member has zero length")
+        x /= length[:, np.newaxis]
+        y = np.cross(np.array(self._beam_vecxz).reshape(-1, 3), x)
+        y /= np.linalg.norm(y, axis=1)[:, np.newaxis]
+        z = np.cross(x, y)
+        axes = np.stack((x, y, z), axis=1)
+        releases = np.array(self._beam_releases, dtype=int).reshape(-1, 2)
+        local = condense_releases(beam_stiffness(np.array(self._beam_properties).reshape(-1, 6), length), releases)
+        rotation = block_rotation(axes, 4)
+        beams = rotation.transpose(0, 2, 1) @ local @ rotation
+
+        # Springs: diagonal stiffness in their orientation, between their two nodes
+        spring_nodes = np.array(self._spring_nodes, dtype=int).reshape(-1, 2)
+        spring_rotation = block_rotation(np.array(self._spring_axes).reshape(-1, 3, 3), 2)
+        diagonal = np.einsum('eji,ej,ejk->eik', spring_rotation, np.array(self._spring_stiffness).reshape(-1, NDF),
+                             spring_rotation)
+        springs = np.block([[diagonal, -diagonal], [-diagonal, diagonal]])
+
+        # Equations: tied DOFs share the equation of their retained DOF, fixed DOFs have none
+        dofs = np.arange(count * NDF).reshape(count, NDF)
+        for (retained, constrained, tied) in self._ties:
+            dofs[constrained, tied] = dofs[retained, tied]
+        fixed = np.zeros(count * NDF, dtype=bool)
+        for (row, flags) in self._fixed:
+            fixed[dofs[row][flags]] = True
+        numbers = np.cumsum(~fixed) - 1
+        equations = np.where(fixed[dofs], -1, numbers[dofs])
+        size = int((~fixed).sum()) if count else 0
+        used = np.unique(equations[equations >= 0])
+        if len(used) < size:
+            # DOFs tied to others leave unused numbers: keep them dense
+            renumber = np.full(size, -1)
+            renumber[used] = np.arange(len(used))
+            equations = np.where(equations >= 0, renumber[np.maximum(equations, 0)], -1)
+            size = len(used)
+
+        rows, cols, values = [], [], []
+        for (element_nodes, matrices) in ((nodes, beams), (spring_nodes, springs)):
+            for (terms, term) in zip((rows, cols, values), scatter_matrices(equations, element_nodes, matrices)):
+                terms.append(term)
+        # Spring supports: diagonal terms of the free DOFs of their nodes
+        support_nodes = np.array(self._supports, dtype=int)
+        support_stiffness = np.array(self._support_stiffness).reshape(-1, NDF)
+        support_equations = equations[support_nodes].reshape(-1, NDF)
+        free = support_equations >= 0
+        rows.append(support_equations[free])
+        cols.append(support_equations[free])
+        values.append(support_stiffness[free])
+
+        stiffness = sp.coo_matrix(
+            (np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))), shape=(size, size)
+        ).tocsc()
+
+        self._structure = {
+            'nodes': nodes,
+            'length': length,
+            'axes': axes,
+            'local': local,
+            'releases': releases,
+            'rotation': rotation,
+            'springs': {'nodes': spring_nodes, 'stiffness': springs},
+            'supports': {'nodes': support_nodes, 'stiffness': support_stiffness},
+            'equations': equations,
+            'count': size,
+            'stiffness': stiffness,
+        }
+        return self._structure
+
+    def _loads(self, time: float):
+        """Nodal loads (n_nodes, 6) and element uniform loads (n_beams, 3) of the patterns at a time."""
+        nodal = np.zeros((len(self._coords), NDF))
+        element_loads = np.zeros((len(self._beam_nodes), 3))
+        for pattern in self._patterns.values():
+            (times, values) = self._series[pattern['series']]
+            factor = np.interp(time, times, values, left=0.0, right=0.0)
+            if factor == 0.0:
+                continue
+            if pattern['nodes']:
+                np.add.at(nodal, pattern['nodes'], factor * np.array(pattern['nodal']).reshape(-1, NDF))
+            if pattern['elements']:
+                np.add.at(element_loads, pattern['elements'], factor * np.array(pattern['uniform'], dtype=float))
+        return nodal, element_loads
+
+    def _beam_forces(self, structure: dict) -> np.ndarray:
+        """Local end forces of the beam-columns, their fixed-end forces included."""
+        ends = self._displacements[structure['nodes']].reshape(-1, 2 * NDF)
+        forces = (structure['local'] @ (structure['rotation'] @ ends[:, :, np.newaxis]))[:, :, 0]
+        if self._element_loads.any():
+            forces += fixed_end_forces(self._element_loads, structure['length'], structure['releases'])
+        return forces
+
+    def _scatter(self, structure: dict, forces: np.ndarray) -> np.ndarray:
+        """Sums local end forces of the beam-columns (n_beams, 12) at their nodes in the global axes."""
+        nodal = np.zeros((len(self._coords), NDF))
+        if len(forces):
+            global_forces = np.einsum('eji,ej->ei', structure['rotation'], forces)
+            np.add.at(nodal, structure['nodes'], global_forces.reshape(-1, 2, NDF))
+        return nodal
@@ -0,0 +1,132 @@
+"""
+Envelopes
+
+This module computes min/max envelopes over load combinations with NumPy
+reductions: section forces per member over a (combinations x stations x 6) array
+and displacements per node over a (combinations x nodes x 6) array, together with
+the combination governing each extreme.
+"""
+from typing import Dict, List
+
+import numpy as np
+
+FORCES = ['N', 'Vy', 'Vz', 'T', 'My', 'Mz']
+DISPLACEMENTS = ['ux', 'uy', 'uz', 'rx', 'ry', 'rz']
+
+
+def element_station_forces(forces: np.ndarray, loads: np.ndarray, elements: np.ndarray,
+                           stations: np.ndarray, scale: float = 1E-3, components: List[int] = None) -> np.ndarray:
+    """
+    Section forces at stations along the elements, in kN and kNm.
+
+    Integrates the element end forces and the '-beamUniform' element loads
+    along the local x axis: N, T and My are taken opposite to the end I forces,
+    so that they read as the forces of the part beyond the station. This is the
+    one implementation of the station forces: the diagrams, envelopes and
+    columnar results all use it.
+
+    Args:
+        forces: Element local forces, shape (..., n_elements, 12)
+        loads: Element uniform loads (Wy, Wz, Wx), shape (..., n_elements, 3)
+        elements: Element of each station, shape (n_stations,)
+        stations: Local x of each station, shape (n_stations,)
+        scale: Factor applied to the forces in N and Nm (1 keeps them in N and Nm)
+        components: Indices in FORCES of the forces to compute (all six by default)
+
+    Returns:
+        ndarray: shape (..., n_stations, len(components))
+    """
+    x = stations
+
+    def force(i):
+        return forces[..., elements, i]
+
+    def load(i):
+        return loads[..., elements, i]
+
+    # Only the end forces and loads a requested component depends on are gathered
+    formulas = [
+        lambda: -force(0) - load(2) * x,
+        lambda: force(1) + load(0) * x,
+        lambda: force(2) + load(1) * x,
+        lambda: -force(3),
+        lambda: -force(4) - force(2) * x - 0.5 * load(1) * x**2,
+        lambda: -force(5) + force(1) * x + 0.5 * load(0) * x**2,
+    ]
+    if components is None:
+        components = range(len(FORCES))
+    shape = (*np.broadcast_shapes(forces.shape[:-2], loads.shape[:-2]), len(x), 0)
+    if not len(components):
+        return np.zeros(shape)
+    return np.stack([formulas[c]() for c in components], axis=-1) * scale
+
+
+def envelope(values: np.ndarray, combination_ids: List, decimals: int) -> tuple:
+    """
+    Min/max over the combinations of a (combinations x items x components) array.
+
+    Returns:
+        tuple: (min, max, min_combination, max_combination) nested lists of
+        shape (items, components)
+    """
+    ids = np.asarray(combination_ids)
+    argmin = values.argmin(axis=0)
+    argmax = values.argmax(axis=0)
+    minimum = np.take_along_axis(values, argmin[np.newaxis], axis=0)[0].round(decimals)
+    maximum = np.take_along_axis(values, argmax[np.newaxis], axis=0)[0].round(decimals)
+    return minimum.tolist(), maximum.tolist(), ids[argmin].tolist(), ids[argmax].tolist()
+
+
+def compute_envelopes(combination_ids: List, node_ids: List, displacements: np.ndarray,
+                      member_ids: List, member_stations: np.ndarray, station_forces: np.ndarray) -> Dict:
+    """
+    Computes the envelopes of node displacements and member section forces.
+
+    Args:
+        combination_ids: Id of each combination
+        node_ids: Id of each node
+        displacements: Node displacements, shape (combinations, nodes, 6)
+        member_ids: Id of each member
+        member_stations: Index of the first station of each member; the
+            stations of a member are contiguous
+        station_forces: Section forces, shape (combinations, stations, 6)
+
+    Returns:
+        dict: {'nodes': [{'id', 'ux': {...}, ...}], 'members': [{'id', 'N': {...}, ...}]}
+        where each component holds min, max and the governing combinations
+    """
+    results = {}
+
+    # Extremes over the stations of each member, then over the combinations
+    member_min = np.minimum.reduceat(station_forces, member_stations, axis=1)
+    member_max = np.maximum.reduceat(station_forces, member_stations, axis=1)
+    minimum, _, min_combination, _ = envelope(member_min, combination_ids, 2)
+    _, maximum, _, max_combination = envelope(member_max, combination_ids, 2)
+    results['members'] = [
+        {'id': member_id, **{
+            force: {
+                'min': minimum[m][c],
+                'max': maximum[m][c],
+                'min_combination': min_combination[m][c],
+                'max_combination': max_combination[m][c]
+            }
+            for (c, force) in enumerate(FORCES)
+        }}
+        for (m, member_id) in enumerate(member_ids)
+    ]
+
+    minimum, maximum, min_combination, max_combination = envelope(displacements, combination_ids, 5)
+    results['nodes'] = [
+        {'id': node_id, **{
+            component: {
+                'min': minimum[n][c],
+                'max': maximum[n][c],
+                'min_combination': min_combination[n][c],
+                'max_combination': max_combination[n][c]
+            }
+            for (c, component) in enumerate(DISPLACEMENTS)
+        }}
+        for (n, node_id) in enumerate(node_ids)
+    ]
+
+    return results
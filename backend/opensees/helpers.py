@@ -1,43 +1,183 @@
+import hashlib
+import json
 import math
-from typing import Dict, Union
+import os
+import tempfile
+from typing import Dict, Optional, Union
 from .sections import ISection, HollowCircularSection, RectangularSection
+from .sections import analytic
+from .sections.catalog import profile_properties
+from .cache import LRUCache, JsonStore
 
 mm = 1E-3
-def compute_section_properties(section: Dict) -> Dict[str, float]:
+
+SECTION_CACHE_SIZE = int(os.environ.get("SECTION_CACHE_SIZE", 1024))
+# Shared by every worker process, private to the user running them (JSON files,
+# see cache.JsonStore); set SECTION_CACHE_DIR to an empty string to disable it
+SECTION_CACHE_DIR = os.environ.get(
+    "SECTION_CACHE_DIR", os.path.join(tempfile.gettempdir(), f"buckle-sections-{getattr(os, 'getuid', lambda: 0)()}")
+)
+SECTION_CACHE_DISK_BYTES = int(os.environ.get("SECTION_CACHE_DISK_BYTES", 64 * 1024 * 1024))
+
+# Dimensions identifying each section type (in mm)
+SECTION_DIMENSIONS = {
+    "Rectangular": ("width", "height"),
+    "Circular": ("diameter",),
+    "HollowCircular": ("diameter", "thickness"),
+    "I": ("depth", "width", "tw", "tf", "r"),
+}
+
+# Optional dimensions, 0 when missing
+OPTIONAL_DIMENSIONS = ("r",)
+
+# auto: closed form unless the geometry has no closed form (filleted I-sections)
+# fast: always closed form (fillets ignored)
+# accurate: FE analysis unless the closed form is exact (rectangles and circles)
+SECTION_METHODS = ("auto", "fast", "accurate")
+
+section_cache = LRUCache(max_entries=SECTION_CACHE_SIZE)
+section_store = None
+
+
+def get_dimension(section: Dict, name: str) -> float:
+    if name in OPTIONAL_DIMENSIONS:
+        return float(section.get(name) or 0)
+    return float(section[name])
+
+
+def get_section_method(section: Dict, method: Optional[str] = None) -> str:
+    """Returns the evaluation method of a section: its own, else the requested one, else auto."""
+    method = section.get("method") or method or "auto"
+    if method not in SECTION_METHODS:
+        raise ValueError(f"Unknown section property method: {method}")
+    return method
+
+
+def uses_fe_analysis(section: Dict, method: str) -> bool:
+    """Whether a section is evaluated by FE analysis rather than in closed form."""
     type = section["type"]
+    if type in ("Rectangular", "Circular", "HollowCircular"):
+        return False
+    if method == "fast":
+        return False
+    if method == "accurate":
+        return True
+    return get_dimension(section, "r") > 0
+
+
+def section_key(section: Dict, method: Optional[str] = None) -> str:
+    """Memoization key of a section: (type, rounded dimensions, material, evaluator)."""
+    type = section["type"]
+    if type not in SECTION_DIMENSIONS:
+        raise ValueError(f"Unknown section type: {type}")
+    method = get_section_method(section, method)
     material = section['material']
-    E = material['E']
-    nu = material['nu']
-    G_mod = E / (2 * (1 + nu))  # Shear modulus
+    key = [
+        type,
+        [round(get_dimension(section, name), 6) for name in SECTION_DIMENSIONS[type]],
+        [round(float(material['E']), 6), round(float(material['nu']), 9)],
+        'fe' if uses_fe_analysis(section, method) else 'analytic'
+    ]
+    return hashlib.sha1(json.dumps(key).encode('utf-8')).hexdigest()
+
+
+def get_section_store():
+    """Returns the on-disk section property store, or None if disabled."""
+    global section_store
+    if section_store is None and SECTION_CACHE_DIR:
+        try:
+            section_store = JsonStore(SECTION_CACHE_DIR, SECTION_CACHE_DISK_BYTES)
+        except OSError as e:
+            print(f"Warning: Section property store disabled: {e}")
+            section_store = False
+    return section_store or None
+
+
+def compute_section_properties(section: Dict, method: Optional[str] = None) -> Dict[str, float]:
+    """
+    Returns the properties (E, G_mod, A, Iz, Iy, Jxx) of a section.
+
+    Standard shapes are evaluated in closed form; the FE analysis is only run
+    when the method requires it (see SECTION_METHODS). The section's own
+    'method' takes precedence over the requested one.
+
+    Sections referencing a standard profile 'designation' (e.g. "IPE200") are
+    read from the precomputed catalog.
+
+    Results are memoized in a process-wide LRU and in an on-disk store shared
+    by the worker processes, so a given section is only meshed once.
+    """
+    if section.get('designation'):
+        return material_properties(section['material'], *profile_properties(section['designation']))
+
+    method = get_section_method(section, method)
+    key = section_key(section, method)
+    properties = section_cache.get(key)
+    if properties is None:
+        store = get_section_store()
+        properties = store.get(key) if store else None
+        if properties is None:
+            properties = evaluate_section_properties(section, uses_fe_analysis(section, method))
+            if store:
+                store.put(key, properties)
+        section_cache.put(key, properties)
+    return dict(properties)
+
+
+def evaluate_section_properties(section: Dict, fe: bool = False) -> Dict[str, float]:
+    """
+    Computes the properties of a section.
+
+    Args:
+        section: Section definition (dimensions in mm)
+        fe: Run the sectionproperties FE analysis instead of the closed-form
+            evaluation (meshed shapes only)
+    """
+    type = section["type"]
 
     if type == "Rectangular":
         b = section["width"] * mm
         h = section["height"] * mm
-        rectangular_section = RectangularSection(b, h)
-        A, Iz, Iy, Jxx = rectangular_section.geometric_properties()
+        if fe:
+            A, Iz, Iy, Jxx = RectangularSection(b, h).geometric_properties()
+        else:
+            A, Iz, Iy, Jxx = analytic.rectangular_properties(b, h)
 
     elif type == "Circular":
         d = section["diameter"]
-        A = math.pi * (d**2) / 4
-        Iz = Iy = (math.pi * d**4) / 64
-        Jxx = (math.pi * d**4) / 32
+        A, Iz, Iy, Jxx = analytic.circular_properties(d)
 
     elif type == "HollowCircular":
         d = section["diameter"] * mm
         t = section["thickness"] * mm
-        hollow_circular_section = HollowCircularSection(d,t)
-        A, Iz, Iy, Jxx = hollow_circular_section.geometric_properties()
+        if fe:
+            A, Iz, Iy, Jxx = HollowCircularSection(d, t).geometric_properties()
+        else:
+            A, Iz, Iy, Jxx = analytic.hollow_circular_properties(d, t)
+
     elif type == "I":
         h = section['depth'] * mm
         b = section['width'] * mm
         t_w = section['tw'] * mm
         t_f = section['tf'] * mm
-        i_section = ISection(h, b, t_f, t_w )
-        A, Iz, Iy, Jxx = i_section.geometric_properties()
-        
+        if fe:
+            r = get_dimension(section, 'r') * mm
+            A, Iz, Iy, Jxx = ISection(h, b, t_f, t_w, r).geometric_properties()
+        else:
+            A, Iz, Iy, Jxx = analytic.i_section_properties(h, b, t_f, t_w)
+
     else:
         raise ValueError(f"Unknown section type: {type}")
 
+    return material_properties(section['material'], A, Iz, Iy, Jxx)
+
+
+def material_properties(material: Dict, A: float, Iz: float, Iy: float, Jxx: float) -> Dict[str, float]:
+    """Combines the material and the geometric properties of a section."""
+    E = material['E']
+    nu = material['nu']
+    G_mod = E / (2 * (1 + nu))  # Shear modulus
+
     return {
         "E": E,
         "G_mod": G_mod,
@@ -0,0 +1,72 @@
+"""
+Model Index
+
+This module keeps the lookup tables of an analysis, built once and shared by
+meshing, load application and result extraction instead of scanning the node
+and member lists:
+
+- model nodes, members and sections by id,
+- output nodes by id (model and mesh nodes) with their rows and OpenSees tags,
+- output members by id, and the element tags of their meshes in output order
+  with the row of every element, its release code and the first element row
+  of every member,
+- the hinges (nodes held by released member ends alone) and the (node i,
+  node j, axis) of the released elements ending at a hinge,
+- supported nodes with the tags of the fixed nodes carrying their reactions
+  and the stiffness of their springs, the (node tag, fixed DOFs) of the fixed
+  supports and restrained hinges, and the shared ground node, spring
+  materials (by stiffness) and elements of the elastic supports,
+- the geometry of the elements, read from the domain once.
+"""
+from typing import Dict, Hashable, List, Optional, Tuple
+
+
+class ModelIndex:
+    def __init__(self, model: dict) -> None:
+        """Index the nodes, members and sections of a model (one per analysis)."""
+        self.nodes = {node['id']: node for node in model['nodes']}
+        self.members = {member['id']: member for member in model['members']}
+        self.sections = {section['id']: section for section in model['sections']}
+
+        self.output_nodes: Dict[Hashable, int] = {}
+        self.node_tags: List[int] = []
+        self.output_members: Dict[Hashable, dict] = {}
+        self.elements: List[int] = []
+        self.element_rows: Dict[int, int] = {}
+        self.member_rows: List[int] = []
+        self.releases: List[int] = []
+        self.hinges: List[int] = []
+        self.released: List[Tuple[int, int, List[float]]] = []
+        self.supports: Dict[Hashable, List[int]] = {}
+        self.fixities: List[Tuple[int, List[int]]] = []
+        self.springs: Dict[Hashable, List[float]] = {}
+        self.ground: Optional[int] = None
+        self.spring_materials: Dict[float, int] = {}
+        self.spring_elements: List[int] = []
+        self.geometry: Optional[dict] = None
+
+    def add_node(self, node: dict, tag: int) -> None:
+        """Registers the next output node and its tag."""
+        self.output_nodes[node['id']] = len(self.node_tags)
+        self.node_tags.append(tag)
+
+    def add_member(self, member: dict, releases: Optional[List[int]] = None) -> None:
+        """Registers the next output member and the elements of its mesh, with their release codes."""
+        self.output_members[member['id']] = member
+        self.member_rows.append(len(self.elements))
+        for child in member['mesh']['members']:
+            self.element_rows[child['id']] = len(self.elements)
+            self.elements.append(child['id'])
+        self.releases.extend(releases or [0] * len(member['mesh']['members']))
+
+    def add_support(self, node_id: Hashable, tag: Optional[int] = None) -> None:
+        """Registers a supported node, and a fixed node tag carrying (part of) its reactions."""
+        tags = self.supports.setdefault(node_id, [])
+        if tag is not None:
+            tags.append(tag)
+
+    def add_spring(self, node_id: Hashable, stiffness: List[float]) -> None:
+        """Registers the spring stiffness (one per DOF) of an elastic support."""
+        self.add_support(node_id)
+        total = self.springs.setdefault(node_id, [0.0] * len(stiffness))
+        self.springs[node_id] = [a + b for (a, b) in zip(total, stiffness)]
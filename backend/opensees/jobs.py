@@ -0,0 +1,165 @@
+"""
+Analysis Jobs
+
+This module runs analyses as background jobs on the worker pool. A job is created
+immediately and returns an id; its status, progress and results are polled later,
+and every progress event is forwarded to an optional notify coroutine (used to
+stream progress over the WebSocket of the client that submitted the job).
+"""
+import asyncio
+import time
+import uuid
+from typing import Dict, Optional
+
+from fastapi import HTTPException
+
+from .pool import AnalysisPool
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED = (COMPLETED, FAILED, CANCELLED)
+
+
+class AnalysisJob:
+    def __init__(self, client_id: Optional[int] = None) -> None:
+        """
+        Initialize a queued job.
+
+        Args:
+            client_id: WebSocket client receiving the progress events
+        """
+        self.id = uuid.uuid4().hex
+        self.client_id = client_id
+        self.status = QUEUED
+        self.progress = None
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.task = None
+        # Whether the job holds a reserved slot of the pool (see AnalysisJobs.submit)
+        self.reserved = False
+
+    def to_dict(self, include_result: bool = True) -> Dict:
+        """Serializes the job status (and its results once completed)."""
+        job = {
+            "job_id": self.id,
+            "status": self.status,
+            "progress": self.progress,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+        if self.error is not None:
+            job["error"] = self.error
+        if include_result and self.status == COMPLETED:
+            job["output"] = self.result
+        return job
+
+
+class AnalysisJobs:
+    def __init__(self, pool: AnalysisPool, notify=None, max_finished: int = 256) -> None:
+        """
+        Initialize the job registry.
+
+        Args:
+            pool: Worker pool running the analyses
+            notify: Optional coroutine notify(job, event) called for every event
+            max_finished: Number of finished jobs kept before the oldest are dropped
+        """
+        self.pool = pool
+        self.notify = notify
+        self.max_finished = max_finished
+        self.jobs: Dict[str, AnalysisJob] = {}
+
+    def submit(self, model: dict, client_id: Optional[int] = None) -> AnalysisJob:
+        """
+        Creates a job and schedules its analysis.
+
+        The job takes its slot of the pool right away, so a burst of jobs is
+        rejected here rather than failing once they start.
+
+        Raises:
+            HTTPException: 503 when the worker pool is saturated
+        """
+        self.pool.reserve()
+        job = AnalysisJob(client_id)
+        job.reserved = True
+        self.jobs[job.id] = job
+        job.task = asyncio.create_task(self._run(job, model))
+        # A job cancelled before it started gives its slot back
+        job.task.add_done_callback(lambda _: self._unreserve(job))
+        self._prune()
+        return job
+
+    def get(self, job_id: str) -> AnalysisJob:
+        """Returns a job or raises a 404."""
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Analysis job '{job_id}' not found")
+        return job
+
+    def cancel(self, job_id: str) -> AnalysisJob:
+        """
+        Cancels a job.
+
+        A queued job never reaches a worker. A running job cannot be interrupted
+        inside OpenSees, so its worker finishes the solve and the result is
+        discarded; its slot of the pool stays taken until then (see
+        AnalysisPool.submit), so cancelling jobs does not go beyond capacity.
+        """
+        job = self.get(job_id)
+        if job.status not in FINISHED:
+            job.task.cancel()
+            self._finish(job, CANCELLED)
+        return job
+
+    async def _run(self, job: AnalysisJob, model: dict) -> None:
+        def on_progress(phase: str, data: dict):
+            if job.status in FINISHED:
+                return
+            job.status = RUNNING
+            job.progress = {"phase": phase, **data}
+            self._emit(job, {"phase": phase, **data})
+
+        try:
+            # Hand the reserved slot over: run_analysis takes it in submit()
+            # before it awaits anything
+            self._unreserve(job)
+            result = await self.pool.run_analysis(model, on_progress)
+        except asyncio.CancelledError:
+            return
+        except HTTPException as e:
+            job.error = e.detail
+            self._finish(job, FAILED)
+            return
+        except Exception as e:
+            job.error = str(e)
+            self._finish(job, FAILED)
+            return
+
+        if job.status not in FINISHED:
+            job.result = result
+            self._finish(job, COMPLETED)
+
+    def _unreserve(self, job: AnalysisJob) -> None:
+        if job.reserved:
+            job.reserved = False
+            self.pool.unreserve()
+
+    def _finish(self, job: AnalysisJob, status: str) -> None:
+        job.status = status
+        job.finished_at = time.time()
+        self._emit(job, {"phase": status})
+
+    def _emit(self, job: AnalysisJob, event: dict) -> None:
+        if self.notify is not None:
+            asyncio.ensure_future(self.notify(job, event))
+
+    def _prune(self) -> None:
+        finished = [job for job in self.jobs.values() if job.status in FINISHED]
+        for job in sorted(finished, key=lambda job: job.finished_at)[:max(0, len(finished) - self.max_finished)]:
+            del self.jobs[job.id]
@@ -0,0 +1,85 @@
+"""
+Load Cases and Combinations
+
+This module groups the model loads into load cases and computes factored load
+combinations. All cases are solved against a single stiffness factorization,
+and combinations are obtained by linear superposition of the per-case results
+(node displacements and element local forces), without any further solve.
+"""
+from typing import Dict, List
+
+import numpy as np
+
+DEFAULT_CASE = {'id': 1, 'name': 'Default'}
+
+
+def get_load_cases(model: dict) -> List[Dict]:
+    """
+    Returns the load cases of the model with their loads.
+
+    Loads without a 'case' belong to the first load case. A model without load
+    cases has a single default case holding every load.
+
+    Returns:
+        list: [{'id', 'name', 'loads'}] in the order they are solved
+    """
+    cases = [
+        {'id': case['id'], 'name': case.get('name'), 'loads': []}
+        for case in (model.get('load_cases') or [])
+    ] or [{**DEFAULT_CASE, 'loads': []}]
+    cases_by_id = {case['id']: case for case in cases}
+
+    for load in model.get('loads', []):
+        case_id = load.get('case')
+        if case_id is None:
+            cases[0]['loads'].append(load)
+        elif case_id in cases_by_id:
+            cases_by_id[case_id]['loads'].append(load)
+        else:
+            raise ValueError(f"Load {load.get('id')} references undefined load case {case_id}")
+
+    return cases
+
+
+def get_load_combinations(model: dict, cases: List[Dict]) -> List[Dict]:
+    """
+    Returns the load combinations with their factors as an array over the cases.
+
+    Returns:
+        list: [{'id', 'name', 'factors', 'weights'}] where weights[k] is the
+        factor applied to cases[k]
+    """
+    index = {case['id']: k for (k, case) in enumerate(cases)}
+    combinations = []
+
+    for combination in model.get('load_combinations') or []:
+        weights = np.zeros(len(cases))
+        for (case_id, factor) in combination['factors'].items():
+            # JSON object keys are strings
+            case_id = int(case_id)
+            if case_id not in index:
+                raise ValueError(f"Load combination {combination['id']} references undefined load case {case_id}")
+            weights[index[case_id]] = factor
+
+        combinations.append({
+            'id': combination['id'],
+            'name': combination.get('name'),
+            'factors': {case_id: factor for (case_id, factor) in combination['factors'].items()},
+            'weights': weights
+        })
+
+    return combinations
+
+
+def combine_states(states: List[Dict], weights: np.ndarray) -> Dict:
+    """
+    Superposes solve states: sum(weights[k] * states[k]) for every result array.
+
+    Args:
+        states: Per-case states, dicts of arrays with identical shapes
+        weights: Factor of each state
+    """
+    return {
+        key: np.tensordot(weights, np.stack([state[key] for state in states]), axes=1)
+        for key in states[0]
+    }
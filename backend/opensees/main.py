@@ -6,21 +6,76 @@ os.environ['FOR_DISABLE_CONSOLE_CTRL_HANDLER'] = '1'
 from pydantic import BaseModel
 from typing import List
 import math
-import openseespy.opensees as ops
+import time
+import io
+import contextlib
+import sys
+import openseespy.opensees as openseespy
 import uvicorn
 from fastapi import FastAPI, HTTPException
-import random
 from .helpers import compute_section_properties
+from .load_cases import get_load_cases, get_load_combinations, combine_states
+from .envelopes import compute_envelopes, element_station_forces, FORCES
+from .meshing import plan_meshes, member_length, NONLINEAR_TRANSFORMATIONS
+from .tags import TagAllocator
+from .index import ModelIndex
+from .session import AnalysisSession, snapshot
+from .columnar import id_column
+from .direct import DirectDomain, fixed_end_forces
+from .solvers import BAND_SOLVER, choose_solvers, estimate_bandwidth
+from .modal import (DIRECTIONS, MODAL_MIN_SEGMENTS, SHAPE_DECIMALS, display_rows, effective_masses, get_density,
+                    get_modal_options, lumped_masses, periods, scale_shape)
 import numpy as np
+import scipy.linalg
+import scipy.sparse
+import scipy.sparse.csgraph
+import scipy.sparse.linalg
 import json
 from .settings import *
 # Export public API
-__all__ = ['run_analysis']
+__all__ = ['run_analysis', 'run_modal_analysis', 'run_buckling_analysis']
 
 
 mm = 1E-3
 m = 1 
 
+# Spacing of the section force diagram stations along loaded elements
+DIAGRAM_STATION_SPACING = 0.5
+# Number of nodes or members per streamed result chunk
+RESULT_CHUNK_SIZE = int(os.environ.get('ANALYSIS_CHUNK_SIZE', 500))
+# Scale of the section force diagrams (m per N or Nm)
+DIAGRAM_SCALE = 1E-5
+# Local axis along which each section force (FORCES order) is drawn, and its sign
+DIAGRAM_DIRECTIONS = [1, 1, 2, 1, 2, 1]
+DIAGRAM_SIGNS = np.array([1, 1, 1, 1, 1, -1])
+FORCE_UNITS = {'N': 'kN', 'Vy': 'kN', 'Vz': 'kN', 'T': 'kNm', 'My': 'kNm', 'Mz': 'kNm'}
+
+# Result fields that can be requested (analysis.output.fields), and the default ones
+RESULT_FIELDS = ('displacements', 'efforts', 'diagrams', 'reactions')
+DEFAULT_RESULT_FIELDS = ('displacements', 'efforts', 'diagrams')
+REACTIONS = ['Fx', 'Fy', 'Fz', 'Mx', 'My', 'Mz']
+
+# '-releasez' / '-releasey' codes of the member releases (1: end I, 2: end J)
+RELEASE_CODES = {'pinned-fixed': 1, 'fixed-pinned': 2, 'pinned-pinned': 3}
+# Free hinge rotations (see restrain_hinges): eigenvalue tolerance, relative to
+# the largest term of their matrix, and size of the groups solved dense
+HINGE_TOLERANCE = 1e-9
+HINGE_DENSE_SIZE = 240
+
+# Fewest elements per member of a buckling analysis: the cubic deflections
+# of the geometric stiffness put the critical load of a single element 22 %
+# high (pinned column), of four 0.05 %
+BUCKLING_MIN_SEGMENTS = int(os.environ.get('ANALYSIS_BUCKLING_MIN_SEGMENTS', 4))
+
+# Session whose model is built in the OpenSees domain of this process, if any
+resident_session = None
+
+# Solvers of the analysis (analysis.engine): OpenSees, or the NumPy/SciPy
+# direct stiffness engine for linear elastic frames (see direct.py)
+ENGINES = ('opensees', 'direct')
+# Domain the commands of the current analysis go to
+ops = openseespy
+
 def print_model_for_inspection(model: dict):
     """Prints the full model data in a readable format for debugging."""
     print("\n" + "="*80)
@@ -51,67 +106,131 @@ def print_model_for_inspection(model: dict):
     print(json.dumps(model.get('loads', []), indent=2, default=str))
     print("\n" + "="*80 + "\n")
 
-def run_analysis(model: dict):
+def report_progress(progress, phase: str, **data):
+    """Sends a progress event for an analysis phase, if a callback was given."""
+    if progress:
+        progress(phase, **data)
+
+def run_analysis(model: dict, progress=None, result_format='json', session: AnalysisSession = None):
+  """
+  Runs a static analysis of the model and returns the output dict.
+
+  progress is an optional callable progress(phase, **data) notified after each
+  phase (nodes, transformations, sections, members, boundary_conditions, loads,
+  solve steps and results).
+
+  When the model defines load_cases / load_combinations, every case is solved
+  against one stiffness factorization and the results of each case and
+  combination are returned in output['load_cases'] / output['load_combinations'].
+  The top-level nodes and members then hold the first combination (or the first
+  case when there is no combination).
+
+  With result_format='columnar', the results are returned as arrays in
+  output['columns'] (see extract_columns and columnar.py) instead of the
+  nested nodes and members. With result_format='ndjson', they are sent in
+  chunks as 'chunk' progress events while they are extracted (see
+  stream_results) and the output only holds the summary.
+
+  analysis.engine selects the solver (see get_engine): the model is built and
+  the results read the same way with both.
+
+  With a session (see session.py), the domain is kept once solved and the next
+  submission of the session only applies its changes (see update_model);
+  output['analysis']['update'] tells whether the model was rebuilt, its
+  structure updated ('structure') or only its loads ('loads', solved against
+  the previous factorization).
+  """
+  global resident_session
   try:
-    global output
-    output = {}
+    global output, tags, index, result_options, ops
     output = {}
-    output['nodes'] = []
-    output['members'] = []
-    nodes = model['nodes']
+    result_options = get_output_options(model)
+    engine = get_engine(model)
+    ops = DirectDomain() if engine == 'direct' else openseespy
     members = model['members']
-    # materials = model['materials']
-    sections = model['sections']
     loads = model['loads']
-    boundary_conditions = model['boundary_conditions']
-    
-    # print("[ANALYSIS] Starting structural analysis...", model)
-    
-    # Initialize
-    init()
-    print(f"[ANALYSIS] ✓ Model initialized (3D, 6 DOF per node)")
-    
-    # Create nodes
-    create_nodes(nodes)
-    print(f"[ANALYSIS] ✓ Created {len(nodes)} nodes")
-
-    # Create transformation for beam-column elements
-    create_geometric_transformation(members)
-    print(f"[ANALYSIS] ✓ Created geometric transformations for {len(members)} members")
-
-    # Create sections 
-    create_sections(sections)
-    print(f"[ANALYSIS] ✓ Created {len(sections)} sections")
-    
-    # Create elements
-    create_members(members)
-    print(f"[ANALYSIS] ✓ Created elements (discretized members)")
+    meshes = plan_meshes(model)
+
+    changes = None
+    if session is not None:
+      model_snapshot = snapshot(model)
+      if resident_session is session:
+        changes = session.diff(model_snapshot, meshes)
+
+    if changes is None:
+      # print("[ANALYSIS] Starting structural analysis...", model)
+      build_model(model, meshes, progress)
+      update = 'rebuild'
+    else:
+      tags = session.tags
+      index = session.index
+      output['nodes'] = [dict(node) for node in session.nodes]
+      output['members'] = [dict(member) for member in session.members]
+      update_model(model, changes, session.num_cases)
+      structural = changes['sections'] or changes['members'] or changes['boundary_conditions']
+      update = 'structure' if structural else 'loads'
+      print(f"[ANALYSIS] ✓ Updated the session model ({update})")
+
+    if session is not None:
+      # Output nodes and members before any result is added to them
+      skeleton = ([dict(node) for node in output['nodes']], [dict(member) for member in output['members']])
 
-    # Apply boundary conditions
-    apply_boundary_conditions(boundary_conditions)
-    print(f"[ANALYSIS] ✓ Applied boundary conditions to {len(boundary_conditions)} constraint(s)")
-    
     # Apply loads
-    apply_loads(loads)
-    print(f"[ANALYSIS] ✓ Applied {len(loads)} load case(s)")
+    cases = get_load_cases(model)
+    combinations = get_load_combinations(model, cases)
+    # Session models keep their analysis: loads are applied as nodal loads
+    equivalent = session is not None
+    element_loads = apply_loads(cases, equivalent)
+    print(f"[ANALYSIS] ✓ Applied {len(loads)} load(s) in {len(cases)} load case(s)")
+    report_progress(progress, 'loads', count=len(loads))
     
-    # Run the analysis
+    # Run the analysis, reading the raw results after each load case
     print("[ANALYSIS] Starting static analysis...")
-    run_static_analysis(model)
-    print("[ANALYSIS] ✓ Static analysis completed successfully")
+    states = []
+    solvers = None if update == 'loads' else choose_solvers(model, get_analysis_mode(model), engine, get_bandwidth())
+    output['analysis'] = run_static_analysis(
+      model, progress, len(cases), lambda: states.append(collect_state(element_loads[len(states)], equivalent)),
+      factored=update == 'loads', solvers=solvers
+    )
+    if update == 'loads':
+      # Solved against the factorization of the previous submission
+      output['analysis']['solver'] = {**session.solver, 'factorization_time': 0.0}
+    print(f"[ANALYSIS] ✓ Static analysis completed successfully ({output['analysis']['mode']})")
 
     # Extract results
-    extract_results()
+    if result_format == 'columnar':
+      extract_columns(states, cases, combinations, has_load_cases(model))
+    elif result_format == 'ndjson':
+      stream_results(states, cases, combinations, has_load_cases(model),
+                     lambda chunk: report_progress(progress, 'chunk', **chunk))
+    elif result_format == 'json':
+      extract_results(states, cases, combinations, has_load_cases(model))
+    else:
+      raise ValueError(f"Unknown result format: {result_format}")
     print("[ANALYSIS] ✓ Results extracted")
+    report_progress(progress, 'results', count=len(members))
     # print('output: ', output)
-    
-    # Clean up
-    ops.wipe()
-    print("[ANALYSIS] ✓ Model cleaned up")
-    
+
+    if session is None:
+      # Clean up
+      ops.wipe()
+      resident_session = None
+      print("[ANALYSIS] ✓ Model cleaned up")
+    else:
+      # Keep the domain for the next submission: only the linear path keeps
+      # its factorization, and only OpenSees models can be updated
+      output['analysis']['update'] = update
+      resident_session = session
+      if output['analysis']['mode'] == 'linear' and ops is openseespy:
+        session.keep(model_snapshot, meshes, tags, index, *skeleton, len(cases), output['analysis']['solver'])
+      else:
+        session.reset()
+
     return output
 
   except Exception as e:
+      # The domain is left half updated: the next session submission rebuilds it
+      resident_session = None
       error_msg = str(e)
       # Check if this is a DPBSV error
       if "DPBSV" in error_msg or "illegal value" in error_msg.lower():
@@ -120,28 +239,224 @@ def run_analysis(model: dict):
       print('ERROR: ', e)
       raise HTTPException(status_code=500, detail=str(e))
 
-def init():
-    """Initializes a new OpenSees 3D model."""
+def build_model(model: dict, meshes: dict, progress=None):
+  """
+  Builds the model in the domain: nodes, geometric transformations, sections,
+  meshed members and boundary conditions, in a new tag allocator and index
+  and with empty output nodes and members.
+
+  progress is notified after each phase (see run_analysis).
+  """
+  global tags, index
+  nodes = model['nodes']
+  members = model['members']
+  sections = model['sections']
+  boundary_conditions = model['boundary_conditions']
+  tags = TagAllocator()
+  index = ModelIndex(model)
+  output['nodes'] = []
+  output['members'] = []
+
+  # Initialize
+  init()
+  reserve_tags(model, meshes)
+  print(f"[ANALYSIS] ✓ Model initialized (3D, 6 DOF per node)")
+
+  # Create nodes
+  create_nodes(nodes)
+  print(f"[ANALYSIS] ✓ Created {len(nodes)} nodes")
+  report_progress(progress, 'nodes', count=len(nodes))
+
+  # Create transformation for beam-column elements
+  create_geometric_transformation(members)
+  print(f"[ANALYSIS] ✓ Created geometric transformations for {len(members)} members")
+  report_progress(progress, 'transformations', count=len(members))
+
+  # Create sections 
+  create_sections(sections, get_section_method(model))
+  print(f"[ANALYSIS] ✓ Created {len(sections)} sections")
+  report_progress(progress, 'sections', count=len(sections))
+
+  # Create elements
+  create_members(members, meshes)
+  print(f"[ANALYSIS] ✓ Created elements (discretized members)")
+  report_progress(progress, 'members', count=len(members))
+
+  # Apply boundary conditions
+  apply_boundary_conditions(boundary_conditions)
+  print(f"[ANALYSIS] ✓ Applied boundary conditions to {len(boundary_conditions)} constraint(s)")
+  report_progress(progress, 'boundary_conditions', count=len(boundary_conditions))
+
+def run_modal_analysis(model: dict, progress=None, result_format='json'):
+  """
+  Runs a modal analysis of the model and returns the output dict.
+
+  The model is built as for a static analysis (see build_model), its members
+  split into MODAL_MIN_SEGMENTS elements at least and its loads left out,
+  the element masses are lumped on the nodes (see assign_masses)
+  and the first analysis.modes modes are solved (see run_eigen_analysis), by
+  the direct engine unless analysis.engine says otherwise or a member has a
+  nonlinear transformation.
+
+  The output holds the periods, frequencies and participating mass ratios of
+  the modes, and their shapes at a decimated set of nodes (see
+  extract_modes); with result_format='columnar', as arrays in
+  output['columns'] (see columnar.py).
+
+  progress is an optional callable progress(phase, **data) notified after each
+  phase (nodes, transformations, sections, members, boundary_conditions,
+  masses, eigen and results).
+  """
+  global resident_session
+  try:
+    global output, tags, index, result_options, ops
+    output = {}
+    result_options = get_output_options(model)
+    num_modes = get_modal_options(model)['modes']
+    # The direct engine solves the modes of linear models by default: OpenSees'
+    # eigen takes ten times as long on large frames
+    engine = get_engine(model, 'direct' if is_linear_model(model) else 'opensees')
+    ops = DirectDomain() if engine == 'direct' else openseespy
+    # The domain of a session is replaced
+    resident_session = None
+
+    build_model(model, plan_meshes(model, MODAL_MIN_SEGMENTS), progress)
+
+    masses = assign_masses(model['sections'], get_section_method(model))
+    print(f"[ANALYSIS] ✓ Lumped {masses.sum():.6g} kg on the nodes")
+    report_progress(progress, 'masses', count=int(np.count_nonzero(masses)))
+
+    output['analysis'] = {'engine': engine, **run_eigen_analysis(masses, num_modes)}
+    print(f"[ANALYSIS] ✓ Modal analysis completed ({output['analysis']['modes']} modes)")
+    report_progress(progress, 'eigen', count=output['analysis']['modes'])
+
+    if result_format not in ('json', 'columnar'):
+      raise ValueError(f"Unknown result format: {result_format}")
+    extract_modes(masses, result_format)
+    print("[ANALYSIS] ✓ Results extracted")
+    report_progress(progress, 'results', count=output['analysis']['modes'])
+
     ops.wipe()
-    ops.model('basic', '-ndm', 3, '-ndf', 6)
+    print("[ANALYSIS] ✓ Model cleaned up")
+    return output
+
+  except Exception as e:
+      resident_session = None
+      print('ERROR: ', e)
+      raise HTTPException(status_code=500, detail=str(e))
+
+def run_buckling_analysis(model: dict, progress=None, result_format='json'):
+  """
+  Runs a linear buckling analysis of the model and returns the output dict.
+
+  The model is built (see build_model), its members split into
+  BUCKLING_MIN_SEGMENTS elements at least, and solved under its loads as by a
+  linear static analysis, in the direct engine, whose stiffness is the
+  elastic one: nonlinear transformations are replaced by Linear ones, the
+  geometric stiffness standing for them. The axial forces of the reference
+  loads (the first load combination, else the first load case) give the
+  geometric stiffness of the elements, and the lowest analysis.modes
+  critical load factors are solved (see run_buckling_eigen): the structure
+  buckles under the reference loads times a factor, without re-running
+  static analyses under scaled loads.
+
+  Output: 'buckling' with the critical load 'factors' (ascending) and the
+  'reference' loads ({'type': 'combination' or 'case', 'id', 'name'}), and
+  the buckled shapes (see extract_shapes); with result_format='columnar',
+  the factors go to output['columns'].
+
+  progress is an optional callable progress(phase, **data) notified after each
+  phase (nodes, transformations, sections, members, boundary_conditions,
+  loads, solve, buckling and results).
+  """
+  global resident_session
+  try:
+    global output, tags, index, result_options, ops
+    output = {}
+    result_options = get_output_options(model)
+    num_modes = get_modal_options(model)['modes']
+    if result_format not in ('json', 'columnar'):
+      raise ValueError(f"Unknown result format: {result_format}")
+    model = {
+      **model,
+      'members': [{**member, 'transformation': 'Linear'} for member in model['members']],
+      'analysis': {**(model.get('analysis') or {}), 'mode': 'linear', 'engine': 'direct'},
+    }
+    ops = DirectDomain()
+    # The domain of a session is replaced
+    resident_session = None
+
+    build_model(model, plan_meshes(model, BUCKLING_MIN_SEGMENTS), progress)
+
+    # Reference solve
+    cases = get_load_cases(model)
+    combinations = get_load_combinations(model, cases)
+    element_loads = apply_loads(cases)
+    print(f"[ANALYSIS] ✓ Applied {len(model['loads'])} load(s) in {len(cases)} load case(s)")
+    report_progress(progress, 'loads', count=len(model['loads']))
+    states = []
+    solve = run_static_analysis(
+      model, progress, len(cases), lambda: states.append(collect_state(element_loads[len(states)])),
+      solvers=choose_solvers(model, 'linear', 'direct', 0)
+    )
+    if combinations:
+      combination = combinations[0]
+      reference = combine_states(states, combination['weights'])
+      output['buckling'] = {'reference': {'type': 'combination', 'id': combination['id'], 'name': combination['name']}}
+    else:
+      reference = states[0]
+      output['buckling'] = {'reference': {'type': 'case', 'id': cases[0]['id'], 'name': cases[0]['name']}}
 
-def get_local_axis(nodei, nodej, vecxz=None):
+    factors, eigen_time = run_buckling_eigen(reference['forces'], num_modes)
+    output['analysis'] = {
+      'type': 'buckling', 'engine': 'direct', 'requested': num_modes, 'modes': len(factors),
+      'solver': solve['solver'], 'eigen_time': eigen_time
+    }
+    print(f"[ANALYSIS] ✓ Buckling analysis completed (lowest factor {factors[0]:.6g})")
+    report_progress(progress, 'buckling', count=len(factors))
 
-    pi = np.array(ops.nodeCoord(nodei))
-    pj = np.array(ops.nodeCoord(nodej))
+    extract_shapes(len(factors), result_format)
+    output['units'] = {'factors': 'reference loads', 'shapes': 'scaled to 1'}
+    if result_format == 'columnar':
+      output['columns']['factors'] = np.array(factors)
+    else:
+      output['buckling']['factors'] = factors
+    print("[ANALYSIS] ✓ Results extracted")
+    report_progress(progress, 'results', count=len(factors))
 
-    vecx = pj - pi
-    
-    length = np.linalg.norm(vecx)
-    
-    if length < 1e-10:
-        raise ValueError("Member has zero length")
+    ops.wipe()
+    print("[ANALYSIS] ✓ Model cleaned up")
+    return output
 
-    vecx = vecx / length
-    vecz = np.array(vecxz)
-    vecy = np.cross(vecz, vecx)
-    
-    return [vecx, vecy, vecz]
+  except Exception as e:
+      resident_session = None
+      print('ERROR: ', e)
+      raise HTTPException(status_code=500, detail=str(e))
+
+def init():
+    """Initializes a new OpenSees 3D model."""
+    ops.wipe()
+    ops.model('basic', '-ndm', 3, '-ndf', 6)
+
+def reserve_tags(model: dict, meshes: dict):
+    """
+    Reserves the tag ranges of the analysis objects (see tags.TagAllocator):
+    user nodes, sections and transformations (one per member) are mapped from
+    their ids, generated nodes and elements get ranges sized from the mesh plan,
+    and the elastic supports (their shared ground node and their springs).
+    """
+    tags.map_ids('user_node', [node['id'] for node in model['nodes']])
+    tags.map_ids('section', [section['id'] for section in model['sections']])
+    tags.map_ids('transformation', [member['id'] for member in model['members']])
+
+    elastic_targets = sum(
+        len(boundary_condition['targets']) for boundary_condition in model['boundary_conditions']
+        if boundary_condition['type'] == 'elastic'
+    )
+    tags.reserve('mesh_node', sum(node_id is None for points in meshes.values() for (_, node_id) in points))
+    tags.reserve('support_node', int(elastic_targets > 0))
+    tags.reserve('element', sum(len(points) + 1 for points in meshes.values()))
+    tags.reserve('support_element', elastic_targets)
 
 def calculate_vecxz(member):
     """
@@ -181,29 +496,33 @@ def calculate_vecxz(member):
     return vec
 
 def create_geometric_transformation(members):
-    """Creates a linear geometric transformation for beam-column elements."""
+    """Creates the geometric transformation (Linear by default) for beam-column elements."""
     for member in members:
         vecxz = calculate_vecxz(member)
-        ops.geomTransf("Linear", member['id'], *vecxz)
+        ops.geomTransf(member.get('transformation', 'Linear'), tags.tag('transformation', member['id']), *vecxz)
+
+def get_section_method(model: dict):
+    """Returns the requested section property method (see helpers.SECTION_METHODS)."""
+    options = model.get('analysis') or {}
+    return options.get('section_properties')
 
-def create_sections(sections):
+def create_sections(sections, method=None):
     """Creates a section for the beam-column elements."""
     for section in sections:
-        properties = compute_section_properties(section)
+        properties = compute_section_properties(section, method)
         E = properties['E']
         A = properties['A']
         Iz = properties['Iz']
         Iy = properties['Iy']
         Jxx = properties['Jxx']
         G_mod  = properties['G_mod']
-        ops.section('Elastic', section['id'], E, A, Iz, Iy, G_mod, Jxx)
+        ops.section('Elastic', tags.tag('section', section['id']), E, A, Iz, Iy, G_mod, Jxx)
 
 def create_nodes(nodes):
-  """Creates nodes in the OpenSees model and returns a set of node IDs."""
-  node_ids = set()
+  """Creates nodes in the OpenSees model."""
   for node in nodes:
-    ops.node(node['id'], node['x'], node['z'], node['y'])
-    node_ids.add(node['id'])
+    node_tag = tags.tag('user_node', node['id'])
+    ops.node(node_tag, node['x'], node['z'], node['y'])
     
     output['nodes'].append({
         'id': node['id'],
@@ -211,113 +530,60 @@ def create_nodes(nodes):
         'y': node['y'],
         'z': node['z']
     })
+    index.add_node(output['nodes'][-1], node_tag)
   
-def get_release(release_type):
-  if not release_type:
-    return None, None
-  if release_type == 'fixed-pinned':
-    return None, {'rx': 0, 'ry': 0, 'rz': 0}
-  elif release_type == 'pinned-fixed':
-    return {'rx': 0, 'ry': 0, 'rz': 0}, None
-  elif release_type == 'pinned-pinned':
-    return {'rx': 0, 'ry': 0, 'rz': 0}, {'rx': 0, 'ry': 0, 'rz': 0}
-  else:
-    return None, None
-
-def get_release_node(member, node_id, releases):
-  
-    nodei = member['nodei']['id']
-    nodej = member['nodej']['id']
-    vecxz = member.get('vecxz')
-    
-    local_matrix = get_local_axis(nodei, nodej, vecxz)
-    vecx = local_matrix[0]  # Local x-axis (along member)
-    vecy = local_matrix[1]  # Local y-axis
-    vecz = local_matrix[2]  # Local z-axis
-    
-    i_node = node_id
-    
-    j_node = int(random.random() * 0x7FFFFFFF)
-    coords = ops.nodeCoord(i_node)
-    ops.node(j_node, coords[0], coords[1], coords[2])
-    
-    released_dofs = []
-    constrained_dofs = []
-    materials = []
-    
-    # Stiffness for released DOFs (very low)
-    k_release = 1e-12
-    
-    # DOF mapping
-    dof_mapping = {
-      'fx': 1, 'fy': 2, 'fz': 3,  # Translations
-      'rx': 4, 'ry': 5, 'rz': 6   # Rotations
-    }
+def get_release(release_type, idx, count):
+  """
+  Returns the '-releasez' / '-releasey' code (0: none, 1: end I, 2: end J,
+  3: both) of element idx of a member mesh of count elements.
+
+  Pinned ends release bending only (My, Mz): releasing torsion at both ends
+  of a chain of members would leave its rotation about the axis free. A
+  pinned member therefore carries torsion (T is not zero at its pinned ends),
+  where pinned ends used to release it as well.
+  """
+  code = RELEASE_CODES.get(release_type, 0)
+  return (code & 1 if idx == 0 else 0) | (code & 2 if idx == count - 1 else 0)
+
+def release_options(code):
+  """elasticBeamColumn options condensing the released end moments of a release code out of the element."""
+  return ('-releasez', code, '-releasey', code) if code else ()
+
+def create_members(members, meshes=None):
     
-    # Check each DOF
-    for dof_name, dof_number in dof_mapping.items():
-      # Default to fixed (1) if not specified
-      is_released = releases.get(dof_name, 1) == 0
-      
-      if is_released:
-        released_dofs.append(dof_number)
-        mat_id = int(random.random() * 0x7FFFFFFF)
-        ops.uniaxialMaterial("Elastic", mat_id, k_release)
-        materials.append(mat_id)
-      else:
-        constrained_dofs.append(dof_number)
-
-    if released_dofs:
-      zero_length_id = int(random.random() * 0x7FFFFFFF)
-      
-      ops.element("zeroLength", zero_length_id, i_node, j_node,
-                  "-mat", *materials,
-                  "-dir", *released_dofs,
-                  "-orient", vecx[0], vecx[1], vecx[2], vecy[0], vecy[1], vecy[2])
-
-      if constrained_dofs:
-          ops.equalDOF(i_node, j_node, *constrained_dofs)
-    
-    return j_node
-
-def create_members(members):
-    
-  """Creates elements by discretizing members into segments."""
+  """
+  Creates elements by discretizing members into segments.
+
+  meshes maps member ids to their interior nodes (see meshing.plan_meshes);
+  members without an entry are a single element.
+
+  Member releases are condensed out of the end elements (see get_release);
+  the nodes held by released ends alone are registered as hinges (see
+  restrain_hinges).
+  """
+  meshes = meshes or {}
+  released = []
+  held = set()
   for member in members:
     # print('create_members member: ', member)
     parent_id = member['id'] 
-    geoTransf_id = parent_id
-    new_nodes, new_members, length = mesh_member(member)
-    
-    # Get release type and convert to DOF specifications
-    release_type = member.get('release')
-    releases_i, releases_j = get_release(release_type)
-    
-    original_start_node = member['nodei']['id']
-    original_end_node = member['nodej']['id']
-    
-    release_start_node = None
-    release_end_node = None
-    
-    if releases_i:
-      release_start_node = get_release_node(member, original_start_node, releases_i)
-
-    if releases_j:
-      release_end_node = get_release_node(member, original_end_node, releases_j)
+    geoTransf_id = tags.tag('transformation', parent_id)
+    new_nodes, new_members, length = mesh_member(member, meshes.get(parent_id, []))
+    releases = []
 
     for idx, new_member in enumerate(new_members):
       child_id = new_member['id']
-      node_i = new_member['nodei']
-      node_j = new_member['nodej']
-      section_id = member['section']
-
-      if idx == 0 and release_start_node:
-        node_i = release_start_node
-
-      if idx == len(new_members) - 1 and release_end_node:
-        node_j = release_end_node
-
-      ops.element("elasticBeamColumn", child_id, node_i, node_j, section_id , geoTransf_id)
+      node_i = tags.node_tag(new_member['nodei'])
+      node_j = tags.node_tag(new_member['nodej'])
+      section_id = tags.tag('section', member['section'])
+      release = get_release(member.get('release'), idx, len(new_members))
+      releases.append(release)
+
+      ops.element("elasticBeamColumn", child_id, node_i, node_j, section_id , geoTransf_id, *release_options(release))
+      held.update(node for (end, node) in enumerate((node_i, node_j)) if not release & (1 << end))
+      if release:
+        axis = np.subtract(ops.nodeCoord(node_j), ops.nodeCoord(node_i))
+        released.append((node_i, node_j, (axis / np.linalg.norm(axis)).tolist()))
       
     output['members'].append({
         'id': parent_id,
@@ -328,23 +594,31 @@ def create_members(members):
         'vecxz': member['vecxz'],
         'length' : length
     })  
+    index.add_member(output['members'][-1], releases)
+  index.hinges = sorted({node for (node_i, node_j, _) in released for node in (node_i, node_j)} - held)
+  index.released = [element for element in released if element[0] not in held or element[1] not in held]
      
-def mesh_member(member):
-    """Discretizes a member into segments and creates nodes and elements."""
+def mesh_member(member, points=()):
+    """
+    Discretizes a member into segments and creates nodes and elements.
+
+    Args:
+        member: Model member
+        points: Interior nodes as sorted (fraction along the member, existing
+            node id or None to create a node)
+    """
     ni = member['nodei']
     nj = member['nodej']
     section_id = member['section']
-    model_nodes_ids = [node['id'] for node in output['nodes']]
 
-    # Ensure the input nodes exist in the model
-    if ni['id'] not in model_nodes_ids or nj['id'] not in model_nodes_ids:
+    # Ensure the input nodes and section exist in the model
+    if ni['id'] not in index.nodes or nj['id'] not in index.nodes:
         raise HTTPException(status_code=400, detail=f"Member {member['id']} references undefined node(s).")
+    if section_id not in index.sections:
+        raise HTTPException(status_code=400, detail=f"Member {member['id']} references undefined section {section_id}.")
     
     # Compute the total length of the member
-    L = math.sqrt((nj['x'] - ni['x'])**2 + (nj['y'] - ni['y'])**2 + (nj['z'] - ni['z'])**2)
-    
-    # Determine the number of segments
-    num_segments = math.ceil(L / 0.5)
+    L = member_length(member)
     
     # Generate the list of node IDs along the member
     new_nodes = [{
@@ -355,25 +629,23 @@ def mesh_member(member):
     }]
       
     # Generate interior nodes via linear interpolation
-    for i in range(1, num_segments):
-        fraction = i / num_segments
+    for (fraction, node_id) in points:
         x_coord = ni['x'] + fraction * (nj['x'] - ni['x'])
         y_coord = ni['y'] + fraction * (nj['y'] - ni['y'])
         z_coord = ni['z'] + fraction * (nj['z'] - ni['z'])
 
-        # print('x_coord: ', x_coord)
-        # print('y_coord: ', y_coord)
-        # print('z_coord: ', z_coord)
-
-        node_id = int(random.random() * 0x7FFFFFFF)
-        ops.node(node_id, x_coord, z_coord, y_coord)
-        
-        output['nodes'].append({
-            'id': node_id,
-            'x': x_coord, 
-            'y': z_coord,
-            'z': y_coord
-        })
+        if node_id is None:
+          node_tag = tags.allocate('mesh_node')
+          node_id = tags.node_id(node_tag)
+          ops.node(node_tag, x_coord, z_coord, y_coord)
+          
+          output['nodes'].append({
+              'id': node_id,
+              'x': x_coord, 
+              'y': z_coord,
+              'z': y_coord
+          })
+          index.add_node(output['nodes'][-1], node_tag)
         
         new_nodes.append({
           'id': node_id,
@@ -394,7 +666,7 @@ def mesh_member(member):
     new_members = []
     number_of_members = len(new_nodes) - 1
     for k in range(number_of_members):
-      member_id = int(random.random() * 0x7FFFFFFF)
+      member_id = tags.allocate('element')
       new_members.append({
           'id': member_id,
           'nodei': new_nodes[k]['id'],
@@ -405,7 +677,8 @@ def mesh_member(member):
     return new_nodes, new_members, L
 
 def apply_boundary_conditions(boundary_conditions):
-  """Applies boundary conditions to the model."""
+  """Applies boundary conditions to the model, then restrains the hinges (see restrain_hinges)."""
+  supported = {}
   for (i, boundary_condition) in enumerate(boundary_conditions):
     targets = boundary_condition['targets']
     bdc_type = boundary_condition['type']
@@ -415,87 +688,473 @@ def apply_boundary_conditions(boundary_conditions):
     rx = boundary_condition['rx']
     ry = boundary_condition['ry']
     rz = boundary_condition['rz']
-    for target in targets:
-    
-      j_coord = ops.nodeCoord(target)
-      
+    for target_id in targets:
+      target = tags.tag('user_node', target_id)
+
       if(bdc_type == "elastic"):
-        support_node = int(random.random() * 0x7FFFFFFF)
-        ops.node(support_node, j_coord[0], j_coord[1], j_coord[2])
-      
-        kx = dx   # Spring stiffness in X direction
-        ky = dy   # Spring stiffness in Y direction  
-        kz = dz   # Spring stiffness in Z direction
-        krx =  rx # Rotational spring stiffness about X
-        kry =  ry # Rotational spring stiffness about Y
-        krz =  rz # Rotational spring stiffness about Z
-        
-        # Create spring materials for each DOF
-        mat_ids = []
-        for dof_idx, stiffness in enumerate([kx, ky, kz, krx, kry, krz], start=1):
-            mat_id = int(random.random() * 0x7FFFFFFF)
-            ops.uniaxialMaterial("Elastic", mat_id, stiffness)
-            mat_ids.append(mat_id)
-        
-        zero_length_id = int(random.random() * 0x7FFFFFFF)
-        ops.element("zeroLength", zero_length_id, target, support_node, 
-                    "-mat", *mat_ids,
-                    "-dir", 1, 2, 3, 4, 5, 6)
-        
-        # Fix the support node (ground)
-        ops.fix(support_node, 1, 1, 1, 1, 1, 1)
+        # Spring stiffness in each DOF (X, Y, Z and about X, Y, Z)
+        stiffness = [float(k) for k in (dx, dy, dz, rx, ry, rz)]
+        add_spring_support(target, stiffness)
+        index.add_spring(target_id, stiffness)
       else:      
         ops.fix(target, dx, dy, dz, rx, ry, rz)
-      
-def apply_loads(loads):
-    """Applies loads to the model."""
-    ops.timeSeries("Linear", 1)
-    ops.pattern("Plain", 1, 1)
-    members = output['members']
-    nodes = output['nodes']
+        index.fixities.append((target, [dof for (dof, fixed) in enumerate([dx, dy, dz, rx, ry, rz], start=1) if fixed]))
+        index.add_support(target_id, target)
+      supported.setdefault(target, []).extend(axis for (axis, held) in enumerate([rx, ry, rz]) if held)
+  restrain_hinges(supported)
+
+def restrain_hinges(supported):
+  """
+  Fixes the rotations of the hinges (nodes held by released member ends alone,
+  see create_members) that nothing holds.
+
+  A released element only ties the rotations of its ends about its axis
+  (torsion), so the rotations of the hinges can be left free (a pinned truss
+  spinning about its members), which would make the stiffness singular. The
+  free rotations are the null space of A'A, A holding the torsion of the
+  released elements and the supported rotations over the hinge rotations:
+
+  - at each hinge, the directions normal to the axes of its elements and to
+    its supported rotations (null space of its 3 x 3 block of A'A),
+  - then the motions of groups of hinges tied by released elements (a whole
+    truss turning about its members, see hinge_null_space), few once the
+    first ones are fixed.
+
+  For each null space basis N, the rotations F of the pivots of a QR of N'
+  are fixed (N[F] is not singular): no moment acts along them (nodal loads
+  are forces), so their reactions are zero and the results are unchanged.
+
+  Args:
+      supported: Rotations (0: rx, 1: ry, 2: rz) held by the supports, by node tag
+  """
+  if not index.hinges:
+    return
+  count = len(index.hinges)
+  hinges = {node: k for (k, node) in enumerate(index.hinges)}
+
+  # Rows: torsion of the released elements, then supported rotations; columns: hinge rotations
+  entries = []
+  for (row, (node_i, node_j, axis)) in enumerate(index.released):
+    ends = [(hinges[node], sign) for (node, sign) in ((node_i, 1.0), (node_j, -1.0)) if node in hinges]
+    entries.extend((row, 3 * hinge + k, sign * axis[k]) for (hinge, sign) in ends for k in range(3))
+  row = len(index.released)
+  for (hinge, node) in enumerate(index.hinges):
+    for axis in supported.get(node, []):
+      entries.append((row, 3 * hinge + axis, 1.0))
+      row += 1
+  (rows, cols, values) = (np.array(column) for column in zip(*entries))
+  matrix = scipy.sparse.csr_matrix((values, (rows, cols)), shape=(row, 3 * count))
+  gram = (matrix.T @ matrix).tocsr()
+  tolerance = HINGE_TOLERANCE * max(abs(gram).max(), 1.0)
+
+  def pivots(null):
+    return scipy.linalg.qr(null.T, mode='r', pivoting=True)[1][:null.shape[1]]
+
+  # Rotations of each hinge that its elements and supports leave free
+  fixed = np.zeros(3 * count, dtype=bool)
+  dofs = 3 * np.arange(count)[:, np.newaxis] + np.arange(3)
+  blocks = np.asarray(gram[np.repeat(dofs, 3, axis=1).ravel(), np.tile(dofs, 3).ravel()]).reshape(count, 3, 3)
+  (eigenvalues, eigenvectors) = np.linalg.eigh(blocks)
+  for hinge in np.flatnonzero(eigenvalues[:, 0] <= tolerance):
+    fixed[3 * hinge + pivots(eigenvectors[hinge][:, eigenvalues[hinge] <= tolerance])] = True
+
+  # Motions of the groups of hinges tied by released elements
+  free = np.flatnonzero(~fixed)
+  reduced = gram[free][:, free]
+  (num_groups, groups) = scipy.sparse.csgraph.connected_components(reduced, directed=False)
+  for group in hinge_groups(groups, num_groups):
+    null = hinge_null_space(reduced[group][:, group], tolerance)
+    if null.shape[1]:
+      fixed[free[group[pivots(null)]]] = True
+
+  restrained = {}
+  for column in np.flatnonzero(fixed):
+    restrained.setdefault(index.hinges[column // 3], []).append(4 + column % 3)
+  for (node, dofs) in restrained.items():
+    ops.fix(node, *[int(dof in dofs) for dof in range(1, 7)])
+    index.fixities.append((node, sorted(dofs)))
+
+def hinge_groups(groups, num_groups):
+  """
+  Rows of the groups of hinge rotations (connected components of their
+  matrix), small groups gathered up to HINGE_DENSE_SIZE rows: the null space
+  of a block diagonal matrix is the one of its blocks.
+  """
+  order = np.argsort(groups, kind='stable')
+  batch = []
+  for group in np.split(order, np.cumsum(np.bincount(groups, minlength=num_groups))[:-1]):
+    if batch and len(batch) + len(group) > HINGE_DENSE_SIZE:
+      yield np.array(batch)
+      batch = []
+    batch.extend(group)
+  if batch:
+    yield np.array(batch)
+
+def hinge_null_space(matrix, tolerance):
+  """
+  Orthonormal basis of the null space of a symmetric positive semi-definite
+  matrix of hinge rotations (columns): all its eigenvectors up to tolerance
+  when it has at most HINGE_DENSE_SIZE rows, else the ones ARPACK finds around
+  0 (shift-invert on a matrix factored once), doubling the number of
+  eigenvectors sought while they are all null. The start vector is seeded, so
+  that the same model always gets the same restraints.
+  """
+  size = matrix.shape[0]
+  count = 6
+  while size > HINGE_DENSE_SIZE and 2 * count < size:
+    start = np.random.default_rng(0).random(size)
+    (eigenvalues, eigenvectors) = scipy.sparse.linalg.eigsh(
+      matrix.tocsc(), k=count, sigma=-tolerance * 1e3, which='LM', v0=start
+    )
+    null = eigenvalues <= tolerance
+    if null.sum() < count:
+      return eigenvectors[:, null]
+    count *= 2
+  (eigenvalues, eigenvectors) = np.linalg.eigh(matrix.toarray())
+  return eigenvectors[:, eigenvalues <= tolerance]
+
+def add_spring_support(node, stiffness):
+  """
+  Adds the stiffness of an elastic support (one per DOF, global axes) to a node.
+
+  The direct engine adds it to the diagonal of the node's DOFs. In OpenSees,
+  every support gets a zeroLength element to one fixed ground node shared by
+  all of them, with Elastic materials shared by the springs of the same
+  stiffness: no node, SP constraint or material is added per support (OpenSees
+  checks every SP constraint when one is added, so a ground node per support
+  made large spring foundations quadratic to build).
+  """
+  dofs = [dof for (dof, k) in enumerate(stiffness, start=1) if k]
+  if not dofs:
+    return
+  if isinstance(ops, DirectDomain):
+    ops.spring(node, *stiffness)
+    return
+
+  if index.ground is None:
+    index.ground = tags.allocate('support_node')
+    ops.node(index.ground, 0.0, 0.0, 0.0)
+    ops.fix(index.ground, 1, 1, 1, 1, 1, 1)
+  materials = []
+  for dof in dofs:
+    k = stiffness[dof - 1]
+    if k not in index.spring_materials:
+      index.spring_materials[k] = tags.allocate('material')
+      ops.uniaxialMaterial("Elastic", index.spring_materials[k], k)
+    materials.append(index.spring_materials[k])
+
+  element = tags.allocate('support_element')
+  warnings = io.StringIO()
+  # The element has the length between the node and the ground, which zeroLength warns about
+  with contextlib.redirect_stderr(warnings):
+    ops.element("zeroLength", element, node, index.ground, "-mat", *materials, "-dir", *dofs)
+  for line in warnings.getvalue().splitlines():
+    if 'ZeroLength::setDomain' not in line:
+      print(line, file=sys.stderr)
+  index.spring_elements.append(element)
+
+def remove_boundary_conditions():
+  """Removes the supports applied by apply_boundary_conditions (the ground node and spring materials are kept)."""
+  for element in index.spring_elements:
+    ops.remove('ele', element)
+  for (node, dofs) in index.fixities:
+    for dof in dofs:
+      ops.remove('sp', node, dof)
+  index.fixities = []
+  index.spring_elements = []
+  index.springs = {}
+  index.supports = {}
+
+def replace_elements(member):
+  """Replaces the elements of a member by elements of its (new) section, with the same tags, nodes and releases."""
+  section_tag = tags.tag('section', member['section'])
+  transformation_tag = tags.tag('transformation', member['id'])
+  for child in index.output_members[member['id']]['mesh']['members']:
+    node_i, node_j = ops.eleNodes(child['id'])
+    release = index.releases[index.element_rows[child['id']]]
+    ops.remove('ele', child['id'])
+    ops.element("elasticBeamColumn", child['id'], node_i, node_j, section_tag, transformation_tag,
+                *release_options(release))
+    child['section'] = member['section']
+
+def remove_loads(num_cases):
+  """Removes the load patterns and time series of apply_loads."""
+  for k in range(num_cases):
+    ops.remove('loadPattern', k + 1)
+    ops.remove('timeSeries', k + 1)
+
+def update_model(model, changes, num_cases):
+  """
+  Applies the changes of a session model (see session.diff_models) to the
+  domain built for its previous submission: the load patterns are removed
+  (apply_loads adds the new ones), changed sections get new tags, the elements
+  of the changed members are replaced and the boundary conditions re-applied.
+
+  After any change but the loads, the analysis is wiped so the stiffness gets
+  factored again, and the domain is reverted to its undeformed state first:
+  elements added to displaced nodes would take that state as their initial one.
+  """
+  if changes['sections'] or changes['members'] or changes['boundary_conditions']:
+    ops.wipeAnalysis()
+    ops.reset()
+    ops.setTime(0.0)
+
+  remove_loads(num_cases)
+  index.members = {member['id']: member for member in model['members']}
+  index.sections = {section['id']: section for section in model['sections']}
+
+  sections = [index.sections[id] for id in changes['sections']]
+  for section in sections:
+    tags.retag('section', section['id'])
+  create_sections(sections, get_section_method(model))
+  for member_id in changes['members']:
+    replace_elements(index.members[member_id])
+
+  if changes['boundary_conditions']:
+    remove_boundary_conditions()
+    apply_boundary_conditions(model['boundary_conditions'])
+
+def has_load_cases(model: dict) -> bool:
+    """Whether the model defines explicit load cases or combinations."""
+    return bool(model.get('load_cases') or model.get('load_combinations'))
+
+def apply_loads(cases, equivalent=False):
+    """
+    Applies the loads of each load case to the model.
+
+    Case k gets its own Plain pattern (tag k + 1) driven by a Path time series
+    equal to 1 at time k + 1 and 0 at the other integer times, so solving one
+    unit step per case yields the response to that case alone.
+
+    With equivalent, linear loads are applied as equivalent nodal loads (see
+    apply_case_loads), so the patterns can be replaced without invalidating the
+    stiffness factorization.
+
+    Returns:
+        list: per case, the element uniform loads (Wy, Wz, Wx) in N/m as an
+        array of shape (n_elements, 3) in get_elements() order
+    """
+    elements = get_elements()
+    geometry = get_geometry()
+    times = list(range(len(cases) + 1))
+    element_loads = []
+    for (k, case) in enumerate(cases):
+        values = [0.0] * len(times)
+        values[k + 1] = 1.0
+        ops.timeSeries("Path", k + 1, '-time', *times, '-values', *values)
+        ops.pattern("Plain", k + 1, k + 1)
+        loads = np.zeros((len(elements), 3))
+        apply_case_loads(case['loads'], geometry, loads, equivalent)
+        element_loads.append(loads)
+    return element_loads
+
+def apply_case_loads(loads, geometry, element_loads, equivalent=False):
+    """
+    Applies loads to the current load pattern.
+
+    Linear loads (kN/m in global axes) become '-beamUniform' element loads on
+    every element of the member mesh, in the element local axes; they are
+    accumulated in element_loads (rows in get_elements() order). geometry
+    holds the element local axes (see get_geometry).
+
+    With equivalent, the element loads are replaced by the opposite of their
+    fixed-end forces at the element nodes: OpenSees renumbers the model when an
+    element load is added, while nodal loads keep the analysis as is. The
+    nodal results are the same for elastic elements, and collect_state adds
+    the fixed-end forces back to the element forces.
+    """
+    members = index.output_members
+    nodes = index.output_nodes
 
     for load in loads:
       targets = load['targets']
       value = load['value']
       if(load['type'] == 'linear'):
+        # Global load per unit length (note: coordinate swapping for y and z)
+        w = np.array([value['x'], value['z'], value['y']]) * 1E3
         for id in targets:
-          member = next((e for e in members if e['id'] == id), None)
+          member = members.get(id)
           if member:
-            mesh = member['mesh']
-            nodes = mesh['nodes']
-            length = member['length']
-
-            number_of_nodes = len(nodes)
-            for (j, node) in enumerate(nodes):
-              node_id = node['id']
-              distance_between_nodes = length / (number_of_nodes - 1)
-
-              # Calculate load based on node position
-              if j == 0 or j == number_of_nodes - 1:  # First or last node
-                nDelta = distance_between_nodes / 2
-              else:  # Interior nodes
-                nDelta = distance_between_nodes
-              # Apply load (note: coordinate swapping for y and z)
-              fx = value['x'] * nDelta * 1E3
-              fy = value['z'] * nDelta * 1E3
-              fz = value['y'] * nDelta * 1E3
-              ops.load(node_id, fx, fy, fz, 0.0, 0.0, 0.0)
+            for child in member['mesh']['members']:
+              row = index.element_rows[child['id']]
+              if not geometry['valid'][row]:
+                continue
+              wx, wy, wz = geometry['g'][row] @ w
+              element_loads[row] += (wy, wz, wx)
+              if not equivalent:
+                ops.eleLoad('-ele', child['id'], '-type', '-beamUniform', wy, wz, wx)
       elif(load['type'] == 'nodal'):
         for id in targets:
-          node = next((e for e in nodes if e['id'] == id), None)
-          if node:
+          if id in nodes:
             fx = value['x'] * 1E3
             fy = value['z'] * 1E3
             fz = value['y'] * 1E3
-            ops.load(id, fx, fy, fz, 0.0, 0.0, 0.0)
+            ops.load(index.node_tags[nodes[id]], fx, fy, fz, 0.0, 0.0, 0.0)
+
+    if equivalent:
+      # Opposite of the fixed-end forces, from the local to the global axes
+      rows = np.flatnonzero(element_loads.any(axis=1))
+      forces = -fixed_end_forces(element_loads[rows], geometry['length'][rows], get_releases()[rows]).reshape(-1, 4, 3)
+      forces = np.einsum('nkj,nji->nki', forces, geometry['g'][rows]).reshape(-1, 2, 6)
+      for (row, end_forces) in zip(rows, forces.tolist()):
+        for (node_tag, end) in zip(ops.eleNodes(index.elements[row]), end_forces):
+          ops.load(node_tag, *end)
+
+def is_linear_model(model: dict) -> bool:
+    """
+    Checks whether the model only has linear ingredients.
+
+    Elements are elasticBeamColumn with Elastic sections, and elastic
+    supports use Elastic uniaxial materials, so the model is linear
+    unless a member uses a nonlinear geometric transformation.
+    """
+    for member in model.get('members', []):
+        if member.get('transformation', 'Linear') in NONLINEAR_TRANSFORMATIONS:
+            return False
+    return True
+
+def get_engine(model: dict, default: str = 'opensees') -> str:
+    """
+    Returns the requested solver (analysis.engine): 'opensees' (default) or
+    'direct', which only solves models with Linear transformations.
+    """
+    options = model.get('analysis') or {}
+    engine = options.get('engine') or default
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown analysis engine: {engine}")
+    return engine
+
+def get_analysis_mode(model: dict) -> str:
+    """Returns the requested solve mode ('linear' or 'incremental'), resolving 'auto'."""
+    options = model.get('analysis') or {}
+    mode = options.get('mode', 'auto')
+    if mode == 'auto':
+        return 'linear' if is_linear_model(model) else 'incremental'
+    if mode not in ('linear', 'incremental'):
+        raise ValueError(f"Unknown analysis mode: {mode}")
+    return mode
+
+def get_output_options(model: dict) -> dict:
+    """
+    Returns the requested result level of detail (analysis.output), validated.
+
+    - fields: results to compute among RESULT_FIELDS ('diagrams' are the
+      displaced positions of the efforts)
+    - forces: section force components to output (default all)
+    - stations: number of diagram stations of the loaded elements (default
+      every DIAGRAM_STATION_SPACING)
+    - tolerance: maximum deviation (kNm) of the moment polylines from the exact
+      diagrams; the stations of the loaded elements are decimated to the fewest
+      meeting it
+    - precision: decimals of the displacements and section forces (default 5
+      and 2)
+    - diagram_scale: scale of the diagrams (default DIAGRAM_SCALE)
+    """
+    options = (model.get('analysis') or {}).get('output') or {}
+    fields = options.get('fields') or DEFAULT_RESULT_FIELDS
+    forces = options.get('forces') or FORCES
+    for field in fields:
+        if field not in RESULT_FIELDS:
+            raise ValueError(f"Unknown result field: {field}")
+    for force in forces:
+        if force not in FORCES:
+            raise ValueError(f"Unknown section force: {force}")
+    stations = options.get('stations')
+    if stations is not None and stations < 2:
+        raise ValueError("At least 2 diagram stations are needed per element")
+    return {
+        'fields': set(fields),
+        'forces': [force for force in FORCES if force in forces],
+        'stations': stations,
+        'tolerance': options.get('tolerance'),
+        'precision': options.get('precision'),
+        'diagram_scale': options.get('diagram_scale') or DIAGRAM_SCALE,
+    }
+
+def set_solver(system, numberer):
+    """Sets up the linear system of the analysis (see solvers.py)."""
+    ops.system(system)
+    ops.numberer(numberer)
+    ops.constraints("Plain")
+
+def run_static_analysis(model: dict = None, progress=None, num_cases=1, on_solved=None, factored=False,
+                        solvers=None):
+    """
+    Sets up and runs the static analysis.
 
-def run_static_analysis(model: dict = None):
-    """Sets up and runs the static analysis."""
+    Linear models are solved in a single Linear step (one factorization). The
+    incremental Newton load control is used for nonlinear models, or as a
+    fallback when the linear step fails.
+
+    With several load cases (see apply_loads), the linear path factors the
+    stiffness once and solves one step per case; on_solved() is called after
+    each case is solved so its results can be read.
+
+    solvers are the (system, numberer) pairs to use (see solvers.choose_solvers,
+    BandSPD with RCM by default): the linear step is retried with the next one
+    when a solver cannot factor the stiffness.
+
+    With factored, the linear analysis of the previous solve is kept and the
+    cases are solved against its factorization (only the loads changed).
+
+    Returns a summary of the solve path: {'mode', 'steps', 'solver'}, solver
+    being {'system', 'numberer', 'factorization_time'} (s, first step:
+    assembly and factorization), or None with factored.
+    """
     try:
-        ops.system("BandSPD")
-        ops.numberer("RCM")
-        ops.constraints("Plain")
-        
+        mode = get_analysis_mode(model) if model else 'incremental'
+        if num_cases > 1 and mode != 'linear':
+            raise ValueError("Load cases and combinations require a linear analysis")
+        solvers = solvers or [BAND_SOLVER]
+        solver = None
+
+        if mode == 'linear':
+            if factored:
+                # Back to time 0, where the load patterns start
+                ops.reset()
+                ops.setTime(0.0)
+                ok = ops.analyze(1)
+            else:
+                for (system, numberer) in solvers:
+                    if solver is not None:
+                        print(f"{solver['system']} failed with error code: {ok}, retrying with {system}")
+                        ops.wipeAnalysis()
+                        ops.reset()
+                        ops.setTime(0.0)
+                    set_solver(system, numberer)
+                    # Factored once, and kept for the next solves of a session
+                    ops.integrator("LoadControl", 1.0)
+                    ops.algorithm("Linear", '-factorOnce')
+                    ops.analysis("Static")
+                    start = time.perf_counter()
+                    ok = ops.analyze(1)
+                    solver = {'system': system, 'numberer': numberer,
+                              'factorization_time': round(time.perf_counter() - start, 6)}
+                    if ok == 0:
+                        break
+
+            for case in range(num_cases):
+                if case > 0:
+                    ok = ops.analyze(1)
+                if ok != 0:
+                    break
+                if on_solved:
+                    on_solved()
+                report_progress(progress, 'solve', step=case + 1, steps=num_cases)
+
+            if ok == 0:
+                return {'mode': 'linear', 'steps': num_cases, 'solver': solver}
+            if num_cases > 1:
+                raise Exception(f"Linear analysis failed with error code: {ok}")
+
+            print(f"Linear analysis failed with error code: {ok}, falling back to incremental analysis")
+            ops.wipeAnalysis()
+            ops.reset()
+            ops.setTime(0.0)
+
+        system, numberer = solvers[0]
+        set_solver(system, numberer)
+
         # Apply load in multiple steps instead of one
         num_steps = 10
         load_step = 1.0 / num_steps
@@ -510,13 +1169,22 @@ def run_static_analysis(model: dict = None):
         ops.analysis("Static")
         
         # Perform the analysis in incremental steps
-        ok = ops.analyze(num_steps)
-        
-        if ok != 0:
-            print(f"Analysis failed with error code: {ok}")
-            raise Exception(f"Analysis failed to converge")
-        
-        return 0
+        for step in range(1, num_steps + 1):
+            start = time.perf_counter()
+            ok = ops.analyze(1)
+            if step == 1:
+                solver = {'system': system, 'numberer': numberer,
+                          'factorization_time': round(time.perf_counter() - start, 6)}
+
+            if ok != 0:
+                print(f"Analysis failed with error code: {ok}")
+                raise Exception(f"Analysis failed to converge")
+
+            report_progress(progress, 'solve', step=step, steps=num_steps)
+
+        if on_solved:
+            on_solved()
+        return {'mode': 'incremental', 'steps': num_steps, 'solver': solver}
     except Exception as e:
         error_msg = str(e)
         # Check if this is a DPBSV error
@@ -526,126 +1194,770 @@ def run_static_analysis(model: dict = None):
                 print_model_for_inspection(model)
         raise
 
-def extract_node_displacements():
-  """Extracts displacement data for all nodes."""
+def assign_masses(sections, method=None):
+  """
+  Lumps the mass of the elements (density of their material x section area x
+  length, see modal.lumped_masses) on their end nodes, and assigns it to the
+  translations of the nodes.
+
+  Returns:
+      np.ndarray: Node masses (kg), in output['nodes'] order
+  """
+  linear_masses = {
+    section['id']: get_density(section['material']) * compute_section_properties(section, method)['A']
+    for section in sections
+  }
+  geometry = get_geometry()
+  valid = geometry['valid']
+  element_masses = np.array([
+    linear_masses[child['section']] for member in output['members'] for child in member['mesh']['members']
+  ]) * geometry['length']
+  rows = [[index.output_nodes[node] for node in nodes] for nodes in np.array(geometry['nodes'], dtype=object)[valid]]
+  masses = lumped_masses(rows, element_masses[valid], len(output['nodes']))
+  for (tag, mass) in zip(index.node_tags, masses):
+    if mass > 0:
+      ops.mass(tag, mass, mass, mass, 0.0, 0.0, 0.0)
+  return masses
+
+def get_free_translations():
+  """Whether the translations of the nodes are free (not fixed), shape (n_nodes, 3), in output['nodes'] order."""
+  free = np.ones((len(index.node_tags), 3), dtype=bool)
+  rows = {tag: row for (row, tag) in enumerate(index.node_tags)}
+  for (tag, dofs) in index.fixities:
+    if tag in rows:
+      free[rows[tag], [dof - 1 for dof in dofs if dof <= 3]] = False
+  return free
+
+def run_eigen_analysis(masses, num_modes):
+  """
+  Solves the first num_modes modes of the model (lowest eigenvalues ω² of
+  K φ = ω² M φ) by ARPACK in shift-invert mode about 0: each iteration is a
+  solve with the stiffness factored once (OpenSees' eigen, or the direct
+  engine's, see DirectDomain.eigen).
+
+  The Krylov basis of ARPACK (more vectors than modes) lies in the span of
+  the free translations carrying mass, which bounds the number of modes
+  solved: OpenSees takes min(2 k, k + 8) vectors for k modes, the direct
+  engine at least k + 1.
+
+  Returns:
+      dict: {'type': 'modal', 'requested', 'modes', 'eigen_time'} (s) and the
+      'eigenvalues' (rad²/s²)
+  """
+  count = int(np.count_nonzero(get_free_translations() & (masses[:, np.newaxis] > 0)))
+  limit = count - 1 if isinstance(ops, DirectDomain) else max(count - 8, count // 2)
+  if limit < 1:
+    raise ValueError(f"The model has too few free DOFs carrying mass ({count}) to compute its modes")
+  modes = min(num_modes, limit)
+  start = time.perf_counter()
+  eigenvalues = ops.eigen(modes)
+  eigen_time = round(time.perf_counter() - start, 6)
+  if len(eigenvalues) < modes:
+    raise Exception(f"Eigen analysis failed: {len(eigenvalues)} of {modes} modes found")
+  return {
+    'type': 'modal', 'requested': num_modes, 'modes': modes, 'eigen_time': eigen_time,
+    'eigenvalues': np.array(eigenvalues, dtype=float)
+  }
+
+def run_buckling_eigen(forces, num_modes):
+  """
+  Solves the lowest num_modes critical load factors of the element axial
+  forces of a reference solve (see DirectDomain.buckling), the mean of the
+  end forces of each element.
+
+  Args:
+      forces: Element local forces (n_elements, 12), in get_elements() order
+
+  Returns:
+      tuple: the positive factors (ascending) and the eigen solve time (s)
+
+  Raises:
+      ValueError: if the reference loads do not compress the structure
+  """
+  # 'localForces' hold the forces on the element: -N at end I, N at end J
+  axial = (forces[:, 6] - forces[:, 0]) / 2
+  if not np.any(axial < 0):
+    raise ValueError("The reference loads compress no member: the structure does not buckle under them")
+  start = time.perf_counter()
+  factors = ops.buckling(get_elements(), axial, num_modes)
+  eigen_time = round(time.perf_counter() - start, 6)
+  if not factors:
+    raise ValueError("The structure does not buckle under the reference loads")
+  return factors, eigen_time
+
+def get_mode_shape(mode):
+  """Reads the shape of a mode (1-based) at the nodes, shape (n_nodes, 6), in output['nodes'] order."""
+  if isinstance(ops, DirectDomain):
+    return ops.node_eigenvectors(index.node_tags, mode)
+  return np.array([ops.nodeEigenvector(tag, mode) for tag in index.node_tags], dtype=float).reshape(-1, 6)
+
+def extract_shapes(count, result_format='json', on_shape=None):
+  """
+  Reads the shapes of the count modes of the last eigen or buckling analysis
+  and keeps them, scaled (see modal.scale_shape), at the display nodes (see
+  modal.display_rows): the model nodes and a stride of the mesh nodes.
+
+  on_shape(mode, translations) is called with the translations of every
+  mode (0-based) at all the nodes, shape (n_nodes, 3).
+
+  Output: the display 'nodes', the 'members' as the ids of their display
+  nodes and the 'shapes' (per mode, the ux, uy, uz of every display node,
+  flattened). With result_format='columnar', output['columns'] holds
+  node_ids, node_coords, member_ids, member_nodes (rows of their display
+  nodes, concatenated), member_starts (first member_nodes row of each
+  member) and mode_shapes (n_modes, n_nodes, 3) as float32.
+  """
   nodes = output['nodes']
+  rows = display_rows(len(index.nodes), len(nodes))
+  shapes = np.zeros((count, len(rows), 3), dtype=np.float32)
+  for mode in range(count):
+    shape = get_mode_shape(mode + 1)[:, :3]
+    if on_shape:
+      on_shape(mode, shape)
+    shapes[mode] = scale_shape(shape[rows])
+
+  # Display nodes of every member, from end to end
+  display_ids = [nodes[row]['id'] for row in rows]
+  display_rows_by_id = {node_id: k for (k, node_id) in enumerate(display_ids)}
+  member_nodes = [
+    [node['id'] for node in member['mesh']['nodes'] if node['id'] in display_rows_by_id]
+    for member in output['members']
+  ]
+
+  if result_format == 'columnar':
+    output['columns'] = {
+      'node_ids': id_column(display_ids),
+      'node_coords': np.array([[nodes[row]['x'], nodes[row]['y'], nodes[row]['z']] for row in rows], dtype=float).reshape(-1, 3),
+      'member_ids': id_column(member['id'] for member in output['members']),
+      'member_nodes': np.array([display_rows_by_id[node_id] for ids in member_nodes for node_id in ids], dtype='<i4'),
+      'member_starts': np.concatenate(([0], np.cumsum([len(ids) for ids in member_nodes])[:-1])).astype('<i4'),
+      'mode_shapes': shapes,
+    }
+    del output['nodes']
+    del output['members']
+    return
+
+  decimals = result_options['precision'] if result_options['precision'] is not None else SHAPE_DECIMALS
+  output['nodes'] = [nodes[row] for row in rows]
+  output['members'] = [{'id': member['id'], 'nodes': ids} for (member, ids) in zip(output['members'], member_nodes)]
+  output['shapes'] = np.round(shapes.reshape(count, -1).astype(float), decimals).tolist()
+
+def extract_modes(masses, result_format='json'):
+  """
+  Reads the mode shapes of the eigen analysis (output['analysis']) and
+  extracts the modal results.
+
+  Every mode shape is read at all the nodes for its effective masses (see
+  modal.effective_masses), and kept at the display nodes (see
+  extract_shapes).
+
+  Output: 'modes' with the 'periods' (s), 'frequencies' (Hz), and the
+  'mass_ratios' and 'cumulative_mass_ratios' of each direction (x, y, z),
+  'masses' (total and free to move in each direction, kg), and the shapes
+  (see extract_shapes). With result_format='columnar', output['columns']
+  also holds the periods, frequencies and mass_ratios (n_modes, 3).
+  """
+  eigenvalues = output['analysis'].pop('eigenvalues')
+  free_masses = masses @ get_free_translations()
+  effective = np.zeros((len(eigenvalues), 3))
+
+  def on_shape(mode, shape):
+    effective[mode] = effective_masses(masses, shape)
+
+  extract_shapes(len(eigenvalues), result_format, on_shape)
+  with np.errstate(divide='ignore', invalid='ignore'):
+    ratios = np.where(free_masses > 0, effective / np.where(free_masses > 0, free_masses, 1.0), 0.0)
+  mode_periods = periods(eigenvalues)
+  frequencies = np.sqrt(np.maximum(eigenvalues, 0.0)) / (2 * np.pi)
+
+  output['masses'] = {'total': float(masses.sum()), 'free': dict(zip(DIRECTIONS, free_masses.tolist()))}
+  output['units'] = {'periods': 's', 'frequencies': 'Hz', 'masses': 'kg', 'shapes': 'scaled to 1'}
+  if result_format == 'columnar':
+    output['columns'].update(periods=mode_periods, frequencies=frequencies, mass_ratios=ratios)
+    return
+
+  output['modes'] = {
+    'periods': mode_periods.tolist(),
+    'frequencies': frequencies.tolist(),
+    'mass_ratios': dict(zip(DIRECTIONS, ratios.T.tolist())),
+    'cumulative_mass_ratios': dict(zip(DIRECTIONS, np.cumsum(ratios, axis=0).T.tolist())),
+  }
+
+def get_bandwidth():
+  """
+  Estimated half-bandwidth of the stiffness (see solvers.estimate_bandwidth),
+  from the output members and, in OpenSees, the springs to the shared ground
+  node (see add_spring_support), which its RCM numbering goes through.
+  """
+  rows = index.output_nodes
+  pairs = [
+    (rows[child['nodei']], rows[child['nodej']])
+    for member in output['members'] for child in member['mesh']['members']
+  ]
+  links = []
+  if index.ground is not None:
+    links = [(rows[node_id], len(rows)) for node_id in index.springs]
+  return estimate_bandwidth(pairs, len(rows) + bool(links), links=links)
+
+def get_elements():
+  """Returns the tags of the elements of every member mesh, in output order."""
+  return index.elements
+
+def get_releases():
+  """Returns the ('-releasez', '-releasey') codes of the elements, shape (n_elements, 2), in get_elements() order."""
+  return np.repeat(np.array(index.releases, dtype=int).reshape(-1, 1), 2, axis=1)
+
+def collect_state(element_loads=None, equivalent=False):
+  """
+  Reads the raw results of the current solve.
+
+  Args:
+      element_loads: Element uniform loads of the solved case (see apply_loads)
+      equivalent: Whether the element loads were applied as equivalent nodal
+          loads: their fixed-end forces are added to the element forces
+
+  Returns:
+      dict: 'displacements' (n_nodes, 6) in output['nodes'] order,
+      'forces' (n_elements, 12) element local forces and 'loads'
+      (n_elements, 3) element uniform loads in get_elements() order, and
+      when requested, 'reactions' (n_supports, 6) in index.supports order
+      (the forces of the supports on the structure, springs included)
+  """
+  nodes = output['nodes']
+  elements = get_elements()
+  displacements = np.zeros((len(nodes), 6))
+  forces = np.zeros((len(elements), 12))
+
+  if isinstance(ops, DirectDomain):
+    # Read from the solution arrays at once
+    displacements = ops.node_displacements(index.node_tags)
+    forces = ops.local_forces(elements)
+  else:
+    for (i, (node, node_tag)) in enumerate(zip(nodes, index.node_tags)):
+      try:
+        displacements[i] = ops.nodeDisp(node_tag)
+      except Exception as e:
+        print(f"Warning: Could not extract displacement for node {node['id']}: {e}")
 
-  for node in nodes:
-    node_id = node['id']
-    try:
-      disp = ops.nodeDisp(node_id) 
-      node['displacements'] = {
-        'ux': round(disp[0], 5),  
-        'uy': round(disp[1], 5),    
-        'uz': round(disp[2], 5),  
-        'rx': round(disp[3], 5),  
-        'ry': round(disp[4], 5),  
-        'rz': round(disp[5], 5),
-      }
-
-      
-    except Exception as e:
-      print(f"Warning: Could not extract displacement for node {node_id}: {e}")
+    for (k, ele_tag) in enumerate(elements):
+      try:
+        forces[k] = ops.eleResponse(ele_tag, 'localForces')
+      except Exception as e:
+        print(f"Warning: Failed to get local forces for element {ele_tag}: {e}")
+
+  loads = np.zeros((len(elements), 3)) if element_loads is None else np.array(element_loads)
+  if equivalent:
+    forces += fixed_end_forces(loads, get_geometry()['length'], get_releases())
+  state = {'displacements': displacements, 'forces': forces, 'loads': loads}
+
+  if 'reactions' in result_options['fields']:
+    # Fixed nodes: reactions of the domain; elastic supports: opposite of their spring forces
+    reactions = np.zeros((len(index.supports), 6))
+    if any(index.supports.values()):
+      ops.reactions()
+    for (k, (node_id, support_tags)) in enumerate(index.supports.items()):
+      for tag in support_tags:
+        reactions[k] += ops.nodeReaction(tag)
+      if node_id in index.springs:
+        reactions[k] -= np.array(index.springs[node_id]) * displacements[index.output_nodes[node_id]]
+    state['reactions'] = reactions
+  return state
+
+def format_displacements(disp, decimals=5):
+  """Formats a node displacement vector."""
+  return {
+    'ux': round(disp[0], decimals),  
+    'uy': round(disp[1], decimals),    
+    'uz': round(disp[2], decimals),  
+    'rx': round(disp[3], decimals),  
+    'ry': round(disp[4], decimals),  
+    'rz': round(disp[5], decimals),
+  }
+
+def format_reactions(state):
+  """Formats the support reactions of a state (kN and kNm, in the analysis axes)."""
+  decimals = result_options['precision'] if result_options['precision'] is not None else 2
+  return [
+    {'node': node_id, 'reactions': dict(zip(REACTIONS, np.round(reactions / 1E3, decimals).tolist()))}
+    for (node_id, reactions) in zip(index.supports, state['reactions'])
+  ]
+
+def get_element_geometry(ele_tag):
+  """
+  Reads the end nodes, coordinates and local axes of an element.
+
+  Returns:
+      dict: {'nodes' (output node ids), 'ecrd', 'g'} or None if the element
+      cannot be read
+  """
+  try:
+    ele_node_tags = ops.eleNodes(ele_tag)
+    if not ele_node_tags or len(ele_node_tags) < 2:
+      print(f"Warning: Element {ele_tag} has invalid node tags: {ele_node_tags}")
+      return None
+    ecrd = np.array([ops.nodeCoord(tag) for tag in ele_node_tags])
+  except Exception as e:
+    print(f"Warning: Failed to get nodes/coordinates for element {ele_tag}: {e}")
+    return None
 
-def extract_results():
-  """Extracts and processes results from the analysis."""
-  members = output['members']
-  
-  extract_node_displacements()
+  try:
+    xloc = ops.eleResponse(ele_tag, 'xlocal')
+    yloc = ops.eleResponse(ele_tag, 'ylocal')
+    zloc = ops.eleResponse(ele_tag, 'zlocal')
+    g = np.vstack((xloc, yloc, zloc))
+  except Exception as e:
+    print(f"Warning: Failed to get local coordinate system for element {ele_tag}: {e}")
+    return None
 
+  # If needed, adjust for offsets:
+  try:
+    ele_offsets = np.array(ops.eleResponse(ele_tag, 'offsets'))
+    if np.any(ele_offsets):
+      ecrd[:, 0] += ele_offsets[[0, 3]]
+      ecrd[:, 1] += ele_offsets[[1, 4]]
+      ecrd[:, 2] += ele_offsets[[2, 5]]
+  except Exception as e:
+    # Offsets are optional, continue if they fail
+    pass
+
+  return {'nodes': tags.node_ids(ele_node_tags[:2]), 'ecrd': ecrd, 'g': g}
+
+def get_geometry():
+  """stack_geometry() of every element, read from the domain once per built model."""
+  if index.geometry is None:
+    if isinstance(ops, DirectDomain):
+      axes = ops.element_axes(get_elements())
+      index.geometry = stack_geometry([
+        {'nodes': tags.node_ids(nodes), 'ecrd': ecrd, 'g': g}
+        for (nodes, ecrd, g) in zip(axes['nodes'].tolist(), axes['ecrd'], axes['g'])
+      ])
+    else:
+      index.geometry = stack_geometry([get_element_geometry(ele_tag) for ele_tag in get_elements()])
+  return index.geometry
+
+def stack_geometry(geometry):
+  """
+  Stacks the geometry of the elements into arrays.
+
+  Args:
+      geometry: get_element_geometry() of every element (None if unreadable)
+
+  Returns:
+      dict: 'nodes' (end node ids or None), 'ecrd' (n_elements, 2, 3), 'g'
+      (n_elements, 3, 3), 'length' (n_elements,) and 'valid' (n_elements,),
+      unreadable elements having zero coordinates and axes
+  """
+  count = len(geometry)
+  ecrd = np.zeros((count, 2, 3))
+  g = np.zeros((count, 3, 3))
+  valid = np.array([element is not None for element in geometry], dtype=bool)
+  if valid.any():
+    ecrd[valid] = np.stack([element['ecrd'][:2] for element in geometry if element is not None])
+    g[valid] = np.stack([element['g'] for element in geometry if element is not None])
+  return {
+    'nodes': [element and element['nodes'] for element in geometry],
+    'ecrd': ecrd,
+    'g': g,
+    'length': np.linalg.norm(ecrd[:, 1] - ecrd[:, 0], axis=1),
+    'valid': valid,
+  }
+
+def get_station_count(length, loaded, intensity=0.0):
+  """
+  Number of diagram stations of an element: its ends, plus regular stations
+  when it is loaded (see get_output_options).
+
+  The moment diagram under a transverse load w (N/m) is a parabola, whose
+  polyline through stations h apart deviates by at most w h² / 8: with a
+  tolerance, the stations are decimated to the fewest meeting it.
+  """
+  if not loaded:
+    return 2
+  count = result_options['stations'] or max(2, math.ceil(length / DIAGRAM_STATION_SPACING) + 1)
+  tolerance = result_options['tolerance']
+  if tolerance:
+    needed = 2 if intensity == 0 else math.ceil(length / math.sqrt(8 * tolerance * 1E3 / intensity)) + 1
+    count = min(count, max(2, needed))
+  return count
+
+def get_diagram_stations(geometry, loads):
+  """
+  Diagram stations of every element, contiguous per element in element order.
+
+  Args:
+      geometry: stack_geometry() arrays
+      loads: Uniform loads (Wy, Wz, Wx) of each element, shape (..., n_elements,
+          3); with several cases, an element is loaded when it is in any case
+
+  Returns:
+      tuple: (element row of each station, local x of each station, station
+      count of each element)
+  """
+  loads = np.abs(loads).reshape(-1, *loads.shape[-2:]).max(axis=0)
+  loaded = np.any(loads != 0, axis=1)
+  intensity = np.hypot(loads[:, 0], loads[:, 1])
+  counts = np.array([
+    get_station_count(length, flag, w) for (length, flag, w) in zip(geometry['length'], loaded, intensity)
+  ], dtype=int)
+  elements = np.repeat(np.arange(len(counts)), counts)
+  stations = np.concatenate([np.linspace(0., length, nep) for (length, nep) in zip(geometry['length'], counts)]) \
+    if len(counts) else np.zeros(0)
+  return elements, stations, counts
+
+def station_positions(geometry, elements, stations):
+  """Global coordinates of the diagram stations, shape (n_stations, 3)."""
+  return geometry['ecrd'][elements, 0] + stations[:, np.newaxis] * geometry['g'][elements, 0]
+
+def diagram_positions(geometry, elements, stations, station_forces, sfac=DIAGRAM_SCALE, components=None):
+  """
+  Base and displaced positions of the section force diagrams.
+
+  Args:
+      geometry: stack_geometry() arrays
+      elements, stations: Diagram stations (see get_diagram_stations)
+      station_forces: Section forces in kN and kNm, shape (n_stations, n_forces)
+      sfac: Diagram scale, in m per N or Nm
+      components: Indices in FORCES of the station_forces columns (all six by default)
+
+  Returns:
+      tuple: base positions (n_stations, 3) and displaced positions of each
+      force component (n_stations, n_forces, 3), in global coordinates
+  """
+  components = list(range(len(FORCES))) if components is None else list(components)
+  g = geometry['g'][elements]
+  base = station_positions(geometry, elements, stations)
+  offsets = station_forces * 1E3 * sfac * DIAGRAM_SIGNS[components]
+  displaced = base[:, np.newaxis] + offsets[..., np.newaxis] * g[:, [DIAGRAM_DIRECTIONS[c] for c in components]]
+  return base, displaced
+
+def format_state(state, geometry):
+  """
+  Formats a solve state (see collect_state) into per-node displacements and
+  per-member node efforts.
+
+  Node efforts are given at the element ends (averaged between adjacent
+  elements of a mesh) and, for elements carrying a uniform load, at regular
+  stations in between ('node' is None there). The requested section forces
+  (and only those) and their diagrams are computed for all the stations at once.
+
+  Args:
+      state: {'displacements', 'forces', 'loads'} arrays
+      geometry: stack_geometry() of every element, in get_elements() order
+
+  Only the requested fields are computed (see get_output_options).
+
+  Returns:
+      dict: {'nodes': [{'id', 'displacements'}], 'members': [{'id', 'node_efforts'}]},
+      and 'reactions': [{'node', 'reactions'}] when requested
+  """
+  result = {'nodes': format_nodes(state), 'members': format_members(state, geometry)}
+  if 'reactions' in result_options['fields']:
+    result['reactions'] = format_reactions(state)
+  return result
+
+def format_nodes(state, start=0, stop=None):
+  """Formats the displacements of the output nodes [start:stop] (see format_state)."""
+  nodes = output['nodes'][start:stop]
+  if 'displacements' not in result_options['fields']:
+    return [{'id': node['id']} for node in nodes]
+  decimals = result_options['precision'] if result_options['precision'] is not None else 5
+  return [
+    {'id': node['id'], 'displacements': format_displacements(disp, decimals)}
+    for (node, disp) in zip(nodes, state['displacements'][start:stop].tolist())
+  ]
+
+def format_members(state, geometry, start=0, stop=None):
+  """Formats the node efforts of the output members [start:stop] (see format_state)."""
+  members = output['members'][start:stop]
+  if 'efforts' not in result_options['fields']:
+    return [{'id': member['id']} for member in members]
+  rows = index.member_rows + [len(index.elements)]
+  first, last = rows[start], rows[start + len(members)]
+  geometry = {key: values[first:last] for (key, values) in geometry.items()}
+  forces = state['forces'][first:last]
+  loads = state['loads'][first:last]
+
+  elements, stations, counts = get_diagram_stations(geometry, loads)
+  selected = [FORCES.index(force) for force in result_options['forces']]
+  station_forces = element_station_forces(forces, loads, elements, stations, components=selected)
+  decimals = result_options['precision'] if result_options['precision'] is not None else 2
+  if 'diagrams' in result_options['fields']:
+    base, displaced = diagram_positions(
+      geometry, elements, stations, station_forces, result_options['diagram_scale'], selected
+    )
+    displaced = displaced.tolist()
+  else:
+    base = station_positions(geometry, elements, stations)
+    displaced = None
+  force_values = station_forces.tolist()
+  base = base.tolist()
+
+  results = []
+  k = 0
+  row = 0
   for member in members:
-    mesh = member['mesh']
-    nodes = mesh['nodes']
-    child_members = mesh['members']
     node_efforts_dict = {}
 
-    forces = ['N', 'Vy', 'Vz', 'T', 'My', 'Mz']
-    for child_member in child_members:
+    for child_member in member['mesh']['members']:
       child_id = child_member['id']
-      
-      try:
-        ele_node_tags = ops.eleNodes(child_id)
-        if not ele_node_tags or len(ele_node_tags) < 2:
-          print(f"Warning: Element {child_id} has invalid node tags: {ele_node_tags}")
-          continue
-          
-        node_i = ele_node_tags[0]
-        node_j = ele_node_tags[1]
-
-        node_i_coord = ops.nodeCoord(node_i)
-        node_j_coord = ops.nodeCoord(node_j)
-      except Exception as e:
-        print(f"Warning: Failed to get nodes/coordinates for element {child_id}: {e}")
+      nep = counts[k]
+      first = row
+      row += nep
+      if not geometry['valid'][k]:
+        k += 1
         continue
-
-      # Initialize node efforts dictionaries if they don't exist
-      if node_i not in node_efforts_dict:
-          node_efforts_dict[node_i] = {
-              "node": node_i,
-              "efforts": {},
-              "coord": node_i_coord,
-          }
-      
-      if node_j not in node_efforts_dict:
-          node_efforts_dict[node_j] = {
-              "node": node_j,
-              "efforts": {},
-              "coord": node_j_coord,
-          }
-
-      # Process each force type
-      for force in forces:
-        try:
-          data = extract_section_force_data(child_id, force, sfac=1E-5, nep=2, dir_plt=0)
-          force_values = data['force_values']
-          displaced_positions = data['displaced_positions']
-          
-          # Determine unit based on force type
-          if force in ['N']:
-            unit = "kN"
-          elif force in ['Vy', 'Vz']:
-            unit = "kN"
-          elif force in ['T']:
-            unit = "kNm"
-          elif force in ['My', 'Mz']:
-            unit = "kNm"
-          else:
-            unit = "kN"
-
-          # Process node i
-          if force not in node_efforts_dict[node_i]["efforts"]:
-              node_efforts_dict[node_i]["efforts"][force] = {
-                "value": np.round(force_values[0], 2),
-                "unit": unit,
-                "displaced_positions": displaced_positions[0]
+      node_i, node_j = geometry['nodes'][k]
+      k += 1
+
+      # Station keys: end nodes are shared with the adjacent elements
+      keys = [node_i] + [(child_id, i) for i in range(1, nep - 1)] + [node_j]
+      for (i, station) in enumerate(keys):
+        values = force_values[first + i]
+        node_effort = node_efforts_dict.get(station)
+        if node_effort is None:
+          node_efforts_dict[station] = {
+            "node": None if isinstance(station, tuple) else station,
+            "efforts": {
+              force: {
+                "value": np.round(values[f], decimals),
+                "unit": FORCE_UNITS[force],
+                **({"displaced_positions": displaced[first + i][f]} if displaced is not None else {})
               }
-          else:
-            # Average with existing value
-            current_value = node_efforts_dict[node_i]["efforts"][force]["value"]
-            mean_value = (current_value + force_values[0]) / 2
-            node_efforts_dict[node_i]["efforts"][force]["value"] = np.round(mean_value, 2)
-          
-          # Process node j
-          if force not in node_efforts_dict[node_j]["efforts"]:
-            node_efforts_dict[node_j]["efforts"][force] = {
-              "value": np.round(force_values[1], 2),
-              "unit": unit,
-              "displaced_positions": displaced_positions[1]
-            }
-          else:
-            # Average with existing value
-            current_value = node_efforts_dict[node_j]["efforts"][force]["value"]
-            mean_value = (current_value + force_values[1]) / 2
-            node_efforts_dict[node_j]["efforts"][force]["value"] = np.round(mean_value, 2)
-            
-        except Exception as e:
-          print(f"Warning: Could not extract {force} data for element {child_id}: {e}")
-          continue
+              for (f, force) in enumerate(result_options['forces'])
+            },
+            "coord": base[first + i],
+          }
+        else:
+          # Average with the value of the adjacent element
+          for (f, force) in enumerate(result_options['forces']):
+            effort = node_effort["efforts"][force]
+            effort["value"] = np.round((effort["value"] + values[f]) / 2, decimals)
     
-    member['node_efforts'] = list(node_efforts_dict.values())
+    results.append({'id': member['id'], 'node_efforts': list(node_efforts_dict.values())})
+
+  return results
+
+def extract_envelopes(states, combinations, geometry):
+  """Computes the min/max envelopes of displacements and section forces over the combinations."""
+  weights = np.array([combination['weights'] for combination in combinations])
+  case_loads = np.stack([state['loads'] for state in states])
+
+  # Diagram stations of every element (see format_state), loaded in any case
+  elements, stations, _ = get_diagram_stations(geometry, case_loads)
+
+  # (combinations x nodes x 6) and (combinations x stations x 6) by superposition
+  displacements = np.tensordot(weights, np.stack([state['displacements'] for state in states]), axes=1)
+  case_forces = element_station_forces(
+    np.stack([state['forces'] for state in states]), case_loads, elements, stations
+  )
+  station_forces = np.tensordot(weights, case_forces, axes=1)
+
+  member_stations = np.searchsorted(elements, index.member_rows)
+
+  return compute_envelopes(
+    [combination['id'] for combination in combinations],
+    [node['id'] for node in output['nodes']],
+    displacements,
+    [member['id'] for member in output['members']],
+    member_stations,
+    station_forces
+  )
+
+def extract_results(states, cases=None, combinations=None, detailed=False):
+  """
+  Extracts and processes results from the analysis.
+
+  Args:
+      states: Per-case solve states (see collect_state)
+      cases: Load cases (see get_load_cases)
+      combinations: Load combinations (see get_load_combinations), computed by
+          superposition of the case states
+      detailed: Whether to output the results of every case and combination
+  """
+  cases = cases or [{'id': None, 'name': None}]
+  combinations = combinations or []
+  geometry = get_geometry()
+
+  # Cases are only formatted when their results are output
+  if detailed or not combinations:
+    case_results = [format_state(state, geometry) for state in (states if detailed else states[:1])]
+  combination_results = [
+    format_state(combine_states(states, combination['weights']), geometry)
+    for combination in (combinations if detailed else combinations[:1])
+  ]
+
+  # Top-level results: first combination, or first load case
+  primary = combination_results[0] if combination_results else case_results[0]
+  for (node, result) in zip(output['nodes'], primary['nodes']):
+    node.update(result)
+  for (member, result) in zip(output['members'], primary['members']):
+    member.update(result)
     # member['plot_2d'] = plot_2d(member, forces)
+  if 'reactions' in primary:
+    output['reactions'] = primary['reactions']
+
+  if combinations:
+    output['envelopes'] = extract_envelopes(states, combinations, geometry)
+
+  if detailed:
+    output['load_cases'] = [
+      {'id': case['id'], 'name': case['name'], **result}
+      for (case, result) in zip(cases, case_results)
+    ]
+    output['load_combinations'] = [
+      {'id': combination['id'], 'name': combination['name'], 'factors': combination['factors'], **result}
+      for (combination, result) in zip(combinations, combination_results)
+    ]
+
+
+def stream_results(states, cases=None, combinations=None, detailed=False, emit=None, chunk_size=None):
+  """
+  Extracts the results in chunks, passing each one to emit(chunk) instead of
+  keeping them in output, so only one chunk of formatted results is alive at
+  a time.
+
+  Node displacements come first (followed by a 'reactions' chunk when they
+  are requested), then member diagrams:
+  {'type': 'nodes' | 'members', 'result': None, 'nodes' | 'members': [...]}
+  with at most chunk_size (RESULT_CHUNK_SIZE) entries, in the format of
+  output['nodes'] and output['members'] for the top-level results ('result' None). With detailed,
+  the chunks of every case and combination follow, in the format of the
+  load_cases entries, with 'result' {'load_case': id} or {'load_combination': id}.
+  output keeps the summary: analysis, envelopes and the case and combination
+  ids, names and factors.
+  """
+  cases = cases or [{'id': None, 'name': None}]
+  combinations = combinations or []
+  chunk_size = chunk_size or RESULT_CHUNK_SIZE
+  geometry = get_geometry()
+
+  combined = [combine_states(states, combination['weights']) for combination in combinations]
+  results = [(None, combined[0] if combined else states[0])]
+  if detailed:
+    results += [({'load_case': case['id']}, state) for (case, state) in zip(cases, states)]
+    results += [({'load_combination': combination['id']}, state) for (combination, state) in zip(combinations, combined)]
+
+  for (result, state) in results:
+    for start in range(0, len(output['nodes']), chunk_size):
+      nodes = format_nodes(state, start, start + chunk_size)
+      if result is None:
+        nodes = [{**node, **formatted} for (node, formatted) in zip(output['nodes'][start:start + chunk_size], nodes)]
+      emit({'type': 'nodes', 'result': result, 'nodes': nodes})
+    if 'reactions' in result_options['fields']:
+      emit({'type': 'reactions', 'result': result, 'reactions': format_reactions(state)})
+
+  for (result, state) in results:
+    for start in range(0, len(output['members']), chunk_size):
+      members = format_members(state, geometry, start, start + chunk_size)
+      if result is None:
+        members = [{**member, **formatted} for (member, formatted) in zip(output['members'][start:start + chunk_size], members)]
+      emit({'type': 'members', 'result': result, 'members': members})
+
+  if combinations:
+    output['envelopes'] = extract_envelopes(states, combinations, geometry)
+  if detailed:
+    output['load_cases'] = [{'id': case['id'], 'name': case['name']} for case in cases]
+    output['load_combinations'] = [
+      {'id': combination['id'], 'name': combination['name'], 'factors': combination['factors']}
+      for combination in combinations
+    ]
+  del output['nodes']
+  del output['members']
+
+def extract_columns(states, cases=None, combinations=None, detailed=False):
+  """
+  Extracts the results as columns (see columnar.py) into output['columns'].
+
+  Stations are not merged between adjacent elements: every element has its
+  diagram stations (loaded in any case), contiguous in element order, and
+  diagrams are drawn from the station coordinates along the element local
+  axes (output['diagram']). The top-level displacements and station forces
+  hold the first combination (or the first case), and with detailed, the
+  results of every case and combination are stacked on a leading axis.
+
+  Columns: node_ids, node_coords, member_ids, member_elements (first element
+  row), element_ids, element_nodes, element_axes (n_elements, 3, 3),
+  element_stations (first station row), station_x, station_coords,
+  displacements (n_nodes, 6), station_forces (n_stations, n_forces) in kN
+  and kNm, and with the reactions field: reaction_nodes, reactions
+  (n_supports, 6) in kN and kNm. The displacement and station force columns
+  are left out when their field is not requested (see get_output_options).
+  """
+  cases = cases or [{'id': None, 'name': None}]
+  combinations = combinations or []
+  geometry = get_geometry()
+
+  elements, stations, counts = get_diagram_stations(geometry, np.stack([state['loads'] for state in states]))
+  case_displacements = np.stack([state['displacements'] for state in states])
+  forces = result_options['forces']
+  selected = [FORCES.index(force) for force in forces]
+  case_forces = element_station_forces(
+    np.stack([state['forces'] for state in states]), np.stack([state['loads'] for state in states]), elements, stations,
+    components=selected
+  )
+
+  # Combinations by superposition of the cases
+  weights = np.array([combination['weights'] for combination in combinations]).reshape(len(combinations), len(states))
+  combination_displacements = np.tensordot(weights, case_displacements, axes=1)
+  combination_forces = np.tensordot(weights, case_forces, axes=1)
+
+  # End nodes of the unreadable elements are NaN
+  element_nodes = [node for nodes in geometry['nodes'] for node in (nodes or (None, None))]
+  columns = {
+    'node_ids': id_column(node['id'] for node in output['nodes']),
+    'node_coords': np.array([[node['x'], node['y'], node['z']] for node in output['nodes']], dtype=float).reshape(-1, 3),
+    'member_ids': id_column(member['id'] for member in output['members']),
+    'member_elements': np.array(index.member_rows, dtype='<i4'),
+    'element_ids': id_column(get_elements()),
+    'element_nodes': id_column(element_nodes).reshape(-1, 2),
+    'element_axes': geometry['g'],
+    'element_stations': np.concatenate(([0], np.cumsum(counts)[:-1])).astype('<i4'),
+    'station_x': stations,
+    'station_coords': station_positions(geometry, elements, stations),
+    'displacements': combination_displacements[0] if combinations else case_displacements[0],
+    'station_forces': combination_forces[0] if combinations else case_forces[0],
+  }
+  if detailed:
+    columns['case_displacements'] = case_displacements
+    columns['case_station_forces'] = case_forces
+    columns['combination_displacements'] = combination_displacements
+    columns['combination_station_forces'] = combination_forces
+  fields = result_options['fields']
+  if 'displacements' not in fields:
+    for name in ('displacements', 'case_displacements', 'combination_displacements'):
+      columns.pop(name, None)
+  if 'efforts' not in fields:
+    for name in ('station_forces', 'case_station_forces', 'combination_station_forces'):
+      columns.pop(name, None)
+  if 'reactions' in fields:
+    case_reactions = np.stack([state['reactions'] for state in states]) / 1E3
+    combination_reactions = np.tensordot(weights, case_reactions, axes=1)
+    columns['reaction_nodes'] = id_column(index.supports)
+    columns['reactions'] = combination_reactions[0] if combinations else case_reactions[0]
+    if detailed:
+      columns['case_reactions'] = case_reactions
+      columns['combination_reactions'] = combination_reactions
+  if detailed:
+    output['load_cases'] = [{'id': case['id'], 'name': case['name']} for case in cases]
+    output['load_combinations'] = [
+      {'id': combination['id'], 'name': combination['name'], 'factors': combination['factors']}
+      for combination in combinations
+    ]
+
+  if combinations:
+    output['envelopes'] = extract_envelopes(states, combinations, geometry)
+
+  output['forces'] = forces
+  output['units'] = {'displacements': 'm, rad', 'forces': FORCE_UNITS}
+  output['diagram'] = {
+    'scale': result_options['diagram_scale'],
+    'directions': DIAGRAM_DIRECTIONS,
+    'signs': DIAGRAM_SIGNS.tolist(),
+  }
+  output['columns'] = columns
+  del output['nodes']
+  del output['members']
 
-  
 def plot_2d(member, forces_to_plot=None):
   vecz = np.array([0, 0, 1])
   scale = 1
@@ -705,145 +2017,6 @@ def plot_2d(member, forces_to_plot=None):
   return output_plot
 
 
-def section_force_distribution_3d(ecrd, pl, nep=2,
-                                  ele_load_data=[['-beamUniform', 0., 0., 0.]]):
-    """
-    Calculate section forces (N, Vy, Vz, T, My, Mz) for an elastic 3d beam.
-
-    Longer description
-
-    Parameters
-    ----------
-
-    ecrd : ndarray
-        x, y, z element coordinates
-    pl : ndarray
-    nep : int
-        number of evaluation points, by default (2) at element ends
-
-    ele_load_list : list
-        list of transverse and longitudinal element load
-        syntax: [ele_load_type, Wy, Wz, Wx]
-        For now only '-beamUniform' element load type is acceptable.
-
-    Returns
-    -------
-
-    s : ndarray
-        [N Vx Vy T My Mz]; shape: (nep,6)
-        column vectors of section forces along local x-axis
-
-    uvwfi : ndarray
-        [u v w fi]; shape (nep,4)
-        displacements at nep points along local x
-
-    xl : ndarray
-        coordinates of local x-axis; shape (nep,)
-
-    nep : int
-        number of evaluation points, by default (2) at element ends
-        If the element load is between the points then nep is increased by 1 or 2
-
-    Notes
-    -----
-
-    Todo: add '-beamPoint' element load type
-
-    """
-    Lxyz = ecrd[1, :] - ecrd[0, :]
-    L = np.sqrt(Lxyz @ Lxyz)
-
-    nlf = len(pl)
-    xl = np.linspace(0., L, nep)
-
-    for ele_load_data_i in ele_load_data:
-        ele_load_type = ele_load_data_i[0]
-
-        if nlf == 1:
-            N1 = pl[0]
-        elif nlf == 12:
-            N1, Vy1, Vz1, T1, My1, Mz1 = pl[:6]
-        else:
-            print('\nWarning! Not supported. Number of nodal forces: {nlf}')
-
-        if ele_load_type == '-beamUniform':
-            n_ele_load_data = len(ele_load_data_i)
-
-            if n_ele_load_data == 4:
-                pass
-
-        elif ele_load_type == '-beamPoint':
-            Py, Pz, aL, Px = ele_load_data_i[1:5]
-            a = aL * L
-
-            if a in xl:
-                xl = np.insert(xl, xl.searchsorted(a+0.001), a+0.001)
-                nep += 1
-
-            else:
-                xl = np.insert(xl, xl.searchsorted(a), a)
-                xl = np.insert(xl, xl.searchsorted(a+0.001), a+0.001)
-                nep += 2
-
-    one = np.ones(nep)
-
-    N = -1. * (N1 * one)
-
-    if nlf == 12:
-        Vy = Vy1 * one
-        Vz = Vz1 * one
-        T = -T1 * one
-        Mz = -Mz1 * one + Vy1 * xl
-        My = -My1 * one - Vz1 * xl
-
-        s = np.column_stack((N, Vy, Vz, T, My, Mz))
-
-    elif nlf == 1:
-        s = np.column_stack((N))
-
-    for ele_load_data_i in ele_load_data:
-        ele_load_type = ele_load_data_i[0]
-
-        if ele_load_type == '-beamUniform':
-            n_ele_load_data = len(ele_load_data_i)
-
-            if n_ele_load_data == 4:
-                Wy, Wz, Wx = ele_load_data_i[1:4]
-
-                N = -1. * (Wx * xl)
-
-                if nlf == 12:
-                    Vy = Wy * xl
-                    Vz = Wz * xl
-                    T = np.zeros_like(one)
-                    Mz = 0.5 * Wy * xl**2
-                    My = -0.5 * Wz * xl**2
-
-                    s += np.column_stack((N, Vy, Vz, T, My, Mz))
-
-                elif nlf == 1:
-                    s += np.column_stack((N))
-
-        elif ele_load_type == '-beamPoint':
-            Py, Pz, aL, Px = ele_load_data_i[1:5]
-            a = aL * L
-
-            indx = 0
-            for x in np.nditer(xl):
-                if x <= a:
-                    pass
-                elif x > a:
-                    s[indx, 0] += -1. * Px
-                    s[indx, 1] += Py
-                    s[indx, 2] += Pz
-                    s[indx, 4] += - Pz * (x - a)
-                    s[indx, 5] += Py * (x - a)
-
-                indx += 1
-
-    return s, xl, nep
-
-
 def section_force_distribution_2d(ecrd, pl, nep=2,
                                   ele_load_data=[['-beamUniform', 0., 0.]]):
     """
@@ -1034,109 +2207,3 @@ def section_force_distribution_2d(ecrd, pl, nep=2,
     # else:
 
     return s, xl, nep
-
-def extract_section_force_data(ele_tag, sf_type, sfac=1/500, nep=2, dir_plt=0,):
-    # https://portwooddigital.com/2022/11/04/simple-loads-on-a-cantilever/
-    
-    # Retrieve element tags from the analysis
-    # ele_tags = ops.getEleTags()
-    force_data = {}
-
-    # for ele_tag in ele_tags:
-        # Get node coordinates for the element
-    try:
-        ele_node_tags = ops.eleNodes(ele_tag)
-        if not ele_node_tags or len(ele_node_tags) < 2:
-            raise ValueError(f"Element {ele_tag} has invalid node tags: {ele_node_tags}")
-        ecrd = np.array([ops.nodeCoord(tag) for tag in ele_node_tags])
-    except Exception as e:
-        raise Exception(f"Failed to get nodes/coordinates for element {ele_tag}: {e}")
-    
-    # Compute local coordinate system (xlocal, ylocal, zlocal)
-    try:
-        xloc = ops.eleResponse(ele_tag, 'xlocal')
-        yloc = ops.eleResponse(ele_tag, 'ylocal')
-        zloc = ops.eleResponse(ele_tag, 'zlocal')
-        g = np.vstack((xloc, yloc, zloc))
-    except Exception as e:
-        raise Exception(f"Failed to get local coordinate system for element {ele_tag}: {e}")
-    
-    # If needed, adjust for offsets:
-    try:
-        ele_offsets = np.array(ops.eleResponse(ele_tag, 'offsets'))
-        if np.any(ele_offsets):
-            ecrd[:, 0] += ele_offsets[[0, 3]]
-            ecrd[:, 1] += ele_offsets[[1, 4]]
-            ecrd[:, 2] += ele_offsets[[2, 5]]
-    except Exception as e:
-        # Offsets are optional, continue if they fail
-        pass
-    
-    # Get section force distribution data:
-    try:
-        pl = ops.eleResponse(ele_tag, 'localForces')
-    except Exception as e:
-        raise Exception(f"Failed to get local forces for element {ele_tag}: {e}")
-
-    s_all, xl, nep = section_force_distribution_3d(ecrd, pl, nep, [['-beamUniform', 0., 0., 0.]])
-  
-    if sf_type == 'N':
-        ss = s_all[:, 0]
-        default_dir = 1
-    elif sf_type == 'Vy':
-        ss = s_all[:, 1]
-        default_dir = 1
-    elif sf_type == 'Vz':
-        ss = s_all[:, 2]
-        default_dir = 2
-    elif sf_type == 'T':
-        ss = s_all[:, 3]
-        default_dir = 1
-    elif sf_type == 'My':
-        ss = s_all[:, 4]
-        default_dir = 2
-    elif sf_type == 'Mz':
-        ss = s_all[:, 5]
-        default_dir = 1
-    else:
-        raise ValueError("Invalid section force type.")
-    
-    if dir_plt == 0:
-        dir_plt = default_dir
-
-    # Compute the base positions s_0 along the beam in global coordinates
-    s_0 = np.zeros((nep, 3))
-    s_0[0, :] = ecrd[0, :]
-    s_0[1:, 0] = s_0[0, 0] + xl[1:] * g[0, 0]
-    s_0[1:, 1] = s_0[0, 1] + xl[1:] * g[0, 1]
-    s_0[1:, 2] = s_0[0, 2] + xl[1:] * g[0, 2]
-    
-    # print('s_0: ', s_0)
-    # Scale the force values
-    # print('SS: ', ss)
-    s_scaled = ss * sfac
-
-    if sf_type == 'Mz':  # Adjust sign if necessary
-        s_scaled *= -1
-    
-    # Compute the displaced positions s_p (offset by the scaled force in the chosen direction)
-    s_p = np.copy(s_0)
-    s_p[:, 0] += s_scaled * g[dir_plt, 0]
-    s_p[:, 1] += s_scaled * g[dir_plt, 1]
-    s_p[:, 2] += s_scaled * g[dir_plt, 2]
-    
-    # Determine min and max force values
-    minVal = np.amin(ss)
-    maxVal = np.amax(ss)
-    # print('s_p: ', s_p)
-    # Save the data for the current element
-    force_data = {
-        # "base_positions": s_0,
-        "displaced_positions": s_p.tolist(),
-        # "evaluation_points": xl,
-        "force_values": (ss / 1E3).tolist(),
-        # "min_value": minVal,
-        # "max_value": maxVal
-    }
-      
-    return force_data
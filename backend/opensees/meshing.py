@@ -0,0 +1,172 @@
+"""
+Member Meshing
+
+This module decides where members are split into elements. Distributed loads
+are element loads, so a linear member needs no interior node; interior nodes
+are only created for what needs them:
+
+- geometric nonlinearity (PDelta/Corotational) along the member,
+- an explicit segment count or length, global (analysis.mesh) or per member
+  (member.mesh),
+- requested output stations (member.stations, distances in m from node i),
+- in adaptive mode, model nodes lying on the span that carry loads or supports
+  (the global segmentation then only applies to nonlinear members, the
+  settings of a member still do),
+- a minimum segment count, for analyses whose elements are not exact with
+  one per member (the lumped masses of the modal analysis, the geometric
+  stiffness of the buckling analysis).
+
+The total number of DOFs is capped (analysis.mesh.max_dofs): uniform
+segmentation is coarsened to fit, required nodes are always kept.
+"""
+import math
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Segment length of members with a nonlinear geometric transformation
+MESH_SEGMENT_LENGTH = 0.5
+ANALYSIS_MAX_DOFS = int(os.environ.get("ANALYSIS_MAX_DOFS", 600000))
+
+MESH_MODES = ('uniform', 'adaptive')
+NONLINEAR_TRANSFORMATIONS = ('PDelta', 'Corotational')
+
+# Relative tolerance on positions along a member
+POSITION_TOLERANCE = 1e-6
+
+
+def get_mesh_options(model: dict) -> Dict:
+    """Returns the global meshing options (analysis.mesh), validated."""
+    options = (model.get('analysis') or {}).get('mesh') or {}
+    mode = options.get('mode', 'uniform')
+    if mode not in MESH_MODES:
+        raise ValueError(f"Unknown mesh mode: {mode}")
+    return {**options, 'mode': mode, 'max_dofs': options.get('max_dofs') or ANALYSIS_MAX_DOFS}
+
+
+def member_length(member: dict) -> float:
+    ni = member['nodei']
+    nj = member['nodej']
+    return math.sqrt((nj['x'] - ni['x'])**2 + (nj['y'] - ni['y'])**2 + (nj['z'] - ni['z'])**2)
+
+
+def get_target_segments(member: dict, options: Dict, length: float) -> int:
+    """
+    Segment count of a member: its own mesh settings, else the global ones,
+    else one segment (MESH_SEGMENT_LENGTH for nonlinear transformations).
+    """
+    for settings in (member.get('mesh') or {}, options):
+        if settings.get('segments'):
+            return max(1, int(settings['segments']))
+        if settings.get('segment_length'):
+            return max(1, math.ceil(length / settings['segment_length']))
+    if member.get('transformation', 'Linear') in NONLINEAR_TRANSFORMATIONS:
+        return math.ceil(length / MESH_SEGMENT_LENGTH)
+    return 1
+
+
+def get_loaded_nodes(model: dict) -> List[dict]:
+    """Model nodes targeted by nodal loads or boundary conditions."""
+    targets = set()
+    for load in model.get('loads', []):
+        if load['type'] == 'nodal':
+            targets.update(load['targets'])
+    for boundary_condition in model.get('boundary_conditions', []):
+        targets.update(boundary_condition['targets'])
+    return [node for node in model.get('nodes', []) if node['id'] in targets]
+
+
+def get_span_nodes(member: dict, node_ids: np.ndarray, coords: np.ndarray,
+                   length: float) -> List[Tuple[float, int]]:
+    """
+    Nodes lying strictly inside the span of a member, as (fraction, node id).
+
+    Args:
+        member: Member
+        node_ids: Ids of the candidate nodes, shape (n,)
+        coords: Coordinates of the candidate nodes, shape (n, 3)
+        length: Member length
+    """
+    pi = np.array([member['nodei']['x'], member['nodei']['y'], member['nodei']['z']], dtype=float)
+    pj = np.array([member['nodej']['x'], member['nodej']['y'], member['nodej']['z']], dtype=float)
+    axis = pj - pi
+    tolerance = POSITION_TOLERANCE * max(length, 1.0)
+
+    # Projection of the nodes in the bounding box of the member on its axis
+    inside = np.all((coords >= np.minimum(pi, pj) - tolerance) & (coords <= np.maximum(pi, pj) + tolerance), axis=1)
+    inside &= (node_ids != member['nodei']['id']) & (node_ids != member['nodej']['id'])
+    p = coords[inside] - pi
+    fraction = p @ axis / length**2
+    distance = np.linalg.norm(p - fraction[:, np.newaxis] * axis, axis=1)
+    on_span = (fraction * length > tolerance) & ((1 - fraction) * length > tolerance) & (distance <= tolerance)
+    return list(zip(fraction[on_span].tolist(), node_ids[inside][on_span].tolist()))
+
+
+def merge_points(points: List[Tuple[float, Optional[int]]]) -> List[Tuple[float, Optional[int]]]:
+    """Sorts interior points and merges coincident ones, keeping existing nodes."""
+    merged = []
+    for (fraction, node_id) in sorted(points, key=lambda point: (point[0], point[1] is None)):
+        if merged and fraction - merged[-1][0] <= POSITION_TOLERANCE:
+            if merged[-1][1] is None:
+                merged[-1] = (merged[-1][0], node_id)
+            continue
+        merged.append((fraction, node_id))
+    return merged
+
+
+def plan_meshes(model: dict, min_segments: int = 1) -> Dict[int, List[Tuple[float, Optional[int]]]]:
+    """
+    Plans the interior nodes of every member.
+
+    Args:
+        model: Structural model
+        min_segments: Fewest segments of every member, whatever its settings
+            and the mesh mode (the DOF cap still coarsens them)
+
+    Returns:
+        dict: member id -> sorted [(fraction along the member, existing node id
+        or None for a new node)]
+    """
+    options = get_mesh_options(model)
+    members = model.get('members', [])
+    loaded_nodes = get_loaded_nodes(model) if options['mode'] == 'adaptive' else []
+    loaded_ids = np.array([node['id'] for node in loaded_nodes])
+    loaded_coords = np.array([[node['x'], node['y'], node['z']] for node in loaded_nodes], dtype=float).reshape(-1, 3)
+
+    required = {}
+    segments = {}
+    for member in members:
+        length = member_length(member)
+        points = [
+            (station / length, None) for station in member.get('stations') or []
+            if 0 < station < length
+        ]
+        if len(loaded_nodes):
+            points += get_span_nodes(member, loaded_ids, loaded_coords, length)
+        required[member['id']] = points
+
+        nonlinear = member.get('transformation', 'Linear') in NONLINEAR_TRANSFORMATIONS
+        # Adaptive mode drops the global segmentation of linear members only
+        global_options = {} if options['mode'] == 'adaptive' and not nonlinear else options
+        count = get_target_segments(member, global_options, length)
+        segments[member['id']] = max(count, min_segments)
+
+    # DOF cap: coarsen the uniform segmentation, never the required nodes
+    base_nodes = len(model.get('nodes', [])) + sum(
+        sum(1 for (_, node_id) in points if node_id is None) for points in required.values()
+    )
+    budget = options['max_dofs'] // 6 - base_nodes
+    if budget < 0:
+        raise ValueError(f"The model needs more than the maximum of {options['max_dofs']} DOFs")
+    extra = sum(count - 1 for count in segments.values())
+    if extra > budget:
+        segments = {member_id: 1 + (count - 1) * budget // extra for (member_id, count) in segments.items()}
+
+    return {
+        member['id']: merge_points(
+            required[member['id']] +
+            [(i / segments[member['id']], None) for i in range(1, segments[member['id']])]
+        )
+        for member in members
+    }
@@ -0,0 +1,123 @@
+"""
+Modal Analysis
+
+This module holds the computations of the modal analysis (see
+run_modal_analysis), apart from the domain:
+
+- lumped masses (members split into MODAL_MIN_SEGMENTS elements at least):
+  half of the mass of every element (density of its material
+  x section area x length) on each of its end nodes, in the three
+  translations (no rotational inertia),
+- periods and frequencies of the eigenvalues (ω², rad²/s²),
+- participating mass ratios: effective modal mass of every mode in each
+  global direction, over the mass free to move in that direction,
+- mode shapes for display: translations of a decimated set of nodes (see
+  display_rows), every mode scaled to a largest translation of 1 and stored
+  as float32, so that a hundred modes of a large frame stay a few MB.
+
+Directions and translations are in the analysis axes, as the displacements
+(ux, uy, uz) of a static analysis.
+"""
+import math
+import os
+from typing import Dict
+
+import numpy as np
+
+# Density of the materials without one (kg/m³, steel)
+DEFAULT_DENSITY = 7850.0
+# Number of modes solved when analysis.modes is not given, and the most allowed
+DEFAULT_MODES = 12
+MAX_MODES = int(os.environ.get("ANALYSIS_MAX_MODES", 200))
+# Fewest segments of every member: the lumped masses of a single element
+# per member miss most of its inertia (a cantilever's first frequency comes
+# out 30 % low with one element, 0.7 % low with 8)
+MODAL_MIN_SEGMENTS = int(os.environ.get("ANALYSIS_MODAL_MIN_SEGMENTS", 8))
+# Number of nodes whose mode shapes are returned (model nodes are always kept)
+MODAL_DISPLAY_NODES = int(os.environ.get("ANALYSIS_MODAL_DISPLAY_NODES", 2000))
+# Decimals of the scaled mode shapes in the JSON results
+SHAPE_DECIMALS = 4
+
+DIRECTIONS = ('x', 'y', 'z')
+
+
+def get_modal_options(model: dict) -> Dict:
+    """Returns the requested number of modes (analysis.modes, DEFAULT_MODES by default), validated."""
+    options = model.get('analysis') or {}
+    modes = options.get('modes')
+    if modes is None:
+        modes = DEFAULT_MODES
+    if int(modes) != modes or not 1 <= modes <= MAX_MODES:
+        raise ValueError(f"The number of modes must be an integer between 1 and {MAX_MODES}")
+    return {'modes': int(modes)}
+
+
+def get_density(material: dict) -> float:
+    """Density of a material (rho, kg/m³), DEFAULT_DENSITY when it has none."""
+    density = material.get('rho')
+    return DEFAULT_DENSITY if density is None else float(density)
+
+
+def lumped_masses(nodes: np.ndarray, masses: np.ndarray, count: int) -> np.ndarray:
+    """
+    Lumps the element masses on their end nodes, half on each.
+
+    Args:
+        nodes: Node rows of the elements, shape (n_elements, 2)
+        masses: Element masses (kg), shape (n_elements,)
+        count: Number of nodes
+
+    Returns:
+        np.ndarray: Node masses (kg), shape (count,)
+    """
+    lumped = np.zeros(count)
+    nodes = np.asarray(nodes, dtype=int).reshape(-1, 2)
+    np.add.at(lumped, nodes, np.repeat(np.asarray(masses, dtype=float)[:, np.newaxis] / 2, 2, axis=1))
+    return lumped
+
+
+def periods(eigenvalues) -> np.ndarray:
+    """Periods (s) of the eigenvalues ω² (rad²/s²); infinite for rigid body modes."""
+    omega = np.sqrt(np.maximum(np.asarray(eigenvalues, dtype=float), 0.0))
+    with np.errstate(divide='ignore'):
+        return np.where(omega > 0, 2 * math.pi / np.where(omega > 0, omega, 1.0), np.inf)
+
+
+def effective_masses(masses: np.ndarray, shape: np.ndarray) -> np.ndarray:
+    """
+    Effective modal masses of a mode in the global directions: (Σ m φd)² / Σ m |φ|².
+
+    Args:
+        masses: Node masses (kg), shape (n_nodes,)
+        shape: Mode shape translations, shape (n_nodes, 3) (any scaling)
+
+    Returns:
+        np.ndarray: Effective masses (kg), shape (3,)
+    """
+    generalized = np.sum(masses * np.sum(shape ** 2, axis=1))
+    if generalized <= 0:
+        return np.zeros(3)
+    return (masses @ shape) ** 2 / generalized
+
+
+def scale_shape(shape: np.ndarray) -> np.ndarray:
+    """Mode shape translations (n_nodes, 3) scaled to a largest translation of 1, as float32."""
+    largest = np.linalg.norm(shape, axis=1).max(initial=0.0)
+    if largest > 0:
+        shape = shape / largest
+    return shape.astype(np.float32)
+
+
+def display_rows(num_model_nodes: int, num_nodes: int, limit: int = MODAL_DISPLAY_NODES) -> np.ndarray:
+    """
+    Rows of the nodes whose mode shapes are returned: the model nodes (listed
+    first), and every stride-th mesh node so that there are at most limit
+    nodes, or only the model nodes when they alone reach limit.
+    """
+    if num_nodes <= limit:
+        return np.arange(num_nodes)
+    model_rows = np.arange(num_model_nodes)
+    if num_model_nodes >= limit:
+        return model_rows
+    stride = math.ceil((num_nodes - num_model_nodes) / (limit - num_model_nodes))
+    return np.concatenate((model_rows, np.arange(num_model_nodes, num_nodes, stride)))
@@ -0,0 +1,440 @@
+"""
+Analysis Worker Pool
+
+This module runs structural analyses in a pool of pre-warmed worker processes.
+OpenSeesPy drives a single process-wide domain, so every worker process owns its
+own domain and solves one model at a time, while the event loop only awaits the
+result. The number of in-flight analyses is bounded: when the pool and its queue
+are full, new submissions are rejected with a 503 instead of piling up.
+
+Workers report analysis progress through bounded event queues, one per worker
+process, which listener threads in the parent process forward to the subscribed
+callbacks on the event loop. A coroutine callback is awaited before the next
+event of its worker is read, so a slow subscriber (e.g. a streaming client)
+holds its worker back instead of letting the events pile up in the parent.
+Events travel apart from the results, so a worker closes the events of an analysis
+with an end event, and the result is only returned once every event was delivered.
+
+Analyses of an editor session run in dedicated single-process workers, which keep
+the model of the last session they ran built (see session.py): a submission goes
+to the worker holding its session, else to an idle one (preferably holding no
+session, else the least recently used one), so that concurrent editors do not
+queue behind and evict each other. Session results are cached as the others,
+and a cached model does not reach a worker. Modal and buckling analyses (see
+run_modal_analysis, run_buckling_analysis) run on the shared workers, and are
+cached apart from the static results of a model.
+"""
+import asyncio
+import multiprocessing
+import os
+import queue
+import threading
+import uuid
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException
+
+from .main import run_analysis, run_buckling_analysis, run_modal_analysis
+from .cache import ResultCache
+from .session import AnalysisSession
+
+ANALYSIS_WORKERS = int(os.environ.get("ANALYSIS_WORKERS", os.cpu_count() or 1))
+ANALYSIS_QUEUE_SIZE = int(os.environ.get("ANALYSIS_QUEUE_SIZE", 4 * ANALYSIS_WORKERS))
+ANALYSIS_SESSION_WORKERS = int(os.environ.get("ANALYSIS_SESSION_WORKERS", max(1, ANALYSIS_WORKERS // 2)))
+
+# Last event of an analysis, sent after all its progress events
+EVENTS_END = "end"
+# How long to wait for the last progress events once the result is in (s)
+EVENTS_TIMEOUT = 5.0
+# Progress events a worker may send ahead of its listener before it waits
+EVENTS_QUEUE_SIZE = int(os.environ.get("ANALYSIS_EVENTS_QUEUE_SIZE", 4))
+
+
+class AnalysisError(Exception):
+    """Picklable error raised by a worker, re-raised as an HTTPException by the pool."""
+
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+# Progress event queue of the current worker process
+_events = None
+# Editor session whose model is built in the current worker process
+_session = None
+
+
+def init_worker(events: list, slots) -> None:
+    """Worker initializer: takes the first unused progress event queue."""
+    global _events
+    with slots.get_lock():
+        _events = events[slots.value]
+        slots.value += 1
+
+
+def warm_up() -> int:
+    """Loads OpenSees in the worker and resets its domain."""
+    import openseespy.opensees as ops
+    ops.wipe()
+    return os.getpid()
+
+
+def worker_progress(key: str):
+    """Returns a progress callback forwarding events to the parent process."""
+    if key is None or _events is None:
+        return None
+
+    def progress(phase: str, **data):
+        _events.put((key, phase, data))
+
+    return progress
+
+
+def analyze(model: dict, key: str = None, result_format: str = 'json', session: AnalysisSession = None) -> dict:
+    """Worker entry point: runs the analysis and converts errors to AnalysisError."""
+    try:
+        return run_analysis(model, worker_progress(key), result_format, session)
+    except HTTPException as e:
+        raise AnalysisError(e.status_code, str(e.detail)) from None
+    except Exception as e:
+        raise AnalysisError(500, str(e)) from None
+    finally:
+        if key is not None and _events is not None:
+            _events.put((key, EVENTS_END, {}))
+
+
+def analyze_modes(model: dict, result_format: str = 'json') -> dict:
+    """Worker entry point of the modal analyses (see run_modal_analysis)."""
+    try:
+        return run_modal_analysis(model, None, result_format)
+    except HTTPException as e:
+        raise AnalysisError(e.status_code, str(e.detail)) from None
+    except Exception as e:
+        raise AnalysisError(500, str(e)) from None
+
+
+def analyze_buckling(model: dict, result_format: str = 'json') -> dict:
+    """Worker entry point of the buckling analyses (see run_buckling_analysis)."""
+    try:
+        return run_buckling_analysis(model, None, result_format)
+    except HTTPException as e:
+        raise AnalysisError(e.status_code, str(e.detail)) from None
+    except Exception as e:
+        raise AnalysisError(500, str(e)) from None
+
+
+def analyze_session(session_id: str, model: dict, key: str = None, result_format: str = 'json') -> dict:
+    """Session worker entry point: updates the model of the session if this worker holds it."""
+    global _session
+    if _session is None or _session.id != session_id:
+        _session = AnalysisSession(session_id)
+    return analyze(model, key, result_format, _session)
+
+
+class AnalysisPool:
+    def __init__(self, workers: int = ANALYSIS_WORKERS, queue_size: int = ANALYSIS_QUEUE_SIZE,
+                 cache: ResultCache = None, session_workers: int = ANALYSIS_SESSION_WORKERS) -> None:
+        """
+        Initialize the pool.
+
+        Args:
+            workers: Number of worker processes (one OpenSees domain each)
+            queue_size: Number of analyses allowed to wait for a free worker
+            cache: Optional result cache consulted before dispatching a model
+            session_workers: Number of worker processes dedicated to sessions
+        """
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.cache = cache
+        self.session_workers = max(1, session_workers)
+        self.pending = 0
+        # Slots promised to submissions that did not reach submit() yet (see reserve)
+        self.reserved = 0
+        self._executor = None
+        self._session_executors = []
+        # Per session worker: id of the session whose model it holds, number of
+        # submissions running or waiting, and order of its last submission
+        self._session_holders = []
+        self._session_pending = []
+        self._session_used = []
+        self._dispatches = 0
+        self._events = None
+        self._listeners = {}
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of analyses running or waiting at the same time."""
+        return self.workers + self.queue_size
+
+    def start(self) -> None:
+        """Spawns the worker processes and pre-warms them."""
+        if self._executor is not None:
+            return
+        # Workers are spawned, not forked, so they never inherit the parent's
+        # OpenSees domain or the event loop threads.
+        context = multiprocessing.get_context("spawn")
+        self._events = [
+            context.Queue(maxsize=EVENTS_QUEUE_SIZE) for _ in range(self.workers + self.session_workers)
+        ]
+        slots = context.Value('i', 0)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=init_worker,
+            initargs=(self._events, slots)
+        )
+        self._session_executors = [
+            ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=init_worker, initargs=(self._events, slots))
+            for _ in range(self.session_workers)
+        ]
+        self._session_holders = [None] * self.session_workers
+        self._session_pending = [0] * self.session_workers
+        self._session_used = [0] * self.session_workers
+        for events in self._events:
+            threading.Thread(target=self._listen, args=(events,), daemon=True).start()
+        for _ in range(self.workers):
+            self._executor.submit(warm_up)
+        for executor in self._session_executors:
+            executor.submit(warm_up)
+
+    def shutdown(self) -> None:
+        """Stops the worker processes."""
+        if self._executor is not None:
+            for executor in [self._executor, *self._session_executors]:
+                executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._session_executors = []
+            for events in self._events:
+                try:
+                    events.put_nowait(None)
+                except queue.Full:
+                    pass
+            self._events = None
+
+    def _listen(self, events) -> None:
+        """
+        Forwards the progress events of a worker to their subscribers until
+        shutdown, waiting for coroutine callbacks to return before reading on.
+        """
+        while True:
+            event = events.get()
+            if event is None:
+                break
+            key, phase, data = event
+            listener = self._listeners.get(key)
+            if not listener:
+                continue
+            loop, callback, finished = listener
+            try:
+                if phase == EVENTS_END:
+                    loop.call_soon_threadsafe(finished.set)
+                elif asyncio.iscoroutinefunction(callback):
+                    asyncio.run_coroutine_threadsafe(callback(phase, data), loop).result()
+                else:
+                    loop.call_soon_threadsafe(callback, phase, data)
+            except (RuntimeError, CancelledError):
+                # The event loop of the subscriber is closed or stopping
+                pass
+
+    async def submit(self, fn, *args, session_id: str = None):
+        """
+        Runs fn(*args) in a worker process and awaits its result; with a
+        session_id, in the session worker of that session.
+
+        A submission holds its slot of the pool until the worker is done with it:
+        cancelling the awaiting coroutine does not free a running worker.
+
+        Raises:
+            HTTPException: 503 when the pool is saturated, or the worker's error
+        """
+        self.check_capacity()
+
+        self.start()
+        worker = None
+        if session_id is None:
+            executor = self._executor
+        else:
+            worker = self._session_worker(session_id)
+            executor = self._session_executors[worker]
+            self._dispatches += 1
+            (self._session_holders[worker], self._session_used[worker]) = (session_id, self._dispatches)
+            self._session_pending[worker] += 1
+        self.pending += 1
+
+        def release():
+            self.pending -= 1
+            if worker is not None and executor in self._session_executors:
+                self._session_pending[worker] -= 1
+
+        loop = asyncio.get_running_loop()
+
+        def on_done(_):
+            # The slot stays taken until the worker is done, even when the
+            # awaiting request was cancelled meanwhile
+            try:
+                loop.call_soon_threadsafe(release)
+            except RuntimeError:
+                # The event loop is closed: nothing else counts the slots
+                release()
+
+        future = None
+        try:
+            future = executor.submit(fn, *args)
+            future.add_done_callback(on_done)
+            return await asyncio.wrap_future(future)
+        except AnalysisError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        except BrokenProcessPool:
+            # A worker died (e.g. a native crash inside OpenSees): replace the pool
+            if executor is self._executor or executor in self._session_executors:
+                self.shutdown()
+            raise HTTPException(status_code=500, detail="Analysis worker crashed")
+        finally:
+            if future is None:
+                release()
+
+    def _session_worker(self, session_id: str) -> int:
+        """
+        Index of the session worker to run a submission of a session on: the one
+        holding its model, else an idle one (holding no model first, then the
+        least recently used), else the least busy one.
+        """
+        holders = self._session_holders
+        if session_id in holders:
+            return holders.index(session_id)
+        workers = range(len(holders))
+        idle = [k for k in workers if not self._session_pending[k]]
+        if idle:
+            return min(idle, key=lambda k: (holders[k] is not None, self._session_used[k]))
+        return min(workers, key=lambda k: (self._session_pending[k], self._session_used[k]))
+
+    @property
+    def full(self) -> bool:
+        """Whether a new submission would be rejected."""
+        return self.pending + self.reserved >= self.capacity
+
+    def check_capacity(self) -> None:
+        """
+        Raises:
+            HTTPException: 503 when the pool is saturated
+        """
+        if self.full:
+            raise HTTPException(
+                status_code=503,
+                detail="Analysis queue is full, retry later",
+                headers={"Retry-After": "1"}
+            )
+
+    def reserve(self) -> None:
+        """
+        Takes a slot for a submission made later (e.g. by a background job):
+        unreserve() gives it back right before the submission, or if it is
+        dropped.
+
+        Raises:
+            HTTPException: 503 when the pool is saturated
+        """
+        self.check_capacity()
+        self.reserved += 1
+
+    def unreserve(self) -> None:
+        """Gives back a slot taken by reserve()."""
+        self.reserved -= 1
+
+    async def run_analysis(self, model: dict, on_progress=None, result_format: str = 'json',
+                           session_id: str = None) -> dict:
+        """
+        Runs run_analysis(model) in a worker process.
+
+        Identical models are answered from the result cache, if any, without
+        reaching a worker.
+
+        Args:
+            model: Structural model
+            on_progress: Optional callable on_progress(phase, data) called on the
+                event loop for each progress event of the analysis; a coroutine
+                function is awaited before the worker may send more events
+            result_format: 'json', 'columnar' (see columnar.py) or 'ndjson' (results
+                sent as 'chunk' progress events, not cached)
+            session_id: Optional editor session: the model is diffed against the
+                previous submission of the session
+        """
+        cache_key = None
+        if self.cache is not None and result_format != 'ndjson':
+            cache_key = self.cache.key(model, result_format)
+            output = self.cache.get(cache_key)
+            if output is not None:
+                return output
+
+        if session_id is None:
+            fn, args = analyze, (model,)
+        else:
+            fn, args = analyze_session, (session_id, model)
+
+        if on_progress is None:
+            output = await self.submit(fn, *args, None, result_format, session_id=session_id)
+        else:
+            key = uuid.uuid4().hex
+            finished = asyncio.Event()
+            self._listeners[key] = (asyncio.get_running_loop(), on_progress, finished)
+            try:
+                output = await self.submit(fn, *args, key, result_format, session_id=session_id)
+                try:
+                    await asyncio.wait_for(finished.wait(), EVENTS_TIMEOUT)
+                except asyncio.TimeoutError:
+                    print(f"Warning: progress events of analysis {key} did not all arrive")
+            finally:
+                self._listeners.pop(key, None)
+
+        if cache_key is not None:
+            if session_id is not None:
+                # How the session model was updated does not belong to the model's results
+                output = {**output, 'analysis': {
+                    key: value for (key, value) in output['analysis'].items() if key != 'update'
+                }}
+            self.cache.put(cache_key, output)
+        return output
+
+    async def run_modal_analysis(self, model: dict, result_format: str = 'json') -> dict:
+        """
+        Runs run_modal_analysis(model) in a worker process, answered from the
+        result cache, if any, for identical models.
+
+        Args:
+            model: Structural model
+            result_format: 'json' or 'columnar' (see columnar.py)
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(model, 'modal' if result_format == 'json' else f'modal-{result_format}')
+            output = self.cache.get(cache_key)
+            if output is not None:
+                return output
+
+        output = await self.submit(analyze_modes, model, result_format)
+        if cache_key is not None:
+            self.cache.put(cache_key, output)
+        return output
+
+    async def run_buckling_analysis(self, model: dict, result_format: str = 'json') -> dict:
+        """
+        Runs run_buckling_analysis(model) in a worker process, answered from the
+        result cache, if any, for identical models.
+
+        Args:
+            model: Structural model
+            result_format: 'json' or 'columnar' (see columnar.py)
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(model, 'buckling' if result_format == 'json' else f'buckling-{result_format}')
+            output = self.cache.get(cache_key)
+            if output is not None:
+                return output
+
+        output = await self.submit(analyze_buckling, model, result_format)
+        if cache_key is not None:
+            self.cache.put(cache_key, output)
+        return output
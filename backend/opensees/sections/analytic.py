@@ -0,0 +1,128 @@
+"""
+Analytic Section Properties
+
+This module computes the geometric properties of standard sections in closed
+form, without any FE meshing: rectangles, solid and hollow circles, and I-shapes
+without root radius. Torsion constants use the series solution of the rectangle
+(Roark's Formula Table 10.1) and, for I-shapes, the thin-walled decomposition
+with the flange/web junction correction of El Darwish and Johnston.
+
+Every function returns (A, Iz, Iy, Jxx) with the same axis convention as the
+sectionproperties-based classes: Iy about the strong (horizontal) axis and Iz
+about the weak (vertical) axis.
+"""
+import math
+
+# Number of odd terms of the rectangle torsion series (converged to machine precision)
+TORSION_SERIES_TERMS = 8
+
+
+def rectangle_torsion_constant(a: float, b: float) -> float:
+    """
+    Torsion constant of a solid rectangle.
+
+    Args:
+        a: Length of one side
+        b: Length of the other side
+
+    Returns:
+        float: J = a b^3 / 3 * (1 - 192 b / (pi^5 a) * sum(tanh(n pi a / 2b) / n^5)), with a >= b
+    """
+    a, b = max(a, b), min(a, b)
+    series = sum(
+        math.tanh(n * math.pi * a / (2 * b)) / n**5
+        for n in range(1, 2 * TORSION_SERIES_TERMS, 2)
+    )
+    return a * b**3 / 3 * (1 - 192 / math.pi**5 * (b / a) * series)
+
+
+def rectangular_properties(width: float, height: float) -> tuple:
+    """
+    Properties of a rectangular section.
+
+    Args:
+        width: Width of the section (b)
+        height: Height of the section (h)
+
+    Returns:
+        tuple: (A, Iz, Iy, Jxx)
+    """
+    if width <= 0:
+        raise ValueError("Width must be positive")
+    if height <= 0:
+        raise ValueError("Height must be positive")
+
+    A = width * height
+    Iy = width * height**3 / 12
+    Iz = height * width**3 / 12
+    Jxx = rectangle_torsion_constant(width, height)
+    return A, Iz, Iy, Jxx
+
+
+def circular_properties(diameter: float) -> tuple:
+    """
+    Properties of a solid circular section.
+
+    Returns:
+        tuple: (A, Iz, Iy, Jxx)
+    """
+    A = math.pi * diameter**2 / 4
+    Iz = Iy = math.pi * diameter**4 / 64
+    Jxx = math.pi * diameter**4 / 32
+    return A, Iz, Iy, Jxx
+
+
+def hollow_circular_properties(diameter: float, thickness: float) -> tuple:
+    """
+    Properties of a hollow circular section (exact for a circular tube).
+
+    Args:
+        diameter: Outer diameter
+        thickness: Wall thickness
+
+    Returns:
+        tuple: (A, Iz, Iy, Jxx)
+    """
+    if not 0 < thickness <= diameter / 2:
+        raise ValueError("Thickness must be positive and at most half the diameter")
+
+    inner = diameter - 2 * thickness
+    A = math.pi * (diameter**2 - inner**2) / 4
+    Iz = Iy = math.pi * (diameter**4 - inner**4) / 64
+    Jxx = math.pi * (diameter**4 - inner**4) / 32
+    return A, Iz, Iy, Jxx
+
+
+def i_section_properties(h: float, b: float, t_f: float, t_w: float) -> tuple:
+    """
+    Properties of a doubly symmetric I-section without root radius.
+
+    The torsion constant sums the flange and web rectangles and adds the
+    junction term 2 alpha D^4, with D the diameter of the circle inscribed at
+    the flange/web junction and alpha = 0.15 t_min / t_max.
+
+    Args:
+        h: Height of the section
+        b: Width of the flanges
+        t_f: Thickness of the flanges
+        t_w: Thickness of the web
+
+    Returns:
+        tuple: (A, Iz, Iy, Jxx)
+    """
+    h_w = h - 2 * t_f
+    if h_w <= 0 or t_w > b:
+        raise ValueError("Invalid I-section dimensions")
+
+    A = 2 * b * t_f + h_w * t_w
+    Iy = (b * h**3 - (b - t_w) * h_w**3) / 12
+    Iz = (2 * t_f * b**3 + h_w * t_w**3) / 12
+
+    D = (t_f**2 + t_w**2 / 4) / t_f
+    alpha = 0.15 * min(t_f, t_w) / max(t_f, t_w)
+    Jxx = (
+        2 * rectangle_torsion_constant(b, t_f)
+        + rectangle_torsion_constant(h_w, t_w)
+        + 2 * alpha * D**4
+    )
+    return A, Iz, Iy, Jxx
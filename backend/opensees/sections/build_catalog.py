@@ -0,0 +1,196 @@
+"""
+Steel Profile Catalog Builder
+
+Generates profiles.npy, the lookup table of catalog.py, from the nominal
+dimensions of the standard European profiles.
+
+I-sections (IPE, HEA, HEB) and hot-finished RHS (EN 10210, outer corner radius
+1.5 t, inner radius t) are evaluated once by a sectionproperties FE analysis
+including their root or corner radii; CHS use the exact closed form.
+
+Usage (from the backend directory):
+    python -m opensees.sections.build_catalog
+"""
+import math
+
+import numpy as np
+from sectionproperties.analysis import Section
+from sectionproperties.pre.library import i_section, rectangular_hollow_section
+
+from .catalog import CATALOG_PATH, PROFILE_DTYPE, normalize_designation
+
+mm = 1E-3
+
+# Number of points of the fillets and mesh density of the FE analysis
+FILLET_POINTS = 16
+MESH_ELEMENTS = 2000
+
+# (designation, h, b, tw, tf, r) in mm
+IPE = [
+    ("IPE80", 80, 46, 3.8, 5.2, 5),
+    ("IPE100", 100, 55, 4.1, 5.7, 7),
+    ("IPE120", 120, 64, 4.4, 6.3, 7),
+    ("IPE140", 140, 73, 4.7, 6.9, 7),
+    ("IPE160", 160, 82, 5, 7.4, 9),
+    ("IPE180", 180, 91, 5.3, 8, 9),
+    ("IPE200", 200, 100, 5.6, 8.5, 12),
+    ("IPE220", 220, 110, 5.9, 9.2, 12),
+    ("IPE240", 240, 120, 6.2, 9.8, 15),
+    ("IPE270", 270, 135, 6.6, 10.2, 15),
+    ("IPE300", 300, 150, 7.1, 10.7, 15),
+    ("IPE330", 330, 160, 7.5, 11.5, 18),
+    ("IPE360", 360, 170, 8, 12.7, 18),
+    ("IPE400", 400, 180, 8.6, 13.5, 21),
+    ("IPE450", 450, 190, 9.4, 14.6, 21),
+    ("IPE500", 500, 200, 10.2, 16, 21),
+    ("IPE550", 550, 210, 11.1, 17.2, 24),
+    ("IPE600", 600, 220, 12, 19, 24),
+]
+
+HEA = [
+    ("HEA100", 96, 100, 5, 8, 12),
+    ("HEA120", 114, 120, 5, 8, 12),
+    ("HEA140", 133, 140, 5.5, 8.5, 12),
+    ("HEA160", 152, 160, 6, 9, 15),
+    ("HEA180", 171, 180, 6, 9.5, 15),
+    ("HEA200", 190, 200, 6.5, 10, 18),
+    ("HEA220", 210, 220, 7, 11, 18),
+    ("HEA240", 230, 240, 7.5, 12, 21),
+    ("HEA260", 250, 260, 7.5, 12.5, 24),
+    ("HEA280", 270, 280, 8, 13, 24),
+    ("HEA300", 290, 300, 8.5, 14, 27),
+    ("HEA320", 310, 300, 9, 15.5, 27),
+    ("HEA340", 330, 300, 9.5, 16.5, 27),
+    ("HEA360", 350, 300, 10, 17.5, 27),
+    ("HEA400", 390, 300, 11, 19, 27),
+    ("HEA450", 440, 300, 11.5, 21, 27),
+    ("HEA500", 490, 300, 12, 23, 27),
+    ("HEA550", 540, 300, 12.5, 24, 27),
+    ("HEA600", 590, 300, 13, 25, 27),
+    ("HEA650", 640, 300, 13.5, 26, 27),
+    ("HEA700", 690, 300, 14.5, 27, 27),
+    ("HEA800", 790, 300, 15, 28, 30),
+    ("HEA900", 890, 300, 16, 30, 30),
+    ("HEA1000", 990, 300, 16.5, 31, 30),
+]
+
+HEB = [
+    ("HEB100", 100, 100, 6, 10, 12),
+    ("HEB120", 120, 120, 6.5, 11, 12),
+    ("HEB140", 140, 140, 7, 12, 12),
+    ("HEB160", 160, 160, 8, 13, 15),
+    ("HEB180", 180, 180, 8.5, 14, 15),
+    ("HEB200", 200, 200, 9, 15, 18),
+    ("HEB220", 220, 220, 9.5, 16, 18),
+    ("HEB240", 240, 240, 10, 17, 21),
+    ("HEB260", 260, 260, 10, 17.5, 24),
+    ("HEB280", 280, 280, 10.5, 18, 24),
+    ("HEB300", 300, 300, 11, 19, 27),
+    ("HEB320", 320, 300, 11.5, 20.5, 27),
+    ("HEB340", 340, 300, 12, 21.5, 27),
+    ("HEB360", 360, 300, 12.5, 22.5, 27),
+    ("HEB400", 400, 300, 13.5, 24, 27),
+    ("HEB450", 450, 300, 14, 26, 27),
+    ("HEB500", 500, 300, 14.5, 28, 27),
+    ("HEB550", 550, 300, 15, 29, 27),
+    ("HEB600", 600, 300, 15.5, 30, 27),
+    ("HEB650", 650, 300, 16, 31, 27),
+    ("HEB700", 700, 300, 17, 32, 27),
+    ("HEB800", 800, 300, 17.5, 33, 30),
+    ("HEB900", 900, 300, 18.5, 35, 30),
+    ("HEB1000", 1000, 300, 19, 36, 30),
+]
+
+# (outer diameter, thickness) in mm
+CHS = [
+    (33.7, 3.2), (42.4, 3.2), (48.3, 3.2), (48.3, 4), (60.3, 3.2), (60.3, 4),
+    (76.1, 3.2), (76.1, 4), (88.9, 3.2), (88.9, 4), (88.9, 5), (114.3, 3.6),
+    (114.3, 5), (114.3, 6.3), (139.7, 4), (139.7, 5), (139.7, 6.3), (168.3, 5),
+    (168.3, 6.3), (168.3, 8), (193.7, 6.3), (193.7, 8), (219.1, 6.3), (219.1, 8),
+    (219.1, 10), (244.5, 8), (244.5, 10), (273, 8), (273, 10), (323.9, 8),
+    (323.9, 10), (355.6, 10), (406.4, 10), (457, 10), (508, 12.5),
+]
+
+# (h, b, t) in mm
+RHS = [
+    (50, 30, 3.2), (60, 40, 4), (80, 40, 4), (100, 50, 5), (100, 60, 5),
+    (120, 60, 5), (120, 80, 6.3), (150, 100, 6.3), (160, 80, 6.3), (200, 100, 8),
+    (200, 120, 8), (250, 150, 10), (300, 200, 10), (400, 200, 12.5),
+]
+
+
+def fe_properties(geometry, h: float, b: float) -> dict:
+    """Properties of a meshed geometry centred at (b/2, h/2), in the catalog axes."""
+    geometry.create_mesh(mesh_sizes=[geometry.calculate_area() / MESH_ELEMENTS])
+    section = Section(geometry)
+    section.calculate_geometric_properties()
+    section.calculate_warping_properties()
+    section.calculate_plastic_properties()
+
+    # sectionproperties x axis is horizontal: ixx is the strong axis (y)
+    ixx, iyy = section.get_ic()[:2]
+    rx, ry = section.get_rc()
+    sxx, syy = section.get_s()
+    return {
+        "A": section.get_area(),
+        "Iy": ixx,
+        "Iz": iyy,
+        "J": section.get_j(),
+        "Wel_y": ixx / (h / 2),
+        "Wel_z": iyy / (b / 2),
+        "Wpl_y": sxx,
+        "Wpl_z": syy,
+        "iy": rx,
+        "iz": ry,
+    }
+
+
+def chs_properties(d: float, t: float) -> dict:
+    inner = d - 2 * t
+    A = math.pi * (d**2 - inner**2) / 4
+    I = math.pi * (d**4 - inner**4) / 64
+    Wpl = (d**3 - inner**3) / 6
+    return {
+        "A": A, "Iy": I, "Iz": I, "J": 2 * I,
+        "Wel_y": I / (d / 2), "Wel_z": I / (d / 2),
+        "Wpl_y": Wpl, "Wpl_z": Wpl,
+        "iy": math.sqrt(I / A), "iz": math.sqrt(I / A),
+    }
+
+
+def build_rows() -> list:
+    rows = []
+
+    for (family, table) in (("IPE", IPE), ("HEA", HEA), ("HEB", HEB)):
+        for (designation, h, b, tw, tf, r) in table:
+            geometry = i_section(d=h * mm, b=b * mm, t_f=tf * mm, t_w=tw * mm, r=r * mm, n_r=FILLET_POINTS)
+            rows.append(((designation, family, h, b, tw, tf, r), fe_properties(geometry, h * mm, b * mm)))
+
+    for (d, t) in CHS:
+        designation = normalize_designation(f"CHS{d}X{t}")
+        rows.append(((designation, "CHS", d, d, t, t, 0), chs_properties(d * mm, t * mm)))
+
+    for (h, b, t) in RHS:
+        designation = normalize_designation(f"RHS{h}X{b}X{t}")
+        geometry = rectangular_hollow_section(d=h * mm, b=b * mm, t=t * mm, r_out=1.5 * t * mm, r_in=t * mm,
+                                              n_r=FILLET_POINTS)
+        rows.append(((designation, "RHS", h, b, t, t, round(1.5 * t, 2)), fe_properties(geometry, h * mm, b * mm)))
+
+    return rows
+
+
+def main():
+    rows = build_rows()
+    profiles = np.zeros(len(rows), dtype=PROFILE_DTYPE)
+    for (i, (dimensions, properties)) in enumerate(rows):
+        assert dimensions[0] == normalize_designation(dimensions[0])
+        for (name, value) in zip(PROFILE_DTYPE.names, dimensions):
+            profiles[i][name] = value
+        for (name, value) in properties.items():
+            profiles[i][name] = value
+    np.save(CATALOG_PATH, profiles)
+    print(f"Wrote {len(profiles)} profiles to {CATALOG_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Steel Profile Catalog
+
+This module provides the standard European steel profiles (IPE, HEA, HEB, CHS,
+RHS) as a precomputed lookup table: dimensions, area, second moments of area,
+torsion constant, elastic and plastic section moduli and radii of gyration.
+
+The table is a NumPy structured array stored in profiles.npy (generated by
+build_catalog.py) and memory-mapped on first use, so no FE analysis is run at
+request time. Profiles are indexed by their normalized designation:
+"IPE 200", "ipe200", "HE 200 A" and "HEA200" all refer to the same row.
+
+Properties are in SI units (m, m², m³, m⁴) and follow the member local axes:
+y is the strong axis (Iy, Wel_y, ...) and z the weak axis.
+"""
+import os
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles.npy")
+
+# Dimensions are in mm, as in the model sections
+PROFILE_DTYPE = np.dtype([
+    ("designation", "U24"),
+    ("family", "U4"),
+    ("h", "f8"),      # Depth (outer diameter of CHS)
+    ("b", "f8"),      # Width
+    ("tw", "f8"),     # Web thickness (wall thickness of hollow sections)
+    ("tf", "f8"),     # Flange thickness (wall thickness of hollow sections)
+    ("r", "f8"),      # Root radius (outer corner radius of RHS)
+    ("A", "f8"),
+    ("Iy", "f8"),
+    ("Iz", "f8"),
+    ("J", "f8"),
+    ("Wel_y", "f8"),
+    ("Wel_z", "f8"),
+    ("Wpl_y", "f8"),
+    ("Wpl_z", "f8"),
+    ("iy", "f8"),
+    ("iz", "f8"),
+])
+
+PROPERTIES = ("A", "Iy", "Iz", "J", "Wel_y", "Wel_z", "Wpl_y", "Wpl_z", "iy", "iz")
+
+_profiles = None
+_index = None
+
+
+def normalize_designation(designation: str) -> str:
+    """
+    Normalizes a profile designation: upper case, no spaces, 'x' separators and
+    numbers without trailing zeros ("chs 273 x 8.0" -> "CHS273X8").
+    """
+    name = re.sub(r"\s+", "", str(designation).upper()).replace("*", "X").replace("×", "X")
+    # Euronorm spelling of the wide flange beams: HE 200 A -> HEA200
+    match = re.fullmatch(r"HE(\d+)([AB])", name)
+    if match:
+        name = f"HE{match.group(2)}{match.group(1)}"
+    return re.sub(r"\d+(\.\d+)?", lambda number: format(float(number.group()), "g"), name)
+
+
+def load_catalog() -> np.ndarray:
+    """Returns the profile table (memory-mapped, loaded once per process)."""
+    global _profiles, _index
+    if _profiles is None:
+        profiles = np.load(CATALOG_PATH, mmap_mode="r")
+        # Designations are stored normalized (see build_catalog.py)
+        _index = {name: row for (row, name) in enumerate(profiles["designation"].tolist())}
+        _profiles = profiles
+    return _profiles
+
+
+def get_profile(designation: str) -> Optional[np.void]:
+    """Returns the catalog row of a designation, or None if it is not a standard profile."""
+    profiles = load_catalog()
+    row = _index.get(normalize_designation(designation))
+    return None if row is None else profiles[row]
+
+
+def list_profiles(family: Optional[str] = None) -> List[Dict]:
+    """Returns the catalog profiles (optionally of one family) as dicts."""
+    profiles = load_catalog()
+    if family is not None:
+        profiles = profiles[profiles["family"] == family.upper()]
+    return [
+        {name: (profile[name].item() if name not in ("designation", "family") else str(profile[name]))
+         for name in PROFILE_DTYPE.names}
+        for profile in profiles
+    ]
+
+
+def profile_properties(designation: str) -> tuple:
+    """
+    Analysis properties of a catalog profile.
+
+    Returns:
+        tuple: (A, Iz, Iy, Jxx), as the section classes
+    """
+    profile = get_profile(designation)
+    if profile is None:
+        raise ValueError(f"Unknown profile designation: {designation}")
+    return float(profile["A"]), float(profile["Iz"]), float(profile["Iy"]), float(profile["J"])
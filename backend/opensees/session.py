@@ -0,0 +1,126 @@
+"""
+Analysis Sessions
+
+This module keeps the model of an editor session built in a worker process
+between its submissions. Most edits change a load value, a support or one
+member, so a new submission is diffed against the last built model and only
+the changes are applied to the OpenSees domain (see run_analysis(session=...)):
+
+- loads only: the load patterns are replaced and the cases re-solved against
+  the stiffness factored by the previous submission,
+- boundary conditions, section properties or member sections: the supports or
+  the elements of the affected members are replaced, then the stiffness is
+  factored again,
+- anything else (nodes, member geometry or releases, meshing, solve options):
+  the model is rebuilt.
+"""
+import json
+from typing import Dict, List, Optional
+
+
+def encode(value) -> str:
+    """Canonical JSON of a model entry, compared between submissions."""
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def snapshot(model: dict) -> dict:
+    """
+    Encodes the model entries that the next submission is compared with (loads
+    are always re-applied): nodes, boundary conditions and analysis options but
+    the output ones as a whole, sections by id, and members by id with their
+    section apart.
+    """
+    options = model.get('analysis') or {}
+    return {
+        'nodes': encode(model['nodes']),
+        'members': [
+            (member['id'], member['section'], encode({**member, 'section': None}))
+            for member in model['members']
+        ],
+        'sections': {section['id']: encode(section) for section in model['sections']},
+        'boundary_conditions': encode(model['boundary_conditions']),
+        'analysis': encode({key: value for (key, value) in options.items() if key != 'output'}),
+    }
+
+
+def diff_models(old: dict, new: dict) -> Optional[Dict]:
+    """
+    Compares the snapshots of a model and of the last built one.
+
+    Returns:
+        dict: {'sections': changed or added section ids, 'members': ids of the
+        members whose elements must be replaced, 'boundary_conditions': whether
+        the supports changed}, or None if the model must be rebuilt
+    """
+    if old is None or old['nodes'] != new['nodes'] or old['analysis'] != new['analysis']:
+        return None
+
+    old_members = old['members']
+    new_members = new['members']
+    if [member[0] for member in old_members] != [member[0] for member in new_members]:
+        return None
+
+    old_sections = old['sections']
+    new_sections = new['sections']
+    if not old_sections.keys() <= new_sections.keys():
+        return None
+    sections = [id for (id, section) in new_sections.items() if old_sections.get(id) != section]
+
+    members = []
+    for ((id, old_section, old_member), (_, new_section, new_member)) in zip(old_members, new_members):
+        # Only the section of a member can change without rebuilding its mesh
+        if old_member != new_member or new_section not in new_sections:
+            return None
+        if new_section != old_section or new_section in sections:
+            members.append(id)
+
+    return {
+        'sections': sections,
+        'members': members,
+        'boundary_conditions': old['boundary_conditions'] != new['boundary_conditions'],
+    }
+
+
+class AnalysisSession:
+    def __init__(self, session_id: str) -> None:
+        """Initialize a session with nothing built yet."""
+        self.id = session_id
+        # Last built model and the state needed to update it
+        self.model: Optional[dict] = None
+        self.meshes: Optional[dict] = None
+        self.tags = None
+        self.index = None
+        self.nodes: List[dict] = []
+        self.members: List[dict] = []
+        self.num_cases = 0
+        self.solver: Optional[dict] = None
+
+    def diff(self, model: dict, meshes: dict) -> Optional[Dict]:
+        """
+        Returns the changes to apply to the built model (see diff_models), or
+        None if it must be rebuilt. model is the snapshot of the submitted
+        model and meshes its mesh plan: in adaptive mode it follows the loads.
+        """
+        if meshes != self.meshes:
+            return None
+        return diff_models(self.model, model)
+
+    def keep(self, snapshot: dict, meshes: dict, tags, index, nodes: List[dict], members: List[dict],
+             num_cases: int, solver: dict = None) -> None:
+        """
+        Records the built model: its snapshot and mesh plan, its tags and lookup
+        tables, the output nodes and members before any result was added, the
+        number of load patterns applied and the solver that factored it.
+        """
+        self.model = snapshot
+        self.meshes = meshes
+        self.tags = tags
+        self.index = index
+        self.nodes = nodes
+        self.members = members
+        self.num_cases = num_cases
+        self.solver = solver
+
+    def reset(self) -> None:
+        """Forgets the built model: the next submission rebuilds it."""
+        self.model = None
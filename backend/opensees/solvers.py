@@ -0,0 +1,92 @@
+"""
+Solver Selection
+
+This module picks the linear system solver (OpenSees system and numberer) of an
+analysis. Renumbered by reverse Cuthill-McKee, the stiffness of a beam or of a
+low-rise frame has a narrow band, which LAPACK's banded Cholesky (BandSPD)
+factors fastest; the band of a 3D building frame grows with its plan
+dimensions, and past a few hundred equations a general sparse factorization
+(UmfPack) is faster:
+
+- BandSPD with RCM numbering while the estimated half-bandwidth stays within
+  BAND_MAX_BANDWIDTH, UmfPack past it and for incremental analyses (the
+  tangent of a nonlinear transformation may not stay positive definite),
+- the other one as a fallback when the first cannot factor the stiffness,
+- analysis.solver and analysis.numberer override the choice.
+
+The direct engine (see direct.py) factors the band itself, and only falls back
+to SuperLU past its own band limit, so it always starts with BandSPD.
+
+SparseSYM is not offered: it corrupts the heap of the OpenSeesPy 3.7 interpreter.
+"""
+import os
+from typing import Dict, List, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+SOLVER_SYSTEMS = ('BandSPD', 'ProfileSPD', 'BandGeneral', 'SparseGeneral', 'UmfPack')
+NUMBERERS = ('RCM', 'AMD', 'Plain')
+BAND_SOLVER = ('BandSPD', 'RCM')
+SPARSE_SOLVER = ('UmfPack', 'RCM')
+
+# Half-bandwidth (equations) past which the sparse solver is chosen
+BAND_MAX_BANDWIDTH = int(os.environ.get("ANALYSIS_BAND_MAX_BANDWIDTH", 720))
+
+
+def get_solver_options(model: dict) -> Dict:
+    """Returns the requested system ('auto' by default) and numberer (analysis.solver / numberer), validated."""
+    options = model.get('analysis') or {}
+    system = options.get('solver') or 'auto'
+    numberer = options.get('numberer')
+    if system != 'auto' and system not in SOLVER_SYSTEMS:
+        raise ValueError(f"Unknown solver: {system}")
+    if numberer is not None and numberer not in NUMBERERS:
+        raise ValueError(f"Unknown numberer: {numberer}")
+    return {'system': system, 'numberer': numberer}
+
+
+def estimate_bandwidth(pairs: np.ndarray, count: int, ndf: int = 6, links: np.ndarray = ()) -> int:
+    """
+    Half-bandwidth in equations of the stiffness of a model once renumbered
+    by reverse Cuthill-McKee, estimated from its node graph.
+
+    Args:
+        pairs: Node rows of the elements, shape (n_elements, 2)
+        count: Number of nodes
+        ndf: DOFs per node
+        links: Node rows of elements to fixed nodes, shape (n_links, 2): they
+            take part in the numbering but hold no equation
+    """
+    pairs = np.asarray(pairs, dtype=int).reshape(-1, 2)
+    if not len(pairs):
+        return 0
+    edges = np.concatenate([pairs, np.asarray(links, dtype=int).reshape(-1, 2)])
+    graph = sp.coo_matrix((np.ones(len(edges)), (edges[:, 0], edges[:, 1])), shape=(count, count)).tocsr()
+    order = reverse_cuthill_mckee(graph + graph.T, symmetric_mode=True)
+    position = np.argsort(order)
+    return ndf * (int(np.abs(position[pairs[:, 0]] - position[pairs[:, 1]]).max()) + 1)
+
+
+def choose_solvers(model: dict, mode: str, engine: str, bandwidth: int) -> List[Tuple[str, str]]:
+    """
+    Returns the (system, numberer) pairs to try in order (see the module docstring).
+
+    Args:
+        model: Structural model (analysis.solver / numberer)
+        mode: Solve mode ('linear' or 'incremental')
+        engine: Analysis engine ('opensees' or 'direct')
+        bandwidth: Estimated half-bandwidth (see estimate_bandwidth)
+    """
+    options = get_solver_options(model)
+    if options['system'] != 'auto':
+        return [(options['system'], options['numberer'] or 'RCM')]
+
+    if engine == 'direct' or (mode == 'linear' and bandwidth <= BAND_MAX_BANDWIDTH):
+        solvers = [BAND_SOLVER, SPARSE_SOLVER]
+    else:
+        solvers = [SPARSE_SOLVER, BAND_SOLVER]
+    if options['numberer'] is not None:
+        solvers = [(system, options['numberer']) for (system, _) in solvers]
+    return solvers
@@ -0,0 +1,81 @@
+"""
+Streaming Analysis
+
+This module streams analysis results as NDJSON (one JSON object per line), for
+the clients that ask for it (Accept: application/x-ndjson), so they can render
+results while the extraction goes on.
+
+The worker extracts the results in chunks (see run_analysis(result_format=
+'ndjson')) and sends every chunk as a progress event; the chunks are written
+out as they arrive: node displacements first, then member diagrams, and a last
+'done' line with the summary (solve path, envelopes, load cases), or an
+'error' line if the analysis fails.
+
+At most STREAM_QUEUE_CHUNKS chunks wait for the client: the next chunk is only
+taken from the worker once the client drained one, so the worker waits for a
+slow client instead of the whole result building up in memory.
+"""
+import asyncio
+import json
+import os
+from typing import AsyncIterator
+
+from fastapi import HTTPException
+
+from .columnar import to_json
+from .pool import AnalysisPool
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Last line of a stream
+DONE = "done"
+ERROR = "error"
+
+# Chunks waiting to be written out before the worker has to wait for the client
+STREAM_QUEUE_CHUNKS = int(os.environ.get("ANALYSIS_STREAM_QUEUE_CHUNKS", 8))
+
+
+def ndjson_line(chunk: dict) -> str:
+    return json.dumps(chunk, default=to_json, separators=(',', ':')) + "\n"
+
+
+async def stream_analysis(pool: AnalysisPool, model: dict, session_id: str = None) -> AsyncIterator[str]:
+    """
+    Runs an analysis on the pool and yields its results as NDJSON lines.
+
+    Args:
+        pool: Worker pool running the analysis
+        model: Structural model
+        session_id: Optional editor session (see AnalysisPool.run_analysis)
+    """
+    chunks = asyncio.Queue(maxsize=STREAM_QUEUE_CHUNKS)
+    closed = False
+
+    async def on_progress(phase: str, data: dict):
+        # Awaited by the pool before it reads the next event of the worker
+        if phase == 'chunk' and not closed:
+            await chunks.put(data)
+
+    async def run():
+        try:
+            summary = await pool.run_analysis(model, on_progress, result_format='ndjson', session_id=session_id)
+            await chunks.put({'type': DONE, **summary})
+        except HTTPException as e:
+            await chunks.put({'type': ERROR, 'status_code': e.status_code, 'detail': e.detail})
+        except Exception as e:
+            await chunks.put({'type': ERROR, 'status_code': 500, 'detail': str(e)})
+
+    task = asyncio.ensure_future(run())
+    try:
+        while True:
+            chunk = await chunks.get()
+            yield ndjson_line(chunk)
+            if chunk['type'] in (DONE, ERROR):
+                break
+    finally:
+        # The client went away: stop waiting (the worker finishes its analysis),
+        # and release a chunk waiting for room in the queue
+        closed = True
+        task.cancel()
+        while not chunks.empty():
+            chunks.get_nowait()
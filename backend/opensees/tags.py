@@ -0,0 +1,102 @@
+"""
+Tag Allocation
+
+This module numbers the OpenSees objects of an analysis sequentially instead
+of drawing random tags. Each kind of object gets its own contiguous range in
+the tag space it belongs to (nodes, elements, materials, sections,
+transformations), in the order the ranges are reserved:
+
+    nodes:    user nodes | mesh nodes | support ground node
+    elements: member elements | support springs
+
+Tags are dense (starting at 1), so results can be stored in arrays indexed
+by tag, and a given model always gets the same tags.
+
+User ids (nodes, sections, members) are mapped to tags, and generated nodes
+get output ids following the largest user node id.
+"""
+from typing import Dict, Hashable, Iterable, List
+
+# Tag space of each kind of object
+TAG_SPACES = {
+    'user_node': 'node',
+    'mesh_node': 'node',
+    'support_node': 'node',
+    'element': 'element',
+    'support_element': 'element',
+    'material': 'material',
+    'section': 'section',
+    'transformation': 'transformation',
+}
+
+
+class TagAllocator:
+    def __init__(self) -> None:
+        """Initialize an empty allocator (one per analysis)."""
+        self._last = {space: 0 for space in set(TAG_SPACES.values())}
+        self._blocks = {}
+        self._tags = {kind: {} for kind in TAG_SPACES}
+        self._user_node_ids = []
+        self._node_id_base = 0
+
+    def reserve(self, kind: str, count: int) -> range:
+        """Reserves the next count tags of the kind's space for that kind."""
+        space = TAG_SPACES[kind]
+        start = self._last[space] + 1
+        self._last[space] += count
+        self._blocks[kind] = [start, start + count]
+        return range(start, start + count)
+
+    def allocate(self, kind: str) -> int:
+        """Returns the next tag of a kind, past its reserved range if it is exhausted."""
+        block = self._blocks.get(kind)
+        if block is None or block[0] >= block[1]:
+            self.reserve(kind, 1)
+            block = self._blocks[kind]
+        tag = block[0]
+        block[0] += 1
+        return tag
+
+    def map_ids(self, kind: str, ids: Iterable[Hashable]) -> Dict[Hashable, int]:
+        """Assigns consecutive tags to user ids, in order."""
+        ids = list(ids)
+        tags = self._tags[kind]
+        for (id, tag) in zip(ids, self.reserve(kind, len(ids))):
+            if id in tags:
+                raise ValueError(f"Duplicate {kind.replace('_', ' ')} id: {id}")
+            tags[id] = tag
+        if kind == 'user_node':
+            self._user_node_ids = ids
+            self._node_id_base = max([len(ids)] + [id for id in ids if isinstance(id, int)])
+        return tags
+
+    def retag(self, kind: str, id: Hashable) -> int:
+        """Maps a user id to a new tag (a redefined or added object), past the reserved ranges."""
+        tag = self.reserve(kind, 1).start
+        self._tags[kind][id] = tag
+        return tag
+
+    def tag(self, kind: str, id: Hashable) -> int:
+        """Returns the tag of a user id."""
+        try:
+            return self._tags[kind][id]
+        except KeyError:
+            raise ValueError(f"Undefined {kind.replace('_', ' ')} id: {id}") from None
+
+    def node_tag(self, id: Hashable) -> int:
+        """Returns the tag of a node from its output id (user or generated node)."""
+        tag = self._tags['user_node'].get(id)
+        if tag is not None:
+            return tag
+        if isinstance(id, int) and id > self._node_id_base:
+            return id - self._node_id_base + len(self._user_node_ids)
+        raise ValueError(f"Undefined node id: {id}")
+
+    def node_id(self, tag: int) -> Hashable:
+        """Returns the output id of a node tag: the user id, or an id after the largest user id."""
+        if 1 <= tag <= len(self._user_node_ids):
+            return self._user_node_ids[tag - 1]
+        return self._node_id_base + tag - len(self._user_node_ids)
+
+    def node_ids(self, tags: List[int]) -> List[Hashable]:
+        return [self.node_id(tag) for tag in tags]
@@ -1,4 +1,4 @@
-from .structural_analysis import Node, Member, Material, Model, ClientResponse, BoundaryCondition, SupportType, LinearLoad, Vector3
+from .structural_analysis import Node, Member, Material, Model, ClientResponse, BoundaryCondition, SupportType, LinearLoad, Vector3, AnalysisOptions, MeshOptions, OutputOptions, LoadCase, LoadCombination
 
 __all__ = [
     "Node",
@@ -9,6 +9,11 @@ __all__ = [
     "BoundaryCondition",
     "SupportType",
     "LinearLoad",
-    "Vector3"
+    "Vector3",
+    "AnalysisOptions",
+    "MeshOptions",
+    "OutputOptions",
+    "LoadCase",
+    "LoadCombination"
 ]
 
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Dict
 from enum import Enum
 
 
@@ -17,6 +17,13 @@ class Node(BaseModel):
   y: float = Field(..., description="Y coordinate")
   z: float = Field(..., description="Z coordinate")
 
+class MeshOptions(BaseModel):
+  """Discretization of members into elements"""
+  mode: str = Field("uniform", description="uniform (segment count or length on every member) or adaptive (interior nodes only at output stations, at loaded or supported nodes lying on the span, and where a member sets its own mesh)")
+  segments: Optional[int] = Field(None, description="Number of elements per member")
+  segment_length: Optional[float] = Field(None, description="Target element length (m)")
+  max_dofs: Optional[int] = Field(None, description="Maximum number of DOFs of the model; the uniform segmentation is coarsened to fit")
+
 class Member(BaseModel):
   """Represents a structural member (beam, column, etc.)"""
   id: int = Field(..., description="Member ID")
@@ -25,6 +32,8 @@ class Member(BaseModel):
   nodej: int = Field(..., description="ID of the end node")
   section: Optional[int] = Field(None, description="ID of the section")
   vecxz: Optional[List[float]] = Field(None, description="Local x-z vector")
+  mesh: Optional[MeshOptions] = Field(None, description="Member discretization (segments or segment_length), overriding the analysis options")
+  stations: Optional[List[float]] = Field(None, description="Distances from the start node (m) where a node is created to output displacements")
 
 class Material(BaseModel):
   """Represents material properties"""
@@ -32,6 +41,7 @@ class Material(BaseModel):
   name: str = Field(..., description="Material name")
   E: float = Field(..., description="Young's modulus (MPa)")
   nu: float = Field(..., description="Poisson's ratio")
+  rho: Optional[float] = Field(None, description="Density (kg/m³) used by the modal analysis, 7850 (steel) if omitted")
 
 class SupportType(str, Enum):
   """Enumeration of support types for boundary conditions"""
@@ -58,7 +68,39 @@ class LinearLoad(BaseModel):
   type: str = Field(default="linear", description="Load type")
   value: Vector3 = Field(..., description="Load value vector (Fx, Fy, Fz) in kN")
   name: Optional[str] = Field(default=None, description="Load name")
-  
+  case: Optional[int] = Field(default=None, description="ID of the load case the load belongs to (first load case if omitted)")
+
+class LoadCase(BaseModel):
+  """Represents a load case (dead, live, wind...) solved independently"""
+  id: int = Field(..., description="Load case ID")
+  name: Optional[str] = Field(None, description="Load case name")
+
+class LoadCombination(BaseModel):
+  """Represents a factored combination of load cases, computed by superposition"""
+  id: int = Field(..., description="Load combination ID")
+  name: Optional[str] = Field(None, description="Load combination name")
+  factors: Dict[int, float] = Field(..., description="Factor applied to each load case, by load case ID")
+
+class OutputOptions(BaseModel):
+  """Level of detail of the analysis results"""
+  fields: Optional[List[str]] = Field(None, description="Results to compute among displacements, efforts, diagrams and reactions (default displacements, efforts and diagrams)")
+  forces: Optional[List[str]] = Field(None, description="Section force components to output among N, Vy, Vz, T, My, Mz (default all)")
+  stations: Optional[int] = Field(None, description="Number of diagram stations per loaded element (at least 2)")
+  tolerance: Optional[float] = Field(None, description="Maximum deviation of the moment diagrams from the exact parabola (kNm); the stations of loaded elements are reduced to the fewest meeting it")
+  precision: Optional[int] = Field(None, description="Number of decimals of the results (default 5 for displacements, 2 for forces)")
+  diagram_scale: Optional[float] = Field(None, description="Scale of the force diagrams drawn along the members")
+
+class AnalysisOptions(BaseModel):
+  """Options controlling how the structural analysis is run"""
+  mode: str = Field("auto", description="Solve mode: auto (linear when possible), linear (single step) or incremental (Newton load control)")
+  engine: str = Field("opensees", description="Solver: opensees, or direct (NumPy/SciPy direct stiffness method, Linear transformations only)")
+  solver: str = Field("auto", description="Linear system: auto (BandSPD for a narrow band, UmfPack otherwise), BandSPD, ProfileSPD, BandGeneral, SparseGeneral or UmfPack")
+  numberer: Optional[str] = Field(None, description="Equation numberer: RCM (default), AMD or Plain")
+  mesh: Optional[MeshOptions] = Field(None, description="Member discretization")
+  modes: Optional[int] = Field(None, description="Number of modes of the modal and buckling analyses (/analysis/modal, /analysis/buckling, default 12)")
+  section_properties: str = Field("auto", description="Section property method: auto (closed form, FE for filleted sections), fast (always closed form) or accurate (FE unless the closed form is exact)")
+  output: Optional[OutputOptions] = Field(None, description="Level of detail of the results")
+
 class Model(BaseModel):
   """Output schema for structural model containing all structural elements"""
   nodes: Optional[List[Node]] = Field(None, description="List of nodes")
@@ -66,7 +108,10 @@ class Model(BaseModel):
   materials: Optional[List[Material]] = Field(None, description="List of materials")
   sections: Optional[List[Any]] = Field(None, description="List of sections")
   loads: Optional[List[Any]] = Field(None, description="List of loads")
+  load_cases: Optional[List[LoadCase]] = Field(None, description="List of load cases")
+  load_combinations: Optional[List[LoadCombination]] = Field(None, description="List of load combinations")
   boundary_conditions: Optional[List[BoundaryCondition]] = Field(None, description="List of boundary conditions")
+  analysis: Optional[AnalysisOptions] = Field(None, description="Analysis options")
 
 
 class ClientResponse(BaseModel):
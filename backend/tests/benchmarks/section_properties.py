@@ -0,0 +1,65 @@
+"""
+Section Properties Benchmark
+
+Compares the closed-form section properties with the sectionproperties FE
+analysis: relative error of each property and speedup of the evaluation.
+
+The closed-form torsion constants of rectangles are exact; the remaining J
+differences of rectangles and I-sections mostly come from the coarse FE mesh.
+
+Usage (from the backend directory):
+    python tests/benchmarks/section_properties.py
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from opensees.helpers import evaluate_section_properties
+
+STEEL = {"E": 210000, "nu": 0.3}
+
+SECTIONS = [
+    {"type": "Rectangular", "width": 200, "height": 400},
+    {"type": "Rectangular", "width": 300, "height": 300},
+    {"type": "Rectangular", "width": 100, "height": 1000},
+    {"type": "HollowCircular", "diameter": 48.3, "thickness": 3.2},
+    {"type": "HollowCircular", "diameter": 219.1, "thickness": 6.3},
+    {"type": "I", "depth": 200, "width": 100, "tw": 5.6, "tf": 8.5},
+    {"type": "I", "depth": 300, "width": 300, "tw": 11, "tf": 19},
+    {"type": "I", "depth": 600, "width": 220, "tw": 12, "tf": 19},
+]
+
+PROPERTIES = ("A", "Iz", "Iy", "Jxx")
+
+
+def timed(section, fe, repeat):
+    """Returns the properties and the mean evaluation time in seconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        # The FE classes print their mesh settings
+        with contextlib.redirect_stdout(io.StringIO()):
+            properties = evaluate_section_properties(section, fe)
+    return properties, (time.perf_counter() - start) / repeat
+
+
+def main():
+    header = f"{'section':<48}" + "".join(f"{name:>9}" for name in PROPERTIES) + f"{'FE (ms)':>10}{'closed (us)':>13}{'speedup':>10}"
+    print(header)
+    print("-" * len(header))
+
+    for section in SECTIONS:
+        section = {**section, "material": STEEL}
+        fe, fe_time = timed(section, True, 3)
+        closed_form, closed_form_time = timed(section, False, 1000)
+
+        label = ", ".join(f"{key}={value}" for (key, value) in section.items() if key not in ("type", "material"))
+        errors = "".join(f"{closed_form[name] / fe[name] - 1:>+9.2%}" for name in PROPERTIES)
+        print(f"{section['type'] + ' ' + label:<48}{errors}{fe_time * 1E3:>10.1f}{closed_form_time * 1E6:>13.1f}{fe_time / closed_form_time:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+import json
+import os
+import sys
+
+import pytest
+
+# Ajouter le répertoire parent au PATH pour importer le module opensees et l'application
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks")
+
+
+@pytest.fixture
+def ssll03():
+    """Modèle du benchmark SSLL03 (poutre sur trois appuis dont un élastique)"""
+    with open(os.path.join(BENCHMARKS_DIR, "SSLL03.json"), encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,575 @@
+import asyncio
+import copy
+import os
+import time
+
+import numpy as np
+import pytest
+
+from fastapi import HTTPException
+from opensees import run_analysis, AnalysisPool, AnalysisJobs
+from opensees import main
+from opensees.session import AnalysisSession
+from opensees.envelopes import element_station_forces
+
+SPRING_NODE = 321912581
+
+
+def find_node(output, node_id):
+    return next(node for node in output["nodes"] if node["id"] == node_id)
+
+
+def truss_grid(size, material):
+    """Treillis plan articulé de size x size nœuds espacés de 1 m, une diagonale par maille, chargé en tête"""
+    nodes = [{"id": i * size + j + 1, "x": j, "y": i, "z": 0} for i in range(size) for j in range(size)]
+    pairs = [(k, k + 1) for k in range(size * size) if (k + 1) % size]
+    pairs += [(k, k + size) for k in range(size * (size - 1))]
+    pairs += [(k, k + size + 1) for k in range(size * (size - 1)) if (k + 1) % size]
+    corners = [1, size]
+    return {
+        "nodes": nodes,
+        "members": [
+            {"id": m + 1, "nodei": nodes[i], "nodej": nodes[j], "section": 5, "release": "pinned-pinned"}
+            for (m, (i, j)) in enumerate(pairs)
+        ],
+        "sections": [{"id": 5, "type": "Rectangular", "width": 100, "height": 100, "material": material}],
+        "loads": [{"id": 1, "type": "nodal", "targets": [size * size], "value": {"x": 0, "y": -10, "z": 0}}],
+        "boundary_conditions": [
+            {"id": 1, "type": "fixed", "targets": corners, "dx": 1, "dy": 1, "dz": 1, "rx": 0, "ry": 0, "rz": 0},
+            # Hors plan (dy : z du modèle)
+            {"id": 2, "type": "fixed", "targets": [node["id"] for node in nodes if node["id"] not in corners],
+             "dx": 0, "dy": 1, "dz": 0, "rx": 0, "ry": 0, "rz": 0},
+        ],
+        "analysis": {"engine": "direct"},
+    }
+
+
+class TestRunAnalysis:
+    """Tests du moteur d'analyse OpenSees"""
+
+    def test_ssll03_deflection(self, ssll03):
+        """Flèche de -10 mm sur l'appui élastique"""
+        output = run_analysis(ssll03)
+        displacements = find_node(output, SPRING_NODE)["displacements"]
+        assert displacements["uz"] == pytest.approx(-0.010, abs=2e-4)
+
+    def test_linear_mode(self, ssll03):
+        """Un modèle élastique est résolu en un seul pas linéaire"""
+        output = run_analysis(ssll03)
+        assert (output["analysis"]["mode"], output["analysis"]["steps"]) == ("linear", 1)
+        assert output["analysis"]["solver"]["system"] == "BandSPD"
+
+    def test_incremental_mode(self, ssll03):
+        """Le schéma incrémental donne les mêmes résultats que le pas linéaire"""
+        linear = run_analysis(copy.deepcopy(ssll03))
+        ssll03["analysis"] = {"mode": "incremental"}
+        incremental = run_analysis(ssll03)
+
+        assert (incremental["analysis"]["mode"], incremental["analysis"]["steps"]) == ("incremental", 10)
+        assert find_node(incremental, SPRING_NODE)["displacements"] == find_node(linear, SPRING_NODE)["displacements"]
+
+    def test_nonlinear_transformation(self, ssll03):
+        """Une transformation PDelta force le schéma incrémental"""
+        for member in ssll03["members"]:
+            member["transformation"] = "PDelta"
+        output = run_analysis(ssll03)
+        assert output["analysis"]["mode"] == "incremental"
+
+
+class TestLoadCases:
+    """Tests des cas de charge et combinaisons"""
+
+    @pytest.fixture
+    def cases_model(self, ssll03):
+        """SSLL03 avec une force par cas de charge et deux combinaisons"""
+        load = ssll03["loads"][0]
+        ssll03["loads"] = [
+            {**load, "id": 1, "targets": [load["targets"][0]], "case": 1},
+            {**load, "id": 2, "targets": [load["targets"][1]], "case": 2},
+        ]
+        ssll03["load_cases"] = [{"id": 1, "name": "F1"}, {"id": 2, "name": "F2"}]
+        ssll03["load_combinations"] = [
+            {"id": 10, "name": "F1 + F2", "factors": {"1": 1.0, "2": 1.0}},
+            {"id": 11, "name": "1.35 F1", "factors": {"1": 1.35}},
+        ]
+        return ssll03
+
+    def test_combination_matches_single_case(self, ssll03, cases_model):
+        """La combinaison F1 + F2 redonne la flèche du modèle à un seul cas"""
+        single = run_analysis(copy.deepcopy(ssll03))
+        output = run_analysis(cases_model)
+
+        assert (output["analysis"]["mode"], output["analysis"]["steps"]) == ("linear", 2)
+        assert [case["id"] for case in output["load_cases"]] == [1, 2]
+        assert [combination["id"] for combination in output["load_combinations"]] == [10, 11]
+        assert find_node(output, SPRING_NODE)["displacements"] == find_node(single, SPRING_NODE)["displacements"]
+
+    def test_superposition(self, cases_model):
+        """Les combinaisons sont la somme pondérée des cas"""
+        output = run_analysis(cases_model)
+        uz = lambda result: find_node(result, SPRING_NODE)["displacements"]["uz"]
+        case_1 = output["load_cases"][0]
+
+        assert uz(case_1) == pytest.approx(-0.005, abs=2e-4)
+        assert uz(output["load_combinations"][1]) == pytest.approx(1.35 * uz(case_1), abs=1e-5)
+
+    def test_envelopes(self, cases_model):
+        """Les enveloppes donnent les extrêmes et la combinaison déterminante"""
+        output = run_analysis(cases_model)
+        uz = find_node(output["envelopes"], SPRING_NODE)["uz"]
+
+        assert uz["min"] == pytest.approx(-0.010, abs=2e-4)
+        assert uz["min_combination"] == 10
+        assert uz["max_combination"] == 11
+
+        member = output["envelopes"]["members"][1]
+        moments = [
+            effort["efforts"]["My"]["value"]
+            for combination in output["load_combinations"]
+            for result in combination["members"] if result["id"] == member["id"]
+            for effort in result["node_efforts"]
+        ]
+        assert member["My"]["min"] == pytest.approx(min(moments), abs=0.02)
+        assert member["My"]["max"] == pytest.approx(max(moments), abs=0.02)
+
+    def test_undefined_case(self, cases_model):
+        """Une charge vers un cas inexistant est refusée"""
+        cases_model["loads"][0]["case"] = 3
+        with pytest.raises(HTTPException):
+            run_analysis(cases_model)
+
+class TestElementLoads:
+    """Tests des charges réparties appliquées comme charges d'élément"""
+
+    @pytest.fixture
+    def udl_model(self, ssll03):
+        """Poutre isostatique de 6 m sous 10 kN/m"""
+        material = ssll03["sections"][0]["material"]
+        nodei = {"id": 1, "x": 0, "y": 0, "z": 0}
+        nodej = {"id": 2, "x": 6, "y": 0, "z": 0}
+        return {
+            "nodes": [nodei, nodej],
+            "members": [{"id": 10, "nodei": nodei, "nodej": nodej, "section": 5, "vecxz": [0, 0, 1]}],
+            "sections": [{"id": 5, "type": "Rectangular", "width": 200, "height": 400, "material": material}],
+            "loads": [{"id": 1, "type": "linear", "targets": [10], "value": {"x": 0, "y": -10, "z": 0}}],
+            "boundary_conditions": [
+                {"id": 1, "type": "fixed", "targets": [1], "dx": 1, "dy": 1, "dz": 1, "rx": 1, "ry": 0, "rz": 0},
+                {"id": 2, "type": "fixed", "targets": [2], "dx": 0, "dy": 1, "dz": 1, "rx": 0, "ry": 0, "rz": 0},
+            ],
+        }
+
+    def test_exact_diagram(self, udl_model):
+        """Effort tranchant wL/2 aux appuis et moment wL²/8 à mi-portée, sans nœud intermédiaire"""
+        output = run_analysis(udl_model)
+        node_efforts = output["members"][0]["node_efforts"]
+        moments = [station["efforts"]["My"]["value"] for station in node_efforts]
+
+        assert len(output["nodes"]) == 2
+        assert node_efforts[0]["efforts"]["Vz"]["value"] == pytest.approx(30.0)
+        assert min(moments) == pytest.approx(-45.0)
+        assert node_efforts[len(node_efforts) // 2]["node"] is None
+
+    def test_envelope_midspan(self, udl_model):
+        """L'enveloppe tient compte des stations entre les extrémités"""
+        udl_model["load_cases"] = [{"id": 1, "name": "G"}]
+        udl_model["load_combinations"] = [{"id": 10, "name": "1.35 G", "factors": {"1": 1.35}}]
+        output = run_analysis(udl_model)
+
+        assert output["envelopes"]["members"][0]["My"]["min"] == pytest.approx(-1.35 * 45.0)
+
+    def test_diagram_positions(self, udl_model):
+        """Les diagrammes sont décalés selon l'axe local z de l'effort, à l'échelle par défaut"""
+        output = run_analysis(udl_model)
+        node_efforts = output["members"][0]["node_efforts"]
+
+        for station in node_efforts:
+            x = station["coord"][0]
+            # Effort tranchant et moment de la poutre isostatique, en N et Nm
+            values = {"Vz": 30e3 - 10e3 * x, "My": -30e3 * x + 5e3 * x**2}
+            for (force, value) in values.items():
+                assert station["efforts"][force]["displaced_positions"] == pytest.approx([x, 0.0, value * 1E-5], abs=1e-6)
+
+
+class TestReleases:
+    """Tests des relâchements condensés dans les éléments"""
+
+    @pytest.fixture
+    def truss(self, ssll03):
+        """Treillis triangulaire articulé de 4 m de portée et 2 m de haut, chargé de 10 kN au sommet"""
+        material = ssll03["sections"][0]["material"]
+        nodes = [
+            {"id": 1, "x": 0, "y": 0, "z": 0},
+            {"id": 2, "x": 4, "y": 0, "z": 0},
+            {"id": 3, "x": 2, "y": 2, "z": 0},
+        ]
+        return {
+            "nodes": nodes,
+            "members": [
+                {"id": 10 + k, "nodei": nodes[i], "nodej": nodes[j], "section": 5, "release": "pinned-pinned"}
+                for (k, (i, j)) in enumerate([(0, 1), (0, 2), (1, 2)])
+            ],
+            "sections": [{"id": 5, "type": "Rectangular", "width": 100, "height": 100, "material": material}],
+            "loads": [{"id": 1, "type": "nodal", "targets": [3], "value": {"x": 0, "y": -10, "z": 0}}],
+            "boundary_conditions": [
+                {"id": 1, "type": "fixed", "targets": [1], "dx": 1, "dy": 1, "dz": 1, "rx": 0, "ry": 0, "rz": 0},
+                {"id": 2, "type": "fixed", "targets": [2], "dx": 0, "dy": 1, "dz": 1, "rx": 0, "ry": 0, "rz": 0},
+                {"id": 3, "type": "fixed", "targets": [3], "dx": 0, "dy": 1, "dz": 0, "rx": 0, "ry": 0, "rz": 0},
+            ],
+        }
+
+    def test_truss(self, truss):
+        """Les barres articulées ne portent que leur effort normal, sans nœud ni ressort ajouté"""
+        for engine in ("opensees", "direct"):
+            truss["analysis"] = {"engine": engine, "output": {"fields": ["displacements", "efforts", "reactions"]}}
+            output = run_analysis(copy.deepcopy(truss))
+            axial = [member["node_efforts"][0]["efforts"]["N"]["value"] for member in output["members"]]
+            moments = [
+                station["efforts"][force]["value"]
+                for member in output["members"] for station in member["node_efforts"] for force in ("My", "Mz")
+            ]
+
+            assert len(output["nodes"]) == 3
+            assert axial == pytest.approx([5.0, -10 / np.sqrt(2), -10 / np.sqrt(2)], abs=0.01)
+            assert moments == pytest.approx([0.0] * len(moments), abs=0.01)
+            # The restrained hinge rotations carry no moment
+            assert [reaction["reactions"]["My"] for reaction in output["reactions"]] == pytest.approx([0.0] * 3)
+
+    def test_member_load(self, truss):
+        """Une charge répartie sur une barre articulée donne les efforts d'une poutre isostatique"""
+        truss["loads"] = [{"id": 1, "type": "linear", "targets": [10], "value": {"x": 0, "y": -10, "z": 0}}]
+        for session in (None, AnalysisSession("test")):
+            output = run_analysis(copy.deepcopy(truss), session=session)
+            node_efforts = output["members"][0]["node_efforts"]
+            moments = [station["efforts"]["My"]["value"] for station in node_efforts]
+
+            assert (node_efforts[0]["efforts"]["My"]["value"], node_efforts[-1]["efforts"]["My"]["value"]) == (0, 0)
+            assert min(moments) == pytest.approx(-20.0)
+
+    def test_pinned_torsion(self, truss):
+        """Une barre articulée aux deux extrémités porte encore la torsion"""
+        # Console horizontale de 2 m (barre 11) portée en torsion par la barre 10
+        nodes = [
+            {"id": 1, "x": 0, "y": 0, "z": 0},
+            {"id": 2, "x": 4, "y": 0, "z": 0},
+            {"id": 3, "x": 4, "y": 0, "z": 2},
+        ]
+        truss["nodes"] = nodes
+        truss["members"] = [
+            {"id": 10, "nodei": nodes[0], "nodej": nodes[1], "section": 5, "release": "pinned-pinned"},
+            {"id": 11, "nodei": nodes[1], "nodej": nodes[2], "section": 5},
+        ]
+        truss["loads"] = [{"id": 1, "type": "nodal", "targets": [3], "value": {"x": 0, "y": -10, "z": 0}}]
+        truss["boundary_conditions"] = [
+            {"id": 1, "type": "fixed", "targets": [1], "dx": 1, "dy": 1, "dz": 1, "rx": 1, "ry": 1, "rz": 1},
+            {"id": 2, "type": "fixed", "targets": [2], "dx": 0, "dy": 1, "dz": 1, "rx": 0, "ry": 1, "rz": 1},
+        ]
+        for engine in ("opensees", "direct"):
+            truss["analysis"] = {"engine": engine}
+            output = run_analysis(copy.deepcopy(truss))
+            efforts = output["members"][0]["node_efforts"]
+
+            assert [abs(station["efforts"]["T"]["value"]) for station in efforts] == pytest.approx([20.0, 20.0])
+            assert [station["efforts"]["My"]["value"] for station in efforts] == pytest.approx([0.0, 0.0], abs=0.01)
+            assert [station["efforts"]["Mz"]["value"] for station in efforts] == pytest.approx([0.0, 0.0], abs=0.01)
+
+    def test_truss_grid(self, ssll03):
+        """Treillis articulé : seules les rotations libres sont bloquées, en un temps proportionnel à sa taille"""
+        material = ssll03["sections"][0]["material"]
+        durations = []
+        for size in (20, 40):
+            start = time.perf_counter()
+            run_analysis(truss_grid(size, material))
+            durations.append(time.perf_counter() - start)
+            hinges = set(main.index.hinges)
+            restrained = sum(len(dofs) for (node, dofs) in main.index.fixities if node in hinges and min(dofs) > 3)
+            # Rotation hors plan de chaque nœud, et les trois mouvements d'ensemble dans le plan
+            assert restrained == size * size + 3
+        # 4 fois plus de barres : la restriction des rotations ne doit pas dominer (cubique auparavant)
+        assert durations[1] < 10 * durations[0] + 1.0
+
+
+class TestElasticSupports:
+    """Tests des appuis élastiques"""
+
+    @pytest.fixture
+    def foundation(self, ssll03):
+        """Poutre de 8 m sur neuf ressorts, sous 10 kN/m"""
+        material = ssll03["sections"][0]["material"]
+        nodes = [{"id": k + 1, "x": k, "y": 0, "z": 0} for k in range(9)]
+        return {
+            "nodes": nodes,
+            "members": [
+                {"id": 10 + k, "nodei": nodes[k], "nodej": nodes[k + 1], "section": 5, "vecxz": [0, 0, 1]}
+                for k in range(8)
+            ],
+            "sections": [{"id": 5, "type": "Rectangular", "width": 300, "height": 500, "material": material}],
+            "loads": [{"id": 1, "type": "linear", "targets": [10 + k for k in range(8)], "value": {"x": 0, "y": -10, "z": 0}}],
+            "boundary_conditions": [
+                {"id": 1, "type": "elastic", "targets": [node["id"] for node in nodes],
+                 "dx": 1e6, "dy": 1e6, "dz": 1e7, "rx": 1e5, "ry": 0, "rz": 0},
+            ],
+            "analysis": {"output": {"fields": ["displacements", "reactions"], "precision": 6}},
+        }
+
+    def test_reactions(self, foundation):
+        """Chaque appui renvoie la force de son ressort, et les deux moteurs sont d'accord"""
+        outputs = {}
+        for engine in ("opensees", "direct"):
+            foundation["analysis"]["engine"] = engine
+            output = outputs[engine] = run_analysis(copy.deepcopy(foundation))
+            reactions = [reaction["reactions"]["Fz"] for reaction in output["reactions"]]
+            deflections = [node["displacements"]["uz"] for node in output["nodes"]]
+
+            assert [reaction["node"] for reaction in output["reactions"]] == list(range(1, 10))
+            assert sum(reactions) == pytest.approx(80.0)
+            # Displacements are rounded to 0.01 mm
+            assert reactions == pytest.approx([-1e4 * uz for uz in deflections], abs=0.05)
+        assert outputs["direct"]["reactions"] == outputs["opensees"]["reactions"]
+
+    def test_shared_ground(self, foundation):
+        """Les ressorts partagent un nœud fixe et les matériaux de même raideur"""
+        import opensees.main as main
+        run_analysis(foundation)
+        assert main.index.ground is not None
+        assert sorted(main.index.spring_materials) == [1e5, 1e6, 1e7]
+        assert len(main.index.spring_elements) == 9
+
+
+class TestSectionForceDistribution:
+    """Tests du calcul des efforts le long des éléments"""
+
+    def test_end_equilibrium(self):
+        """Aux extrémités, les efforts sont ceux des forces d'extrémité d'un élément en équilibre"""
+        rng = np.random.default_rng(1)
+        lengths = np.array([2.0, 5.0, 3.5])
+        counts = [2, 5, 3]
+        forces = np.zeros((3, 12))
+        forces[:, :6] = rng.uniform(-1e4, 1e4, (3, 6))
+        loads = rng.uniform(-1e3, 1e3, (3, 3))
+        Wy, Wz, Wx = loads.T
+        L = lengths
+        # Forces d'extrémité J équilibrant celles de l'extrémité I et la charge répartie
+        forces[:, 6] = -forces[:, 0] - Wx * L
+        forces[:, 7] = -forces[:, 1] - Wy * L
+        forces[:, 8] = -forces[:, 2] - Wz * L
+        forces[:, 9] = -forces[:, 3]
+        forces[:, 10] = -forces[:, 4] - forces[:, 2] * L - 0.5 * Wz * L**2
+        forces[:, 11] = -forces[:, 5] + forces[:, 1] * L + 0.5 * Wy * L**2
+        elements = np.repeat(np.arange(3), counts)
+        stations = np.concatenate([np.linspace(0., length, nep) for (length, nep) in zip(lengths, counts)])
+
+        s = element_station_forces(forces, loads, elements, stations, scale=1.)
+
+        signs = np.array([-1, 1, 1, -1, -1, -1])
+        for k in range(3):
+            assert s[elements == k][0] == pytest.approx(signs * forces[k, :6])
+            assert s[elements == k][-1] == pytest.approx(-signs * forces[k, 6:])
+
+    def test_selected_components(self):
+        """Seules les composantes demandées sont calculées, dans l'ordre demandé"""
+        rng = np.random.default_rng(2)
+        pl = rng.uniform(-1e4, 1e4, (2, 4, 12))
+        loads = rng.uniform(-1e3, 1e3, (2, 4, 3))
+        elements = np.repeat(np.arange(4), 3)
+        stations = rng.uniform(0, 5, 12)
+
+        s = element_station_forces(pl, loads, elements, stations)
+        selected = element_station_forces(pl, loads, elements, stations, components=[5, 2])
+
+        assert selected.shape == (2, 12, 2)
+        assert selected == pytest.approx(s[..., [5, 2]])
+
+
+class TestOutputOptions:
+    """Tests du niveau de détail des résultats (analysis.output)"""
+
+    def test_fields_and_forces(self, ssll03):
+        """Seuls les champs et efforts demandés sont calculés"""
+        ssll03["analysis"] = {"output": {"fields": ["efforts"], "forces": ["My", "Vz"]}}
+        output = run_analysis(ssll03)
+
+        assert "displacements" not in output["nodes"][0]
+        efforts = output["members"][0]["node_efforts"][0]["efforts"]
+        assert list(efforts) == ["Vz", "My"]
+        assert "displaced_positions" not in efforts["My"]
+
+    def test_selected_diagrams(self, ssll03):
+        """Les diagrammes des efforts demandés sont ceux du calcul complet"""
+        full = run_analysis(copy.deepcopy(ssll03))
+        ssll03["analysis"] = {"output": {"fields": ["efforts", "diagrams"], "forces": ["Mz", "N"]}}
+        output = run_analysis(ssll03)
+
+        for (member, expected) in zip(output["members"], full["members"]):
+            for (station, expected_station) in zip(member["node_efforts"], expected["node_efforts"]):
+                assert list(station["efforts"]) == ["N", "Mz"]
+                for force in ("Mz", "N"):
+                    assert station["efforts"][force] == expected_station["efforts"][force]
+
+    def test_precision(self, ssll03):
+        """Les résultats sont arrondis au nombre de décimales demandé"""
+        ssll03["analysis"] = {"output": {"precision": 1}}
+        output = run_analysis(ssll03)
+
+        assert find_node(output, SPRING_NODE)["displacements"]["uz"] == 0.0
+        assert output["members"][0]["node_efforts"][1]["efforts"]["My"]["value"] == -94.5
+
+    def test_reactions(self, ssll03):
+        """Les réactions d'appui équilibrent les 2 × 42 kN appliqués"""
+        ssll03["analysis"] = {"output": {"fields": ["displacements", "reactions"]}}
+        output = run_analysis(ssll03)
+
+        assert [reaction["node"] for reaction in output["reactions"]][-1] == SPRING_NODE
+        assert sum(reaction["reactions"]["Fz"] for reaction in output["reactions"]) == pytest.approx(84.0, abs=0.02)
+        assert output["reactions"][-1]["reactions"]["Fz"] == pytest.approx(21.0, abs=0.5)
+
+    def test_stations(self, ssll03):
+        """Le nombre de stations des barres chargées est imposé ou réduit par la tolérance"""
+        ssll03["loads"] = [{"id": 1, "type": "linear", "targets": [ssll03["members"][1]["id"]], "value": {"x": 0, "y": -10, "z": 0}}]
+        count = lambda output: len(output["members"][1]["node_efforts"])
+
+        assert count(run_analysis(copy.deepcopy(ssll03))) == 7
+        ssll03["analysis"] = {"output": {"stations": 4}}
+        assert count(run_analysis(copy.deepcopy(ssll03))) == 4
+        # w h² / 8 <= 1 kNm sous 10 kN/m : h <= 0.89 m, soit 5 stations sur 3 m
+        ssll03["analysis"] = {"output": {"tolerance": 1.0}}
+        assert count(run_analysis(copy.deepcopy(ssll03))) == 5
+
+    def test_unknown_field(self, ssll03):
+        """Un champ de résultat inconnu est refusé"""
+        ssll03["analysis"] = {"output": {"fields": ["stresses"]}}
+        with pytest.raises(HTTPException):
+            run_analysis(ssll03)
+
+
+class TestAnalysisPool:
+    """Tests du pool de processus d'analyse"""
+
+    def test_parallel_analyses(self, ssll03):
+        """Plusieurs analyses simultanées donnent le même résultat"""
+        pool = AnalysisPool(workers=2, queue_size=2)
+
+        async def run():
+            return await asyncio.gather(*[pool.run_analysis(copy.deepcopy(ssll03)) for _ in range(3)])
+
+        try:
+            outputs = asyncio.run(run())
+        finally:
+            pool.shutdown()
+
+        for output in outputs:
+            displacements = find_node(output, SPRING_NODE)["displacements"]
+            assert displacements["uz"] == pytest.approx(-0.010, abs=2e-4)
+
+    def test_queue_full(self, ssll03):
+        """Le pool refuse les analyses au-delà de sa capacité"""
+        pool = AnalysisPool(workers=1, queue_size=0)
+        pool.pending = pool.capacity
+
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(pool.run_analysis(ssll03))
+        assert error.value.status_code == 503
+
+    def test_cancelled_slot(self):
+        """Une analyse annulée occupe sa place jusqu'à la fin du worker"""
+        pool = AnalysisPool(workers=1, queue_size=0)
+
+        async def run():
+            await pool.submit(os.getpid)
+            task = asyncio.ensure_future(pool.submit(time.sleep, 1.0))
+            await asyncio.sleep(0.3)
+            task.cancel()
+            await asyncio.sleep(0.1)
+            cancelled = (pool.pending, pool.full)
+            while pool.pending:
+                await asyncio.sleep(0.05)
+            return cancelled
+
+        try:
+            cancelled = asyncio.run(run())
+        finally:
+            pool.shutdown()
+
+        assert cancelled == (1, True)
+        assert pool.pending == 0
+
+    def test_worker_error(self, ssll03):
+        """Les erreurs du worker remontent en HTTPException"""
+        ssll03["members"][0]["nodei"]["id"] = 1
+        pool = AnalysisPool(workers=1, queue_size=0)
+
+        try:
+            with pytest.raises(HTTPException) as error:
+                asyncio.run(pool.run_analysis(ssll03))
+        finally:
+            pool.shutdown()
+        assert error.value.status_code == 500
+
+
+class TestAnalysisJobs:
+    """Tests des analyses asynchrones (jobs)"""
+
+    def test_job_progress(self, ssll03):
+        """Un job passe par toutes les phases puis expose ses résultats"""
+        pool = AnalysisPool(workers=1, queue_size=1)
+        phases = []
+
+        async def notify(job, event):
+            phases.append(event["phase"])
+
+        async def run():
+            jobs = AnalysisJobs(pool, notify=notify)
+            job = jobs.submit(ssll03)
+            await job.task
+            await asyncio.sleep(0)
+            return jobs.get(job.id).to_dict()
+
+        try:
+            job = asyncio.run(run())
+        finally:
+            pool.shutdown()
+
+        assert job["status"] == "completed"
+        assert find_node(job["output"], SPRING_NODE)["displacements"]["uz"] == pytest.approx(-0.010, abs=2e-4)
+        for phase in ["nodes", "transformations", "sections", "members", "boundary_conditions", "loads", "solve", "completed"]:
+            assert phase in phases
+
+    def test_cancel_queued_job(self, ssll03):
+        """Un job annulé avant son exécution n'est jamais terminé"""
+        pool = AnalysisPool(workers=1, queue_size=1)
+
+        async def run():
+            jobs = AnalysisJobs(pool)
+            job = jobs.submit(ssll03)
+            jobs.cancel(job.id)
+            await asyncio.sleep(0)
+            return jobs.get(job.id).to_dict()
+
+        try:
+            job = asyncio.run(run())
+        finally:
+            pool.shutdown()
+
+        assert job["status"] == "cancelled"
+        assert "output" not in job
+        assert pool.reserved == 0 and pool.pending == 0
+
+    def test_burst(self, ssll03):
+        """Les jobs au-delà de la capacité du pool sont refusés dès leur soumission"""
+        pool = AnalysisPool(workers=1, queue_size=1)
+
+        async def run():
+            jobs = AnalysisJobs(pool)
+            accepted = [jobs.submit(ssll03), jobs.submit(ssll03)]
+            with pytest.raises(HTTPException) as error:
+                jobs.submit(ssll03)
+            await asyncio.gather(*[job.task for job in accepted])
+            return error.value.status_code, [job.status for job in accepted]
+
+        try:
+            status_code, statuses = asyncio.run(run())
+        finally:
+            pool.shutdown()
+
+        assert status_code == 503
+        assert statuses == ["completed", "completed"]
+        assert pool.reserved == 0
@@ -1,11 +1,7 @@
 import pytest
 from fastapi.testclient import TestClient
-import sys
 import os
 
-# Ajouter le répertoire parent au PATH pour importer main
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 # Mock des variables d'environnement nécessaires pour main.py
 os.environ.setdefault("REACT_APP_PLATFORM_API_URL", "http://test")
 os.environ.setdefault("ENVIRONMENT", "test")
@@ -0,0 +1,121 @@
+import asyncio
+import copy
+import math
+
+import numpy as np
+import pytest
+
+from fastapi import HTTPException
+from opensees import AnalysisPool, run_buckling_analysis
+
+E = 2.1e11
+LENGTH = 4.0
+WIDTH = 0.2
+HEIGHT = 0.3
+# Inerties faible (flexion selon la largeur) et forte
+WEAK = HEIGHT * WIDTH ** 3 / 12
+STRONG = WIDTH * HEIGHT ** 3 / 12
+
+
+@pytest.fixture
+def column():
+    """Poteau encastré en pied de 4 m, section 200 x 300 mm, sans maillage, 1 kN en tête"""
+    nodes = [{"id": 1, "x": 0, "y": 0, "z": 0}, {"id": 2, "x": 0, "y": LENGTH, "z": 0}]
+    return {
+        "nodes": nodes,
+        "members": [{"id": 1, "nodei": nodes[0], "nodej": nodes[1], "section": 1}],
+        "sections": [{
+            "id": 1, "type": "Rectangular", "width": WIDTH * 1000, "height": HEIGHT * 1000,
+            "material": {"id": 1, "E": E, "nu": 0.3}
+        }],
+        "loads": [{"id": 1, "type": "nodal", "targets": [2], "value": {"x": 0, "y": -1, "z": 0}}],
+        "boundary_conditions": [{
+            "id": 1, "type": "fixed", "targets": [1], "dx": 1, "dy": 1, "dz": 1, "rx": 1, "ry": 1, "rz": 1
+        }],
+        "analysis": {"modes": 3},
+    }
+
+
+def euler_load(inertia, effective_length):
+    """Charge critique d'Euler (kN)"""
+    return math.pi ** 2 * E * inertia / effective_length ** 2 / 1e3
+
+
+class TestBucklingAnalysis:
+    """Tests de l'analyse de flambement linéaire"""
+
+    def test_cantilever(self, column):
+        """Poteau console : charges d'Euler (longueur de flambement 2L) dans les deux plans, puis 3e mode"""
+        output = run_buckling_analysis(column)
+        factors = output["buckling"]["factors"]
+        assert output["analysis"]["type"] == "buckling"
+        assert output["analysis"]["modes"] == 3
+        assert output["buckling"]["reference"] == {"type": "case", "id": 1, "name": "Default"}
+        assert factors[0] == pytest.approx(euler_load(WEAK, 2 * LENGTH), rel=1e-3)
+        assert factors[1] == pytest.approx(euler_load(STRONG, 2 * LENGTH), rel=1e-3)
+        assert factors[2] == pytest.approx(9 * factors[0], rel=1e-2)
+
+    def test_pinned(self, column):
+        """Poteau bi-articulé d'une seule barre non maillée : charge d'Euler (longueur de flambement L)"""
+        column["boundary_conditions"] = [
+            {"id": 1, "type": "fixed", "targets": [1], "dx": 1, "dy": 1, "dz": 1, "rx": 0, "ry": 0, "rz": 1},
+            # Tête guidée latéralement (dz est la verticale des appuis, axes d'OpenSees)
+            {"id": 2, "type": "fixed", "targets": [2], "dx": 1, "dy": 1, "dz": 0, "rx": 0, "ry": 0, "rz": 0},
+        ]
+        factors = run_buckling_analysis(column)["buckling"]["factors"]
+        assert factors[0] == pytest.approx(euler_load(WEAK, LENGTH), rel=1e-3)
+        assert factors[1] == pytest.approx(euler_load(STRONG, LENGTH), rel=1e-3)
+
+    def test_released(self, column):
+        """Poteau articulé par les relâchements de ses barres d'extrémité : longueur de flambement L"""
+        nodes = [column["nodes"][0], {"id": 3, "x": 0, "y": LENGTH / 2, "z": 0}, column["nodes"][1]]
+        column["nodes"] = nodes
+        column["members"] = [
+            {"id": 1, "nodei": nodes[0], "nodej": nodes[1], "section": 1, "release": "pinned-fixed"},
+            {"id": 2, "nodei": nodes[1], "nodej": nodes[2], "section": 1, "release": "fixed-pinned"},
+        ]
+        # Tête guidée latéralement (dz est la verticale des appuis, axes d'OpenSees)
+        column["boundary_conditions"].append({
+            "id": 2, "type": "fixed", "targets": [2], "dx": 1, "dy": 1, "dz": 0, "rx": 0, "ry": 0, "rz": 0
+        })
+        factors = run_buckling_analysis(column)["buckling"]["factors"]
+        assert factors[0] == pytest.approx(euler_load(WEAK, LENGTH), rel=1e-3)
+        assert factors[1] == pytest.approx(euler_load(STRONG, LENGTH), rel=1e-3)
+
+    def test_combination(self, column):
+        """Les charges de référence sont celles de la première combinaison"""
+        column["load_cases"] = [{"id": 1, "name": "G"}, {"id": 2, "name": "Q"}]
+        column["loads"].append({"id": 2, "type": "nodal", "targets": [2], "value": {"x": 0, "y": -1, "z": 0}, "case": 2})
+        column["load_combinations"] = [{"id": 7, "name": "ELU", "factors": {"1": 1.35, "2": 1.5}}]
+        output = run_buckling_analysis(column)
+        assert output["buckling"]["reference"] == {"type": "combination", "id": 7, "name": "ELU"}
+        assert output["buckling"]["factors"][0] == pytest.approx(euler_load(WEAK, 2 * LENGTH) / 2.85, rel=1e-3)
+
+    def test_tension(self, column):
+        """Un poteau tendu ne flambe pas"""
+        column["loads"][0]["value"]["y"] = 1
+        with pytest.raises(HTTPException, match="compress no member"):
+            run_buckling_analysis(column)
+
+    def test_shapes(self, column):
+        """Déformées de flambement : premier mode dans le plan faible, la plus grande translation valant 1"""
+        output = run_buckling_analysis(column)
+        count = len(output["nodes"])
+        translations = np.array(output["shapes"][0]).reshape(count, 3)
+        assert np.linalg.norm(translations, axis=1).max() == pytest.approx(1.0, abs=1e-3)
+        # Flexion selon la largeur (z du modèle, uy d'OpenSees) ; pied fixe
+        assert np.abs(translations[:, 1]).max() == pytest.approx(1.0, abs=1e-3)
+        assert np.abs(translations[0]).max() == 0
+
+        columns = run_buckling_analysis(column, result_format="columnar")["columns"]
+        assert columns["factors"] == pytest.approx(output["buckling"]["factors"])
+        assert columns["mode_shapes"].shape == (3, count, 3)
+
+    def test_pool(self, column):
+        """L'analyse de flambement passe par le pool de workers"""
+        pool = AnalysisPool(workers=1, queue_size=1, session_workers=1)
+        try:
+            output = asyncio.run(pool.run_buckling_analysis(copy.deepcopy(column)))
+        finally:
+            pool.shutdown()
+        assert output["buckling"]["factors"] == pytest.approx(run_buckling_analysis(column)["buckling"]["factors"])
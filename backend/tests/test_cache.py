@@ -0,0 +1,119 @@
+import asyncio
+import copy
+import os
+
+import pytest
+
+from opensees import AnalysisPool, ResultCache
+from opensees.cache import DiskStore, JsonStore, LRUCache, canonical_model_hash
+
+
+class TestModelHash:
+    """Tests de l'empreinte canonique des modèles"""
+
+    def test_ordering_and_formatting(self, ssll03):
+        """L'ordre des entités et le format des nombres ne changent pas l'empreinte"""
+        other = copy.deepcopy(ssll03)
+        other["nodes"].reverse()
+        other["loads"][0]["targets"].reverse()
+        other["nodes"][0]["x"] = float(other["nodes"][0]["x"])
+
+        assert canonical_model_hash(other) == canonical_model_hash(ssll03)
+
+    def test_value_change(self, ssll03):
+        """Une charge différente change l'empreinte"""
+        other = copy.deepcopy(ssll03)
+        other["loads"][0]["value"]["y"] = -41.5
+
+        assert canonical_model_hash(other) != canonical_model_hash(ssll03)
+
+
+class TestLRUCache:
+    """Tests du cache LRU"""
+
+    def test_size_eviction(self):
+        """Les entrées les moins récemment utilisées sont évincées au-delà de la taille"""
+        cache = LRUCache(max_bytes=10)
+        cache.put("a", 1, 4)
+        cache.put("b", 2, 4)
+        cache.get("a")
+        cache.put("c", 3, 4)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert cache.bytes == 8
+
+
+class TestDiskStore:
+    """Tests des dossiers de cache sur disque"""
+
+    def test_json_store(self, tmp_path):
+        """Les valeurs sont stockées en JSON, le dossier est privé et sa taille bornée"""
+        store = JsonStore(str(tmp_path / "sections"), max_bytes=100)
+        store.put("a", {"A": 0.08, "Iz": 1.0 / 3})
+        assert store.get("a") == {"A": 0.08, "Iz": 1.0 / 3}
+        assert os.listdir(tmp_path / "sections") == ["a.json"]
+        assert os.stat(tmp_path / "sections").st_mode & 0o777 == 0o700
+
+        # Un fichier illisible (pickle déposé à la place) est ignoré
+        (tmp_path / "sections" / "b.json").write_bytes(b"\x80\x04K\x01.")
+        assert store.get("b") is None
+
+        store.put("c", {"name": "x" * 80})
+        assert store.get("a") is None
+
+    @pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions")
+    def test_shared_directory(self, tmp_path):
+        """Un dossier modifiable par d'autres utilisateurs est refusé"""
+        os.chmod(tmp_path, 0o777)
+        with pytest.raises(OSError, match="not private"):
+            DiskStore(str(tmp_path))
+
+
+class TestResultCache:
+    """Tests du cache de résultats d'analyse"""
+
+    def test_disk_tier(self, tmp_path):
+        """Le cache disque survit à un redémarrage"""
+        ResultCache(directory=str(tmp_path)).put("key", {"nodes": []})
+        cache = ResultCache(directory=str(tmp_path))
+
+        assert cache.get("key") == {"nodes": []}
+        assert cache.get("other") is None
+        assert cache.stats()["disk_hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_copies(self):
+        """Modifier un résultat servi par le cache ne modifie pas les suivants"""
+        cache = ResultCache()
+        cache.put("key", {"nodes": [{"id": 1}]})
+        cache.get("key")["nodes"].append({"id": 2})
+
+        assert cache.get("key") == {"nodes": [{"id": 1}]}
+
+    def test_clear(self, tmp_path):
+        """Vider le cache vide aussi le cache disque"""
+        cache = ResultCache(directory=str(tmp_path))
+        cache.put("key", {"nodes": []})
+        cache.clear()
+
+        assert cache.get("key") is None
+        assert ResultCache(directory=str(tmp_path)).get("key") is None
+
+    def test_pool_hit(self, ssll03):
+        """Une soumission identique est servie par le cache sans worker"""
+        pool = AnalysisPool(workers=1, queue_size=0, cache=ResultCache())
+
+        async def run():
+            first = await pool.run_analysis(copy.deepcopy(ssll03))
+            pool.shutdown()
+            second = await pool.run_analysis(ssll03)
+            return first, second
+
+        try:
+            first, second = asyncio.run(run())
+        finally:
+            pool.shutdown()
+
+        assert second == first and second is not first
+        assert pool.cache.stats()["hits"] == 1
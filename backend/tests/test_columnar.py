@@ -0,0 +1,66 @@
+import copy
+import json
+
+import numpy as np
+import pytest
+
+from opensees import run_analysis
+from opensees.columnar import ALIGNMENT, decode_columnar, encode_columnar, id_column
+
+
+class TestColumnarFormat:
+    """Tests de l'encodage des résultats en colonnes binaires"""
+
+    def test_round_trip(self):
+        """Les colonnes sont relues à l'identique, alignées sur 8 octets"""
+        output = {
+            "analysis": {"mode": "linear", "steps": 1},
+            "columns": {"ids": id_column([3, 1, 2]), "values": np.arange(12.0).reshape(4, 3)},
+        }
+        data = encode_columnar(output)
+        columns, meta = decode_columnar(data)
+
+        assert meta == {"analysis": {"mode": "linear", "steps": 1}}
+        assert columns["ids"].tolist() == [3, 1, 2]
+        assert columns["values"].tolist() == output["columns"]["values"].tolist()
+        assert data.index(columns["values"].tobytes()) % ALIGNMENT == 0
+
+    def test_large_ids(self):
+        """Les ids hors int32 sont stockés en float64, exacts"""
+        assert id_column([1, 2]).dtype == np.dtype("<i4")
+        assert id_column([2**40]).tolist() == [2.0**40]
+
+
+class TestColumnarAnalysis:
+    """Tests des résultats d'analyse en colonnes"""
+
+    def test_matches_json(self, ssll03):
+        """Les colonnes portent les mêmes déplacements et efforts que le JSON"""
+        output = run_analysis(copy.deepcopy(ssll03))
+        columns, meta = decode_columnar(encode_columnar(run_analysis(copy.deepcopy(ssll03), result_format="columnar")))
+
+        assert columns["node_ids"].tolist() == [node["id"] for node in output["nodes"]]
+        uz = {node["id"]: node["displacements"]["uz"] for node in output["nodes"]}
+        for (node_id, displacements) in zip(columns["node_ids"].tolist(), columns["displacements"]):
+            assert round(displacements[2], 5) == uz[node_id]
+
+        # Premier élément de la première barre : efforts à son extrémité i
+        first = columns["element_stations"][columns["member_elements"][0]]
+        efforts = output["members"][0]["node_efforts"][0]["efforts"]
+        for (i, force) in enumerate(meta["forces"]):
+            assert columns["station_forces"][first, i] == pytest.approx(efforts[force]["value"], abs=0.01)
+
+    def test_smaller_than_json(self, ssll03):
+        """La réponse en colonnes est plus compacte que le JSON"""
+        output = run_analysis(copy.deepcopy(ssll03))
+        columnar = encode_columnar(run_analysis(copy.deepcopy(ssll03), result_format="columnar"))
+        assert len(columnar) < len(json.dumps(output, default=float)) / 2
+
+    def test_output_options(self, ssll03):
+        """Les colonnes suivent les champs et efforts demandés"""
+        ssll03["analysis"] = {"output": {"fields": ["efforts", "reactions"], "forces": ["My"]}}
+        columns, meta = decode_columnar(encode_columnar(run_analysis(ssll03, result_format="columnar")))
+
+        assert "displacements" not in columns
+        assert meta["forces"] == ["My"] and columns["station_forces"].shape[1] == 1
+        assert columns["reactions"][:, 2].sum() == pytest.approx(84.0, abs=0.02)
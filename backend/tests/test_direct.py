@@ -0,0 +1,157 @@
+import copy
+
+import numpy as np
+import pytest
+
+from fastapi import HTTPException
+from opensees import run_analysis
+from opensees.direct import beam_stiffness, condense_geometric, condense_releases, fixed_end_forces, geometric_stiffness
+
+ALL_FIELDS = ["displacements", "efforts", "diagrams", "reactions"]
+
+
+@pytest.fixture
+def ssll03(ssll03):
+    """Modèle du benchmark SSLL03, avec réactions d'appui et précision étendue"""
+    ssll03["analysis"] = {"output": {"fields": ALL_FIELDS, "precision": 9}}
+    return ssll03
+
+
+def run_engine(model, engine):
+    model = copy.deepcopy(model)
+    model["analysis"] = {**(model.get("analysis") or {}), "engine": engine}
+    return run_analysis(model)
+
+
+def flatten(value, path=""):
+    """Valeurs numériques d'une sortie, par chemin"""
+    if isinstance(value, dict):
+        return {key: item for (k, v) in value.items() for (key, item) in flatten(v, f"{path}.{k}").items()}
+    if isinstance(value, list):
+        return {key: item for (i, v) in enumerate(value) for (key, item) in flatten(v, f"{path}[{i}]").items()}
+    return {path: value}
+
+
+def assert_same_output(direct, expected):
+    """Les deux moteurs donnent la même sortie, aux arrondis près"""
+    direct, expected = flatten(direct), flatten(expected)
+    for output in (direct, expected):
+        output.pop(".analysis.solver.factorization_time")
+    assert direct.keys() == expected.keys()
+    for (path, value) in expected.items():
+        if isinstance(value, float):
+            assert direct[path] == pytest.approx(value, rel=1e-6, abs=1e-8), path
+        else:
+            assert direct[path] == value, path
+
+
+class TestBeamStiffness:
+    """Tests des matrices de rigidité locales"""
+
+    def test_rigid_body_modes(self):
+        """Translations et rotations d'ensemble ne produisent aucun effort"""
+        k = beam_stiffness([[2.1e11, 0.01, 2e-4, 1e-4, 8e10, 3e-4]], [4.0])[0]
+        assert np.allclose(k, k.T)
+
+        L = 4.0
+        modes = np.zeros((6, 12))
+        for dof in range(3):
+            modes[dof, [dof, dof + 6]] = 1
+        modes[3, [3, 9]] = 1
+        # Rotation about z: v = x θ at the far end; about y: w = -x θ
+        modes[4, [5, 11, 7]] = [1, 1, L]
+        modes[5, [4, 10, 8]] = [1, 1, -L]
+        assert np.allclose(modes @ k, 0, atol=1e-3)
+
+
+    def test_releases(self):
+        """Les efforts d'encastrement relâchés sont ceux de la matrice condensée"""
+        properties = [[2.1e11, 0.01, 2e-4, 1e-4, 8e10, 3e-4]] * 4
+        lengths = [4.0] * 4
+        releases = [[0, 0], [1, 1], [2, 2], [3, 1]]
+        k = beam_stiffness(properties, lengths)
+        condensed = condense_releases(k, releases)
+        fixed = fixed_end_forces([[-10e3, 3e3, 1e3]] * 4, lengths)
+        released = fixed_end_forces([[-10e3, 3e3, 1e3]] * 4, lengths, releases)
+
+        for (n, dofs) in enumerate([[], [4, 5], [10, 11], [5, 11, 4]]):
+            assert np.allclose(condensed[n][dofs], 0)
+            expected = fixed[n] - k[n][:, dofs] @ np.linalg.solve(k[n][np.ix_(dofs, dofs)], fixed[n][dofs])
+            assert np.allclose(released[n], expected)
+
+    def test_releases_keep_torsion(self):
+        """Les relâchements condensent la flexion seule : la rigidité de torsion reste entière"""
+        properties = [[2.1e11, 0.01, 2e-4, 1e-4, 8e10, 3e-4]]
+        k = beam_stiffness(properties, [4.0])
+        condensed = condense_releases(k, [[3, 3]])
+        torsion = np.ix_([3, 9], [3, 9])
+
+        assert condensed[0][torsion] == pytest.approx(k[0][torsion])
+        assert condensed[0][3, 3] == pytest.approx(8e10 * 3e-4 / 4.0)
+
+    def test_geometric_stiffness(self):
+        """Rigidité géométrique : 6N/5L encastrée, N/L (fil tendu) une fois les deux extrémités relâchées"""
+        properties = [[2.1e11, 0.01, 2e-4, 1e-4, 8e10, 3e-4]] * 2
+        (N, L) = (-50e3, 4.0)
+        k = beam_stiffness(properties, [L] * 2)
+        kg = geometric_stiffness(properties, [L] * 2, [N] * 2)
+        assert np.allclose(kg, kg.transpose(0, 2, 1))
+        assert kg[0, 1, 1] == pytest.approx(6 * N / (5 * L))
+        assert kg[0, 5, 5] == pytest.approx(2 * N * L / 15)
+
+        condensed = condense_geometric(k, kg, [[0, 0], [3, 0]])
+        assert np.allclose(condensed[0], kg[0])
+        assert np.allclose(condensed[1][[5, 11]], 0)
+        assert condensed[1, 1, 1] == pytest.approx(N / L)
+        assert condensed[1, 1, 7] == pytest.approx(-N / L)
+        # Le plan non relâché garde sa rigidité géométrique
+        assert condensed[1, 2, 2] == pytest.approx(6 * N / (5 * L))
+
+
+class TestDirectEngine:
+    """Tests du moteur NumPy/SciPy, comparé à OpenSees"""
+
+    def test_ssll03(self, ssll03):
+        """Appui élastique et extrémités articulées"""
+        assert_same_output(run_engine(ssll03, "direct"), run_engine(ssll03, "opensees"))
+
+    def test_member_loads_and_cases(self, ssll03):
+        """Charges réparties, cas de charge et combinaisons"""
+        ssll03["loads"][0]["case"] = 1
+        ssll03["loads"].append({
+            "id": 1, "type": "linear", "targets": [ssll03["members"][0]["id"], ssll03["members"][2]["id"]],
+            "name": "w", "value": {"x": 1, "y": -5, "z": 2}, "case": 2
+        })
+        ssll03["load_cases"] = [{"id": 1, "name": "G"}, {"id": 2, "name": "Q"}]
+        ssll03["load_combinations"] = [{"id": 10, "name": "ELU", "factors": {"1": 1.35, "2": 1.5}}]
+        direct = run_engine(ssll03, "direct")
+        expected = run_engine(ssll03, "opensees")
+        # Les enveloppes sont toujours arrondies au centième
+        direct.pop("envelopes")
+        expected.pop("envelopes")
+        assert_same_output(direct, expected)
+
+    def test_columnar(self, ssll03):
+        """Les résultats en colonnes ne dépendent pas du moteur"""
+        ssll03["analysis"]["engine"] = "direct"
+        direct = run_analysis(copy.deepcopy(ssll03), result_format="columnar")
+        ssll03["analysis"]["engine"] = "opensees"
+        expected = run_analysis(copy.deepcopy(ssll03), result_format="columnar")
+        for (name, column) in expected["columns"].items():
+            assert np.allclose(direct["columns"][name], column, rtol=1e-9, atol=1e-12), name
+
+    def test_mechanism(self, ssll03):
+        """Un mécanisme retenu par les seuls ressorts de relâchement est refusé"""
+        ssll03["members"][1]["release"] = "fixed-pinned"
+        with pytest.raises(HTTPException):
+            run_engine(ssll03, "direct")
+
+    def test_nonlinear_transformation(self, ssll03):
+        """Les transformations non linéaires demandent OpenSees"""
+        ssll03["members"][0]["transformation"] = "PDelta"
+        with pytest.raises(HTTPException, match="does not support PDelta"):
+            run_engine(ssll03, "direct")
+
+    def test_unknown_engine(self, ssll03):
+        with pytest.raises(HTTPException, match="Unknown analysis engine"):
+            run_engine(ssll03, "fortran")
@@ -0,0 +1,54 @@
+import pytest
+from fastapi import HTTPException
+
+from opensees import run_analysis
+from opensees.index import ModelIndex
+
+STEEL = {"E": 2.1e11, "nu": 0.3}
+
+
+@pytest.fixture
+def model():
+    """Poutre console de 4 m en deux segments"""
+    nodes = [{"id": 1, "x": 0, "y": 0, "z": 0}, {"id": 2, "x": 4, "y": 0, "z": 0}]
+    return {
+        "nodes": nodes,
+        "members": [{"id": 3, "nodei": nodes[0], "nodej": nodes[1], "section": 4, "mesh": {"segments": 2}}],
+        "sections": [{"id": 4, "type": "Rectangular", "width": 200, "height": 400, "material": STEEL}],
+        "loads": [{"id": 1, "type": "nodal", "targets": [2], "value": {"x": 0, "y": -10, "z": 0}}],
+        "boundary_conditions": [
+            {"id": 1, "type": "fixed", "targets": [1], "dx": 1, "dy": 1, "dz": 1, "rx": 1, "ry": 1, "rz": 1},
+        ],
+    }
+
+
+class TestModelIndex:
+    """Tests des index de recherche de l'analyse"""
+
+    def test_rows(self, model):
+        """Les nœuds et éléments de sortie sont indexés dans l'ordre de sortie"""
+        index = ModelIndex(model)
+        assert list(index.nodes) == [1, 2] and list(index.sections) == [4]
+
+        index.add_node({"id": 1}, 1)
+        index.add_node({"id": 5}, 3)
+        index.add_member({"id": 3, "mesh": {"members": [{"id": 1}, {"id": 2}]}})
+        index.add_member({"id": 6, "mesh": {"members": [{"id": 3}]}})
+        assert index.output_nodes == {1: 0, 5: 1}
+        assert index.node_tags == [1, 3]
+        assert index.elements == [1, 2, 3]
+        assert index.element_rows == {1: 0, 2: 1, 3: 2}
+        assert index.member_rows == [0, 2]
+
+    def test_undefined_section(self, model):
+        """Une barre dont la section n'existe pas est refusée"""
+        model["members"][0]["section"] = 8
+        with pytest.raises(HTTPException):
+            run_analysis(model)
+
+    def test_nodal_load(self, model):
+        """La charge nodale est appliquée au nœud indexé : flèche PL³/3EI"""
+        output = run_analysis(model)
+        tip = next(node for node in output["nodes"] if node["id"] == 2)
+        inertia = 0.2 * 0.4**3 / 12
+        assert tip["displacements"]["uz"] == pytest.approx(-10e3 * 4**3 / (3 * 2.1e11 * inertia), abs=1e-5)
@@ -0,0 +1,122 @@
+import pytest
+
+from opensees import run_analysis
+from opensees.meshing import plan_meshes
+
+STEEL = {"E": 2.1e11, "nu": 0.3}
+
+
+def beam(member_id, nodei, nodej, **options):
+    return {"id": member_id, "nodei": nodei, "nodej": nodej, "section": 5, "vecxz": [0, 0, 1], **options}
+
+
+@pytest.fixture
+def model():
+    """Poutre isostatique de 6 m sous 10 kN/m, avec un nœud libre à 2 m"""
+    nodes = [
+        {"id": 1, "x": 0, "y": 0, "z": 0},
+        {"id": 2, "x": 6, "y": 0, "z": 0},
+        {"id": 3, "x": 2, "y": 0, "z": 0},
+    ]
+    return {
+        "nodes": nodes,
+        "members": [beam(10, nodes[0], nodes[1])],
+        "sections": [{"id": 5, "type": "Rectangular", "width": 200, "height": 400, "material": STEEL}],
+        "loads": [{"id": 1, "type": "linear", "targets": [10], "value": {"x": 0, "y": -10, "z": 0}}],
+        "boundary_conditions": [
+            {"id": 1, "type": "fixed", "targets": [1], "dx": 1, "dy": 1, "dz": 1, "rx": 1, "ry": 0, "rz": 0},
+            {"id": 2, "type": "fixed", "targets": [2], "dx": 0, "dy": 1, "dz": 1, "rx": 0, "ry": 0, "rz": 0},
+        ],
+    }
+
+
+class TestMeshPlan:
+    """Tests de la politique de maillage des barres"""
+
+    def test_default(self, model):
+        """Une barre linéaire n'est pas maillée, une barre PDelta l'est tous les 0.5 m"""
+        assert plan_meshes(model) == {10: []}
+
+        model["members"][0]["transformation"] = "PDelta"
+        assert len(plan_meshes(model)[10]) == 11
+
+    def test_segments(self, model):
+        """Nombre de segments global, surchargé par barre"""
+        model["analysis"] = {"mesh": {"segment_length": 2}}
+        assert plan_meshes(model)[10] == [(1 / 3, None), (2 / 3, None)]
+
+        model["members"][0]["mesh"] = {"segments": 2}
+        assert plan_meshes(model)[10] == [(0.5, None)]
+
+    def test_min_segments(self, model):
+        """Un nombre minimal de segments s'impose aux réglages plus grossiers, pas aux plus fins"""
+        assert plan_meshes(model, min_segments=3)[10] == [(1 / 3, None), (2 / 3, None)]
+
+        model["members"][0]["mesh"] = {"segments": 6}
+        assert len(plan_meshes(model, min_segments=3)[10]) == 5
+
+    def test_stations(self, model):
+        """Une station de sortie crée un nœud intermédiaire"""
+        model["members"][0]["stations"] = [1.5, 0, 6]
+        assert plan_meshes(model)[10] == [(0.25, None)]
+
+    def test_adaptive(self, model):
+        """En mode adaptatif, seuls les nœuds chargés ou appuyés sur la portée coupent la barre"""
+        model["analysis"] = {"mesh": {"mode": "adaptive", "segments": 10}}
+        assert plan_meshes(model)[10] == []
+
+        model["loads"].append({"id": 2, "type": "nodal", "targets": [3], "value": {"x": 0, "y": -5, "z": 0}})
+        assert plan_meshes(model)[10] == [(pytest.approx(1 / 3), 3)]
+
+    def test_span_nodes(self, model):
+        """Seuls les nœuds chargés sur l'axe de la barre, entre ses extrémités, la coupent"""
+        model["analysis"] = {"mesh": {"mode": "adaptive"}}
+        model["nodes"] += [
+            {"id": 4, "x": 4, "y": 0.01, "z": 0},
+            {"id": 5, "x": 7, "y": 0, "z": 0},
+            {"id": 6, "x": 4.5, "y": 0, "z": 0},
+        ]
+        model["loads"].append({"id": 2, "type": "nodal", "targets": [3, 4, 5, 6], "value": {"x": 0, "y": -5, "z": 0}})
+        assert plan_meshes(model)[10] == [(pytest.approx(1 / 3), 3), (pytest.approx(0.75), 6)]
+
+    def test_adaptive_member_settings(self, model):
+        """En mode adaptatif, le maillage demandé sur une barre est conservé"""
+        model["analysis"] = {"mesh": {"mode": "adaptive", "segments": 10}}
+        model["members"][0]["mesh"] = {"segments": 2}
+        assert plan_meshes(model)[10] == [(0.5, None)]
+
+        model["members"][0]["mesh"] = {"segment_length": 2}
+        assert plan_meshes(model)[10] == [(pytest.approx(1 / 3), None), (pytest.approx(2 / 3), None)]
+
+    def test_max_dofs(self, model):
+        """Le maillage uniforme est réduit pour respecter le nombre maximal de DDL"""
+        model["analysis"] = {"mesh": {"segments": 100, "max_dofs": 6 * 8}}
+        assert len(plan_meshes(model)[10]) == 5
+
+        model["analysis"]["mesh"]["max_dofs"] = 6
+        with pytest.raises(ValueError):
+            plan_meshes(model)
+
+
+class TestMeshedAnalysis:
+    """Tests d'analyses avec maillage"""
+
+    def test_midspan_station(self, model):
+        """Flèche à mi-portée 5wL⁴/384EI au nœud créé par une station"""
+        model["members"][0]["stations"] = [3]
+        model["nodes"].pop()
+        output = run_analysis(model)
+
+        midspan = next(node for node in output["nodes"] if node["id"] not in (1, 2))
+        inertia = 0.2 * 0.4**3 / 12
+        assert midspan["displacements"]["uz"] == pytest.approx(-5 * 10e3 * 6**4 / (384 * 2.1e11 * inertia), abs=1e-5)
+
+    def test_adaptive_split(self, model):
+        """Une charge nodale sur la portée est transmise à la barre en mode adaptatif"""
+        model["analysis"] = {"mesh": {"mode": "adaptive"}}
+        model["loads"] = [{"id": 2, "type": "nodal", "targets": [3], "value": {"x": 0, "y": -30, "z": 0}}]
+        output = run_analysis(model)
+
+        moments = [station["efforts"]["My"]["value"] for station in output["members"][0]["node_efforts"]]
+        # M = P a b / L sous la charge
+        assert min(moments) == pytest.approx(-30 * 2 * 4 / 6, abs=0.01)
@@ -0,0 +1,143 @@
+import asyncio
+import copy
+import math
+
+import numpy as np
+import pytest
+
+from fastapi import HTTPException
+from opensees import AnalysisPool, run_modal_analysis
+from opensees.modal import display_rows, effective_masses
+
+E = 2.1e11
+RHO = 7850
+LENGTH = 4.0
+WIDTH = 0.2
+HEIGHT = 0.3
+
+
+@pytest.fixture
+def cantilever():
+    """Console encastrée de 4 m, section 200 x 300 mm, sans maillage"""
+    nodes = [{"id": 1, "x": 0, "y": 0, "z": 0}, {"id": 2, "x": LENGTH, "y": 0, "z": 0}]
+    return {
+        "nodes": nodes,
+        "members": [{"id": 1, "nodei": nodes[0], "nodej": nodes[1], "section": 1}],
+        "sections": [{
+            "id": 1, "type": "Rectangular", "width": WIDTH * 1000, "height": HEIGHT * 1000,
+            "material": {"id": 1, "E": E, "nu": 0.3, "rho": RHO}
+        }],
+        "loads": [],
+        "boundary_conditions": [{
+            "id": 1, "type": "fixed", "targets": [1], "dx": 1, "dy": 1, "dz": 1, "rx": 1, "ry": 1, "rz": 1
+        }],
+        "analysis": {"modes": 4},
+    }
+
+
+def bending_frequency(inertia):
+    """Première fréquence propre de flexion d'une console (Hz)"""
+    return 1.875 ** 2 * math.sqrt(E * inertia / (RHO * WIDTH * HEIGHT * LENGTH ** 4)) / (2 * math.pi)
+
+
+class TestModalHelpers:
+    """Tests des calculs de l'analyse modale"""
+
+    def test_display_rows(self):
+        """Les nœuds du modèle sont toujours affichés, les nœuds de maillage décimés"""
+        assert display_rows(10, 50, limit=100).tolist() == list(range(50))
+        rows = display_rows(10, 1000, limit=100)
+        assert len(rows) <= 100
+        assert rows[:10].tolist() == list(range(10))
+        assert display_rows(200, 1000, limit=100).tolist() == list(range(200))
+
+    def test_effective_masses(self):
+        """La masse effective ne dépend pas de la normalisation du mode"""
+        masses = np.array([1.0, 2.0, 3.0])
+        shape = np.array([[1.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 0.0, 0.0]])
+        assert effective_masses(masses, 5 * shape) == pytest.approx([6.0, 0.0, 0.0])
+
+
+class TestModalAnalysis:
+    """Tests de l'analyse modale"""
+
+    @pytest.mark.parametrize("engine", ["opensees", "direct"])
+    def test_cantilever(self, cantilever, engine):
+        """Premières fréquences de flexion de la console, dans les deux plans"""
+        cantilever["analysis"]["engine"] = engine
+        output = run_modal_analysis(cantilever)
+        frequencies = output["modes"]["frequencies"]
+        assert output["analysis"]["modes"] == 4
+        assert frequencies[0] == pytest.approx(bending_frequency(HEIGHT * WIDTH ** 3 / 12), rel=0.01)
+        assert frequencies[1] == pytest.approx(bending_frequency(WIDTH * HEIGHT ** 3 / 12), rel=0.01)
+        assert output["modes"]["periods"][0] == pytest.approx(1 / frequencies[0])
+        assert output["masses"]["total"] == pytest.approx(RHO * WIDTH * HEIGHT * LENGTH)
+
+    def test_density(self, cantilever):
+        """Quadrupler la masse volumique double les périodes"""
+        periods = run_modal_analysis(copy.deepcopy(cantilever))["modes"]["periods"]
+        cantilever["sections"][0]["material"]["rho"] = 4 * RHO
+        assert run_modal_analysis(cantilever)["modes"]["periods"] == pytest.approx([2 * T for T in periods])
+
+    def test_simply_supported(self, cantilever):
+        """Poutre sur deux appuis sans maillage : les barres sont découpées pour porter les masses"""
+        cantilever["boundary_conditions"] = [
+            {"id": 1, "type": "fixed", "targets": [1], "dx": 1, "dy": 1, "dz": 1, "rx": 1, "ry": 0, "rz": 0},
+            {"id": 2, "type": "fixed", "targets": [2], "dx": 0, "dy": 1, "dz": 1, "rx": 0, "ry": 0, "rz": 0},
+        ]
+        output = run_modal_analysis(cantilever)
+        # Premier mode de flexion dans le plan faible : (π / L)² √(EI / m) / 2π
+        expected = bending_frequency(HEIGHT * WIDTH ** 3 / 12) * (math.pi / 1.875) ** 2
+        assert output["analysis"]["modes"] == 4
+        assert output["modes"]["frequencies"][0] == pytest.approx(expected, rel=0.01)
+
+    def test_mode_limit(self, cantilever):
+        """Les modes sont limités par les DDL massiques ; les modes de flexion sont alors tous obtenus"""
+        cantilever["analysis"]["modes"] = 30
+        output = run_modal_analysis(cantilever)
+        # 8 éléments au moins : 24 DDL massiques
+        assert output["analysis"]["modes"] == 23
+        ratios = output["modes"]["cumulative_mass_ratios"]
+        assert ratios["y"][-1] == pytest.approx(1.0)
+        assert ratios["z"][-1] == pytest.approx(1.0)
+        assert 0.99 < ratios["x"][-1] < 1.0
+
+    def test_engines(self, ssll03):
+        """Appui élastique : les deux moteurs donnent les mêmes modes"""
+        ssll03["analysis"] = {"modes": 4, "engine": "opensees"}
+        expected = run_modal_analysis(copy.deepcopy(ssll03))
+        ssll03["analysis"]["engine"] = "direct"
+        output = run_modal_analysis(ssll03)
+        assert output["modes"]["periods"] == pytest.approx(expected["modes"]["periods"], rel=1e-6)
+        for direction in "xyz":
+            assert output["modes"]["mass_ratios"][direction] == pytest.approx(
+                expected["modes"]["mass_ratios"][direction], abs=1e-6)
+
+    def test_shapes(self, cantilever):
+        """Déformées compactes : translations des nœuds affichés, la plus grande valant 1"""
+        output = run_modal_analysis(cantilever)
+        count = len(output["nodes"])
+        assert output["members"][0]["nodes"][0] == 1 and output["members"][0]["nodes"][-1] == 2
+        assert len(output["shapes"]) == 4
+        for shape in output["shapes"]:
+            translations = np.array(shape).reshape(count, 3)
+            assert np.linalg.norm(translations, axis=1).max() == pytest.approx(1.0, abs=1e-3)
+
+        columns = run_modal_analysis(cantilever, result_format="columnar")["columns"]
+        assert columns["mode_shapes"].dtype == np.float32
+        assert columns["mode_shapes"].shape == (4, count, 3)
+        assert columns["mass_ratios"].shape == (4, 3)
+
+    def test_invalid_modes(self, cantilever):
+        cantilever["analysis"]["modes"] = 0
+        with pytest.raises(HTTPException, match="number of modes"):
+            run_modal_analysis(cantilever)
+
+    def test_pool(self, cantilever):
+        """L'analyse modale passe par le pool de workers"""
+        pool = AnalysisPool(workers=1, queue_size=1, session_workers=1)
+        try:
+            output = asyncio.run(pool.run_modal_analysis(copy.deepcopy(cantilever)))
+        finally:
+            pool.shutdown()
+        assert output["modes"]["periods"] == pytest.approx(run_modal_analysis(cantilever)["modes"]["periods"])
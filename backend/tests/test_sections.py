@@ -0,0 +1,145 @@
+import os
+
+import pytest
+
+from opensees import helpers
+from opensees.helpers import compute_section_properties, evaluate_section_properties
+from opensees.sections.catalog import get_profile, list_profiles, normalize_designation
+
+STEEL = {"E": 210000, "nu": 0.3}
+
+
+@pytest.fixture
+def section_cache(tmp_path, monkeypatch):
+    """Caches de propriétés de section vides, stockage disque dans un dossier temporaire"""
+    monkeypatch.setattr(helpers, "section_cache", helpers.LRUCache(max_entries=8))
+    monkeypatch.setattr(helpers, "section_store", None)
+    monkeypatch.setattr(helpers, "SECTION_CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def evaluations(monkeypatch):
+    """Compte les calculs effectifs de propriétés de section"""
+    calls = []
+    evaluate = helpers.evaluate_section_properties
+
+    def counting_evaluate(section, fe=False):
+        calls.append((section["type"], fe) if fe else section["type"])
+        return evaluate(section, fe)
+
+    monkeypatch.setattr(helpers, "evaluate_section_properties", counting_evaluate)
+    return calls
+
+
+class TestSectionPropertyCache:
+    """Tests de la mémoïsation des propriétés de section"""
+
+    def test_memoized(self, section_cache, evaluations):
+        """Une section identique n'est calculée qu'une fois"""
+        section = {"type": "Rectangular", "width": 200, "height": 400, "material": STEEL}
+        first = compute_section_properties(section)
+        second = compute_section_properties({**section, "id": 2, "width": 200.0000001})
+
+        assert second == first
+        assert evaluations == ["Rectangular"]
+
+    def test_material_in_key(self, section_cache, evaluations):
+        """Le matériau fait partie de la clé"""
+        section = {"type": "Circular", "diameter": 0.2, "material": STEEL}
+        compute_section_properties(section)
+        concrete = compute_section_properties({**section, "material": {"E": 30000, "nu": 0.2}})
+
+        assert concrete["E"] == 30000
+        assert len(evaluations) == 2
+
+    def test_disk_store(self, section_cache, evaluations, monkeypatch):
+        """Le stockage disque est partagé entre processus (ici après vidage du LRU)"""
+        section = {"type": "Circular", "diameter": 0.3, "material": STEEL}
+        compute_section_properties(section)
+        monkeypatch.setattr(helpers, "section_cache", helpers.LRUCache(max_entries=8))
+        compute_section_properties(section)
+
+        assert len(evaluations) == 1
+        assert len(os.listdir(section_cache)) == 1
+
+
+class TestAnalyticSections:
+    """Tests des propriétés de section en forme fermée"""
+
+    @pytest.mark.parametrize("section, tolerance", [
+        ({"type": "Rectangular", "width": 200, "height": 400}, 0.04),
+        ({"type": "HollowCircular", "diameter": 219.1, "thickness": 6.3}, 0.005),
+        ({"type": "I", "depth": 300, "width": 300, "tw": 11, "tf": 19}, 0.02),
+    ])
+    def test_matches_fe(self, section, tolerance):
+        """Les formules fermées restent proches de l'analyse EF"""
+        section = {**section, "material": STEEL}
+        closed_form = evaluate_section_properties(section)
+        fe = evaluate_section_properties(section, fe=True)
+
+        for name in ("A", "Iz", "Iy", "Jxx"):
+            assert closed_form[name] == pytest.approx(fe[name], rel=tolerance)
+
+    def test_square_torsion(self):
+        """Constante de torsion du carré : J = 0.1406 a^4"""
+        section = {"type": "Rectangular", "width": 100, "height": 100, "material": STEEL}
+
+        assert evaluate_section_properties(section)["Jxx"] == pytest.approx(0.1406 * 0.1**4, rel=1e-3)
+
+    def test_methods(self, section_cache, evaluations):
+        """L'EF n'est utilisée que pour les sections à congés ou en mode précis"""
+        section = {"type": "I", "depth": 200, "width": 100, "tw": 5.6, "tf": 8.5, "material": STEEL}
+        compute_section_properties(section)
+        compute_section_properties({**section, "r": 12})
+        compute_section_properties({**section, "r": 12}, "fast")
+        compute_section_properties(section, "accurate")
+        compute_section_properties({**section, "method": "fast"}, "accurate")
+
+        assert evaluations == ["I", ("I", True), "I", ("I", True)]
+
+    def test_unknown_method(self, section_cache):
+        """Une méthode inconnue est refusée"""
+        with pytest.raises(ValueError):
+            compute_section_properties({"type": "Circular", "diameter": 0.2, "material": STEEL}, "exact")
+
+
+class TestProfileCatalog:
+    """Tests du catalogue de profilés standards"""
+
+    def test_designations(self):
+        """Les différentes écritures d'une désignation désignent le même profilé"""
+        assert normalize_designation("HE 200 A") == "HEA200"
+        assert normalize_designation("chs 273 x 8.0") == "CHS273X8"
+        assert get_profile("ipe 200")["designation"] == "IPE200"
+        assert get_profile("IPE 201") is None
+
+    def test_tabulated_values(self):
+        """Valeurs proches des tableaux de profilés (IPE 200 : A = 28.5 cm², Iy = 1943 cm⁴, It = 6.98 cm⁴)"""
+        profile = get_profile("IPE200")
+
+        assert profile["A"] == pytest.approx(28.5e-4, rel=0.01)
+        assert profile["Iy"] == pytest.approx(1943e-8, rel=0.01)
+        assert profile["Iz"] == pytest.approx(142.4e-8, rel=0.01)
+        assert profile["J"] == pytest.approx(6.98e-8, rel=0.03)
+        assert profile["Wpl_y"] == pytest.approx(220.6e-6, rel=0.01)
+
+    def test_families(self):
+        """Le catalogue contient les familles IPE, HEA, HEB, CHS et RHS"""
+        families = {profile["family"] for profile in list_profiles()}
+
+        assert families == {"IPE", "HEA", "HEB", "CHS", "RHS"}
+        assert all(profile["family"] == "HEB" for profile in list_profiles("heb"))
+
+    def test_section_designation(self, section_cache, evaluations):
+        """Une section référençant une désignation est lue dans le catalogue, sans calcul"""
+        properties = compute_section_properties({"type": "I", "designation": "HEB 300", "material": STEEL})
+
+        assert properties["Iy"] == pytest.approx(get_profile("HEB300")["Iy"])
+        assert properties["G_mod"] == pytest.approx(210000 / 2.6)
+        assert evaluations == []
+
+    def test_unknown_designation(self, section_cache):
+        """Une désignation inconnue est refusée"""
+        with pytest.raises(ValueError):
+            compute_section_properties({"designation": "IPE 201", "material": STEEL})
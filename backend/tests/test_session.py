@@ -0,0 +1,238 @@
+import asyncio
+import copy
+
+import pytest
+
+from opensees import AnalysisPool, ResultCache, run_analysis
+from opensees.session import AnalysisSession, diff_models, snapshot
+
+
+def add_member_load(model):
+    """Ajoute une charge répartie sur la première barre"""
+    model["loads"].append({
+        "id": 1, "type": "linear", "targets": [model["members"][0]["id"]],
+        "name": "Load 2", "value": {"x": 0, "y": -5, "z": 2}
+    })
+
+
+def assert_close(value, expected, path=""):
+    """Deux sorties sont égales, aux erreurs d'arrondi près"""
+    if isinstance(expected, dict):
+        assert value.keys() == expected.keys(), path
+        for key in expected:
+            assert_close(value[key], expected[key], f"{path}.{key}")
+    elif isinstance(expected, list):
+        assert len(value) == len(expected), path
+        for (i, item) in enumerate(expected):
+            assert_close(value[i], item, f"{path}[{i}]")
+    elif isinstance(expected, float):
+        assert value == pytest.approx(expected, rel=1e-9, abs=1e-12), path
+    else:
+        assert value == expected, path
+
+
+def assert_same_results(output, expected):
+    """Les nœuds et barres d'une analyse de session sont ceux d'une analyse complète"""
+    assert_close(output["nodes"], expected["nodes"])
+    assert_close(output["members"], expected["members"])
+
+
+class TestDiffModels:
+    """Tests de la comparaison d'un modèle avec le dernier construit"""
+
+    def test_loads_only(self, ssll03):
+        """Modifier les charges ne change ni les barres ni les appuis"""
+        old = snapshot(ssll03)
+        ssll03["loads"][0]["value"]["y"] = -50
+        assert diff_models(old, snapshot(ssll03)) == {
+            "sections": [], "members": [], "boundary_conditions": False
+        }
+
+    def test_section(self, ssll03):
+        """Modifier une section remplace les éléments des barres qui l'utilisent"""
+        old = snapshot(ssll03)
+        ssll03["sections"][0]["width"] = 300
+        changes = diff_models(old, snapshot(ssll03))
+        assert changes["sections"] == [2]
+        assert changes["members"] == [member["id"] for member in ssll03["members"]]
+
+    def test_member_section(self, ssll03):
+        """Changer la section d'une barre ne remplace que ses éléments"""
+        old = snapshot(ssll03)
+        ssll03["sections"].append({**ssll03["sections"][0], "id": 3, "width": 200})
+        ssll03["members"][1]["section"] = 3
+        changes = diff_models(old, snapshot(ssll03))
+        assert changes["sections"] == [3]
+        assert changes["members"] == [ssll03["members"][1]["id"]]
+
+    def test_boundary_conditions(self, ssll03):
+        """Modifier un appui est signalé"""
+        old = snapshot(ssll03)
+        ssll03["boundary_conditions"][1]["dz"] = 1000000
+        assert diff_models(old, snapshot(ssll03))["boundary_conditions"]
+
+    def test_rebuild(self, ssll03):
+        """Les nœuds, la géométrie des barres et les options de calcul imposent une reconstruction"""
+        old = snapshot(ssll03)
+        assert diff_models(None, old) is None
+
+        edits = [
+            lambda model: model["nodes"][0].update(x=0.5),
+            lambda model: model["members"][0].update(release="fixed-fixed"),
+            lambda model: model["members"].pop(),
+            lambda model: model["sections"].pop(),
+            lambda model: model.update(analysis={"mode": "nonlinear"}),
+        ]
+        for edit in edits:
+            model = copy.deepcopy(ssll03)
+            edit(model)
+            assert diff_models(old, snapshot(model)) is None
+
+    def test_output_options(self, ssll03):
+        """Les options de sortie ne changent pas le modèle construit"""
+        old = snapshot(ssll03)
+        ssll03["analysis"] = {"output": {"precision": 3}}
+        assert diff_models(old, snapshot(ssll03)) is not None
+
+
+class TestSessionAnalysis:
+    """Tests des analyses successives d'une session"""
+
+    def run_edits(self, model, edits):
+        """Analyse le modèle puis chacune de ses modifications dans une même session"""
+        session = AnalysisSession("test")
+        outputs = [run_analysis(copy.deepcopy(model), session=session)]
+        for edit in edits:
+            edit(model)
+            outputs.append(run_analysis(copy.deepcopy(model), session=session))
+        return outputs
+
+    def test_loads(self, ssll03):
+        """Une modification des charges réutilise la rigidité factorisée"""
+        add_member_load(ssll03)
+
+        def edit(model):
+            model["loads"][0]["value"]["y"] = -60
+            model["loads"][1]["value"]["z"] = -3
+
+        first, second = self.run_edits(ssll03, [edit])
+        assert first["analysis"]["update"] == "rebuild"
+        assert second["analysis"]["update"] == "loads"
+        assert_same_results(second, run_analysis(copy.deepcopy(ssll03)))
+
+    def test_load_cases(self, ssll03):
+        """Ajouter des cas de charge ne reconstruit pas le modèle"""
+        def edit(model):
+            model["load_cases"] = [{"id": 1, "name": "G"}, {"id": 2, "name": "Q"}]
+            model["loads"][0]["case"] = 1
+            add_member_load(model)
+            model["loads"][1]["case"] = 2
+            model["load_combinations"] = [{"id": 10, "name": "ELU", "factors": {"1": 1.35, "2": 1.5}}]
+
+        _, second = self.run_edits(ssll03, [edit])
+        expected = run_analysis(copy.deepcopy(ssll03))
+        assert second["analysis"]["update"] == "loads"
+        assert_same_results(second, expected)
+        assert_close(second["load_cases"], expected["load_cases"])
+
+    def test_structure(self, ssll03):
+        """Les appuis et sections modifiés sont remplacés dans le modèle construit"""
+        def support(model):
+            model["boundary_conditions"][1]["dz"] = 1000000
+
+        def section(model):
+            model["sections"][0]["height"] = 400
+
+        outputs = self.run_edits(ssll03, [support, section])
+        assert [output["analysis"]["update"] for output in outputs] == ["rebuild", "structure", "structure"]
+        assert_same_results(outputs[-1], run_analysis(copy.deepcopy(ssll03)))
+
+    def test_rebuild(self, ssll03):
+        """Une modification des nœuds reconstruit le modèle"""
+        def edit(model):
+            model["nodes"][-1]["z"] = 0.1
+
+        _, second = self.run_edits(ssll03, [edit])
+        assert second["analysis"]["update"] == "rebuild"
+        assert_same_results(second, run_analysis(copy.deepcopy(ssll03)))
+
+    def test_error(self, ssll03):
+        """Après une erreur, l'analyse suivante reconstruit le modèle"""
+        session = AnalysisSession("test")
+        run_analysis(copy.deepcopy(ssll03), session=session)
+        broken = copy.deepcopy(ssll03)
+        broken["members"][0]["section"] = 999
+        with pytest.raises(Exception):
+            run_analysis(broken, session=session)
+        output = run_analysis(copy.deepcopy(ssll03), session=session)
+        assert output["analysis"]["update"] == "rebuild"
+
+    def test_plain_analysis(self, ssll03):
+        """Une analyse hors session libère le modèle de la session"""
+        session = AnalysisSession("test")
+        run_analysis(copy.deepcopy(ssll03), session=session)
+        run_analysis(copy.deepcopy(ssll03))
+        output = run_analysis(copy.deepcopy(ssll03), session=session)
+        assert output["analysis"]["update"] == "rebuild"
+
+
+class TestPoolSession:
+    """Tests des sessions sur le pool de workers"""
+
+    def test_session_worker(self, ssll03):
+        """Les analyses d'une session sont mises à jour dans le même worker"""
+        pool = AnalysisPool(workers=1, queue_size=1, session_workers=2)
+
+        async def run():
+            first = await pool.run_analysis(copy.deepcopy(ssll03), session_id="a")
+            ssll03["loads"][0]["value"]["y"] = -60
+            second = await pool.run_analysis(copy.deepcopy(ssll03), session_id="a")
+            other = await pool.run_analysis(copy.deepcopy(ssll03), session_id="b")
+            return first, second, other
+
+        try:
+            first, second, other = asyncio.run(run())
+        finally:
+            pool.shutdown()
+
+        assert first["analysis"]["update"] == "rebuild"
+        assert second["analysis"]["update"] == "loads"
+        assert other["analysis"]["update"] == "rebuild"
+        assert_same_results(second, run_analysis(copy.deepcopy(ssll03)))
+
+    def test_concurrent_sessions(self, ssll03):
+        """Deux sessions alternées gardent chacune leur modèle dans un worker"""
+        pool = AnalysisPool(workers=1, queue_size=4, session_workers=2)
+
+        async def run():
+            outputs = []
+            for (session_id, load) in (("a", -50), ("b", -50), ("a", -60), ("b", -70)):
+                ssll03["loads"][0]["value"]["y"] = load
+                outputs.append(await pool.run_analysis(copy.deepcopy(ssll03), session_id=session_id))
+            return outputs
+
+        try:
+            outputs = asyncio.run(run())
+        finally:
+            pool.shutdown()
+
+        assert [output["analysis"]["update"] for output in outputs] == ["rebuild", "rebuild", "loads", "loads"]
+
+    def test_cache(self, ssll03):
+        """Les analyses de session passent par le cache de résultats"""
+        pool = AnalysisPool(workers=1, queue_size=1, session_workers=1, cache=ResultCache())
+
+        async def run():
+            first = await pool.run_analysis(copy.deepcopy(ssll03), session_id="a")
+            second = await pool.run_analysis(copy.deepcopy(ssll03), session_id="b")
+            return first, second
+
+        try:
+            first, second = asyncio.run(run())
+        finally:
+            pool.shutdown()
+
+        assert pool.cache.stats()["hits"] == 1
+        assert "update" not in second["analysis"]
+        assert_same_results(first, second)
+
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+import openseespy.opensees as openseespy
+from fastapi import HTTPException
+from opensees import run_analysis
+from opensees.solvers import BAND_MAX_BANDWIDTH, choose_solvers, estimate_bandwidth
+
+
+def grid_pairs(nx, ny):
+    """Éléments d'une grille de nx x ny nœuds"""
+    rows = np.arange(nx * ny).reshape(nx, ny)
+    return np.concatenate([
+        np.stack([rows[:-1].ravel(), rows[1:].ravel()], axis=1),
+        np.stack([rows[:, :-1].ravel(), rows[:, 1:].ravel()], axis=1),
+    ])
+
+
+class TestSolverPolicy:
+    """Tests du choix du solveur"""
+
+    def test_bandwidth(self):
+        """Une poutre a une bande étroite, une grille une bande qui suit sa largeur"""
+        chain = np.stack([np.arange(99), np.arange(1, 100)], axis=1)
+        assert estimate_bandwidth(chain, 100) == 12
+        assert estimate_bandwidth(grid_pairs(50, 50), 2500) >= 6 * 50
+        assert estimate_bandwidth(np.zeros((0, 2)), 1) == 0
+        # Springs to a shared ground node take part in the numbering only
+        ground = [[node, 100] for node in range(0, 100, 2)]
+        assert estimate_bandwidth(chain, 101, links=ground) > 12
+
+    def test_auto(self):
+        """Solveur en bande pour une bande étroite, creux au-delà ou en incrémental"""
+        assert choose_solvers({}, "linear", "opensees", 12)[0] == ("BandSPD", "RCM")
+        assert choose_solvers({}, "linear", "opensees", BAND_MAX_BANDWIDTH + 6)[0] == ("UmfPack", "RCM")
+        assert choose_solvers({}, "incremental", "opensees", 12)[0] == ("UmfPack", "RCM")
+        assert choose_solvers({}, "linear", "direct", BAND_MAX_BANDWIDTH + 6)[0] == ("BandSPD", "RCM")
+
+    def test_override(self):
+        """Le solveur et la numérotation demandés sont utilisés seuls"""
+        model = {"analysis": {"solver": "ProfileSPD", "numberer": "AMD"}}
+        assert choose_solvers(model, "linear", "opensees", 12) == [("ProfileSPD", "AMD")]
+        model = {"analysis": {"numberer": "Plain"}}
+        assert [numberer for (_, numberer) in choose_solvers(model, "linear", "opensees", 12)] == ["Plain", "Plain"]
+
+
+class TestAnalysisSolver:
+    """Tests du solveur enregistré dans la sortie"""
+
+    def test_recorded(self, ssll03):
+        """Le solveur utilisé et le temps de factorisation sont renvoyés"""
+        output = run_analysis(ssll03)
+        solver = output["analysis"]["solver"]
+        assert (solver["system"], solver["numberer"]) == ("BandSPD", "RCM")
+        assert solver["factorization_time"] >= 0
+
+    def test_requested_solver(self, ssll03):
+        """Chaque solveur donne les mêmes déplacements"""
+        expected = run_analysis(dict(ssll03))["nodes"]
+        for system in ("ProfileSPD", "UmfPack", "BandGeneral", "SparseGeneral"):
+            ssll03["analysis"] = {"solver": system}
+            output = run_analysis(dict(ssll03))
+            assert output["analysis"]["solver"]["system"] == system
+            assert output["nodes"] == expected
+
+    def test_fallback(self, ssll03, monkeypatch):
+        """Un solveur qui ne peut pas factoriser la matrice est remplacé par le suivant"""
+        class FailingUmfPack:
+            """Interpréteur OpenSees dont le solveur UmfPack échoue"""
+            system_name = None
+
+            def system(self, name, *args):
+                self.system_name = name
+                openseespy.system(name, *args)
+
+            def analyze(self, *args):
+                return -3 if self.system_name == "UmfPack" else openseespy.analyze(*args)
+
+            def __getattr__(self, name):
+                return getattr(openseespy, name)
+
+        monkeypatch.setattr("opensees.main.openseespy", FailingUmfPack())
+        monkeypatch.setattr("opensees.main.choose_solvers", lambda *args: [("UmfPack", "RCM"), ("BandSPD", "RCM")])
+        output = run_analysis(ssll03)
+        assert output["analysis"]["mode"] == "linear"
+        assert output["analysis"]["solver"]["system"] == "BandSPD"
+
+    def test_unknown_solver(self, ssll03):
+        ssll03["analysis"] = {"solver": "SparseSYM"}
+        with pytest.raises(HTTPException, match="Unknown solver"):
+            run_analysis(ssll03)
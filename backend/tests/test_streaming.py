@@ -0,0 +1,118 @@
+import asyncio
+import copy
+import json
+
+import pytest
+
+from opensees import AnalysisPool, run_analysis
+from opensees.streaming import stream_analysis
+
+
+def run_streamed(model, chunk_size=None):
+    """Analyse en mode ndjson, retourne (morceaux, résumé)"""
+    chunks = []
+
+    def progress(phase, **data):
+        if phase == "chunk":
+            chunks.append(data)
+
+    summary = run_analysis(model, progress, result_format="ndjson")
+    return chunks, summary
+
+
+class TestStreamedResults:
+    """Tests de l'extraction des résultats par morceaux"""
+
+    def test_matches_json(self, ssll03, monkeypatch):
+        """Les morceaux reconstituent les nœuds et barres de la réponse JSON"""
+        monkeypatch.setattr("opensees.main.RESULT_CHUNK_SIZE", 2)
+        output = run_analysis(copy.deepcopy(ssll03))
+        chunks, summary = run_streamed(copy.deepcopy(ssll03))
+
+        types = [chunk["type"] for chunk in chunks]
+        assert types == sorted(types, key=["nodes", "members"].index)
+        assert all(len(chunk.get("nodes", chunk.get("members"))) <= 2 for chunk in chunks)
+        assert [node for chunk in chunks for node in chunk.get("nodes", [])] == output["nodes"]
+        assert [member for chunk in chunks for member in chunk.get("members", [])] == output["members"]
+        for result in (summary, output):
+            result["analysis"]["solver"].pop("factorization_time")
+        assert summary == {"analysis": output["analysis"]}
+
+    def test_load_cases(self, ssll03):
+        """Les résultats de chaque cas suivent ceux de la première combinaison"""
+        ssll03["load_cases"] = [{"id": 1, "name": "G"}]
+        ssll03["load_combinations"] = [{"id": 10, "name": "1.35 G", "factors": {"1": 1.35}}]
+        chunks, summary = run_streamed(ssll03)
+
+        results = [chunk["result"] for chunk in chunks if chunk["type"] == "nodes"]
+        assert results == [None, {"load_case": 1}, {"load_combination": 10}]
+        assert [case["id"] for case in summary["load_cases"]] == [1]
+        assert "envelopes" in summary
+
+
+class TestStreamAnalysis:
+    """Tests de la réponse NDJSON sur le pool de workers"""
+
+    def test_lines(self, ssll03):
+        """Chaque ligne est un objet JSON, la dernière est le résumé"""
+        pool = AnalysisPool(workers=1, queue_size=1)
+
+        async def collect():
+            return [json.loads(line) async for line in stream_analysis(pool, ssll03)]
+
+        try:
+            lines = asyncio.run(collect())
+        finally:
+            pool.shutdown()
+
+        assert lines[0]["type"] == "nodes"
+        assert lines[-1]["type"] == "done" and lines[-1]["analysis"]["mode"] == "linear"
+        assert sum(len(line["members"]) for line in lines if line["type"] == "members") == len(ssll03["members"])
+
+    def test_error(self, ssll03):
+        """Une erreur d'analyse termine le flux par une ligne d'erreur"""
+        ssll03["members"][0]["section"] = 999
+        pool = AnalysisPool(workers=1, queue_size=1)
+
+        async def collect():
+            return [json.loads(line) async for line in stream_analysis(pool, ssll03)]
+
+        try:
+            lines = asyncio.run(collect())
+        finally:
+            pool.shutdown()
+
+        assert len(lines) == 1
+        assert lines[0]["type"] == "error" and "undefined section" in lines[0]["detail"]
+
+    def test_slow_client(self, ssll03, monkeypatch):
+        """Un client lent retient le worker au lieu d'accumuler les morceaux"""
+        monkeypatch.setenv("ANALYSIS_CHUNK_SIZE", "1")
+        pool = AnalysisPool(workers=1, queue_size=1)
+        received = []
+        release = None
+
+        async def on_progress(phase, data):
+            if phase == "chunk":
+                received.append(data)
+                await release.wait()
+
+        async def collect():
+            nonlocal release
+            release = asyncio.Event()
+            task = asyncio.ensure_future(pool.run_analysis(ssll03, on_progress, result_format="ndjson"))
+            while not received:
+                await asyncio.sleep(0.05)
+            await asyncio.sleep(2)
+            blocked = (task.done(), len(received))
+            release.set()
+            return blocked, await task
+
+        try:
+            blocked, summary = asyncio.run(collect())
+        finally:
+            pool.shutdown()
+
+        assert blocked == (False, 1)
+        assert sum(len(chunk["nodes"]) for chunk in received if chunk["type"] == "nodes") == len(ssll03["nodes"])
+        assert summary["analysis"]["mode"] == "linear"
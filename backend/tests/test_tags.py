@@ -0,0 +1,78 @@
+import pytest
+
+from opensees import run_analysis
+from opensees.tags import TagAllocator
+
+STEEL = {"E": 2.1e11, "nu": 0.3}
+
+
+@pytest.fixture
+def model():
+    """Portique à deux barres, maillées, avec relâchement et appui élastique"""
+    nodes = [
+        {"id": 101, "x": 0, "y": 0, "z": 0},
+        {"id": 7, "x": 0, "y": 3, "z": 0},
+        {"id": 55, "x": 5, "y": 3, "z": 0},
+    ]
+    return {
+        "nodes": nodes,
+        "members": [
+            {"id": 1, "nodei": nodes[0], "nodej": nodes[1], "section": 9, "mesh": {"segments": 3}},
+            {"id": 2, "nodei": nodes[1], "nodej": nodes[2], "section": 9, "mesh": {"segments": 2},
+             "release": "fixed-pinned"},
+        ],
+        "sections": [{"id": 9, "type": "Rectangular", "width": 200, "height": 400, "material": STEEL}],
+        "loads": [{"id": 1, "type": "linear", "targets": [2], "value": {"x": 0, "y": -10, "z": 0}}],
+        "boundary_conditions": [
+            {"id": 1, "type": "fixed", "targets": [101], "dx": 1, "dy": 1, "dz": 1, "rx": 1, "ry": 1, "rz": 1},
+            {"id": 2, "type": "elastic", "targets": [55], "dx": 0, "dy": 1e7, "dz": 1e7, "rx": 0, "ry": 0, "rz": 0},
+        ],
+    }
+
+
+class TestTagAllocator:
+    """Tests de l'allocation des tags OpenSees"""
+
+    def test_ranges(self):
+        """Chaque type d'objet a sa plage contiguë dans son espace de tags"""
+        tags = TagAllocator()
+        assert tags.map_ids("user_node", [10, 3]) == {10: 1, 3: 2}
+        assert tags.reserve("mesh_node", 2) == range(3, 5)
+        assert tags.reserve("element", 3) == range(1, 4)
+        assert [tags.allocate("mesh_node") for _ in range(3)] == [3, 4, 5]
+        assert tags.allocate("material") == 1
+
+    def test_node_ids(self):
+        """Les nœuds générés ont des ids après le plus grand id utilisateur"""
+        tags = TagAllocator()
+        tags.map_ids("user_node", [10, 3])
+        tags.reserve("mesh_node", 2)
+        assert tags.node_ids([1, 2, 3, 4]) == [10, 3, 11, 12]
+        assert [tags.node_tag(id) for id in (10, 3, 11, 12)] == [1, 2, 3, 4]
+
+        with pytest.raises(ValueError):
+            tags.node_tag(5)
+
+    def test_duplicate_ids(self):
+        """Un id utilisateur en double est refusé"""
+        with pytest.raises(ValueError):
+            TagAllocator().map_ids("section", [1, 2, 1])
+
+
+class TestDeterministicTags:
+    """Tests de la numérotation déterministe des analyses"""
+
+    def test_repeatable(self, model):
+        """Deux analyses du même modèle donnent exactement le même résultat"""
+        first, second = run_analysis(model), run_analysis(model)
+        for output in (first, second):
+            output["analysis"]["solver"].pop("factorization_time")
+        assert first == second
+
+    def test_dense_ids(self, model):
+        """Les nœuds et éléments du maillage sont numérotés sans trou"""
+        output = run_analysis(model)
+
+        assert [node["id"] for node in output["nodes"]] == [101, 7, 55, 102, 103, 104]
+        elements = [child["id"] for member in output["members"] for child in member["mesh"]["members"]]
+        assert elements == [1, 2, 3, 4, 5]
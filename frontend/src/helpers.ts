@@ -188,3 +188,40 @@ export const buildModelOnjson = async (model: Model , path : string) => {
   }
 }
 
+
+export const COLUMNAR_MEDIA_TYPE = 'application/vnd.buckle.columnar';
+
+type ColumnarArray = Float64Array | Float32Array | Int32Array;
+
+export type ColumnarResult = {
+  meta: Record<string, any>;
+  columns: Record<string, { data: ColumnarArray; shape: number[] }>;
+};
+
+// Decodes an /analysis response requested with Accept: application/vnd.buckle.columnar
+// (see backend/opensees/columnar.py): the columns are typed array views on the buffer.
+export const decodeColumnar = (buffer: ArrayBuffer): ColumnarResult => {
+  const view = new DataView(buffer);
+  const magic = new TextDecoder().decode(new Uint8Array(buffer, 0, 4));
+  if (magic !== 'BKLC') {
+    throw new Error('Not a columnar analysis payload');
+  }
+  const headerLength = view.getUint32(4, true);
+  const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 8, headerLength)));
+  const start = 8 + headerLength;
+  const arrays = {
+    '<f8': Float64Array,
+    '<f4': Float32Array,
+    '<i4': Int32Array
+  } as const;
+
+  const columns: ColumnarResult['columns'] = {};
+  for (const column of header.columns) {
+    const ArrayType = arrays[column.dtype as keyof typeof arrays];
+    columns[column.name] = {
+      data: new ArrayType(buffer, start + column.offset, column.length / ArrayType.BYTES_PER_ELEMENT),
+      shape: column.shape
+    };
+  }
+  return { meta: header.meta, columns };
+};
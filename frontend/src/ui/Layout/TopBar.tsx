@@ -29,6 +29,8 @@ import Copy from '../Model/Copy';
 import { useActiveDialog } from './hooks';
 const { VITE_BACKEND_SERVER } = import.meta.env;
 const APP_VERSION = '0.0.2';
+// Editor session: the backend only applies what changed since the last analysis
+const ANALYSIS_SESSION_ID = crypto.randomUUID();
 
 interface TopBarProps {
   onMenuClick?: () => void;
@@ -190,7 +192,9 @@ const TopBar = observer(({ onMenuClick }: TopBarProps) => {
         boundary_conditions: boundaryConditions,
       };
       
-      const res = await axios.post(`${VITE_BACKEND_SERVER}/analysis`, data);
+      const res = await axios.post(`${VITE_BACKEND_SERVER}/analysis`, data, {
+        params: { session_id: ANALYSIS_SESSION_ID },
+      });
       console.log('RES', res);
       model.output = res.data.output;
       